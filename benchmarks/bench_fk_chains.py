@@ -0,0 +1,90 @@
+"""
+Counts the maya commands per joint of the FK builder, in both of its modes, against
+the one-chain-at-a-time builder it replaced. The builder only batches the reads and
+the matrix math, every joint still costs about four scene edits in constraint mode.
+
+    python benchmarks/bench_fk_chains.py
+"""
+import contextlib
+import io
+import time
+
+from bench_utils import CMDS, print_table
+
+from auto_rigging_tool_box.rigging_tools.fk_utils import create_fk_chains
+
+
+IDENTITY = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+CASES = (
+    ("one finger", 1, 4),
+    ("both hands", 10, 4),
+    ("hands and toes", 20, 4),
+    ("tail", 1, 200),
+)
+
+
+def legacy_fk(chain):
+    """
+    The FK builder before the batch version, for one selected chain.
+    """
+    top_grp = CMDS.group(empty=True, name="GRP_FK_controls")
+    parent_ctrl = None
+    for jnt in chain:
+        ctrl = CMDS.circle(name=f"{jnt}_FK_CTRL", normal=[1, 0, 0], radius=2)[0]
+        CMDS.matchTransform(ctrl, jnt)
+        CMDS.parent(ctrl, parent_ctrl or top_grp)
+        CMDS.parentConstraint(ctrl, jnt, mo=True)
+        parent_ctrl = ctrl
+    CMDS.select(clear=True)
+
+
+def chains(count, length):
+    return [[f"chain{c}_jnt{j}" for j in range(length)] for c in range(count)]
+
+
+def measure(build):
+    """
+    Runs a build and returns its command count, its commands by name and seconds.
+    """
+    CMDS.reset()
+    CMDS.returns["xform"] = lambda nodes, **kwargs: (
+        IDENTITY * (len(nodes) if isinstance(nodes, list) else 1) if kwargs.get("query")
+        else None)
+    CMDS.returns["undoInfo"] = lambda *args, **kwargs: None
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        build()
+    seconds = time.perf_counter() - start
+    edits = {command: count for command, count in CMDS.counts().items()
+             if command not in ("undoInfo", "refresh", "inViewMessage")}
+    return sum(edits.values()), edits, seconds
+
+
+def main():
+    rows = []
+    breakdown = {}
+    for label, count, length in CASES:
+        joints = count * length
+        builds = {
+            "legacy": lambda: [legacy_fk(chain) for chain in chains(count, length)],
+            "constraint": lambda: create_fk_chains(chains(count, length), mode="constraint"),
+            "matrix": lambda: create_fk_chains(chains(count, length), mode="matrix"),
+        }
+        for name, build in builds.items():
+            total, edits, seconds = measure(build)
+            rows.append([label, joints, name, total, f"{total / joints:.2f}",
+                         f"{seconds * 1000:.1f}"])
+            if label == "both hands":
+                breakdown[name] = edits
+    print_table(["case", "joints", "builder", "cmds", "cmds/joint", "ms"], rows)
+
+    print()
+    print("Commands by name, both hands:")
+    for name, edits in breakdown.items():
+        print(f"  {name}: " + ", ".join(f"{command} {count}"
+                                       for command, count in sorted(edits.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Times cold imports of the package in fresh interpreters: the headless paths batch
+workers take and the GUI path, and checks that the headless paths never load Qt.
+Maya is replaced by the stand-ins of tests/fake_maya.py, so the numbers leave out
+the cost of importing maya itself.
+
+    python benchmarks/bench_import.py [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from bench_utils import fake_maya, print_table
+
+
+TESTS = os.path.dirname(os.path.abspath(fake_maya.__file__))
+
+QT_PACKAGES = ("PySide2", "PySide6", "PyQt5", "PyQt6", "shiboken2", "shiboken6")
+
+PACKAGE = "auto_rigging_tool_box.rigging_tools"
+
+CASES = (
+    ("registry only", f"import {PACKAGE}"),
+    ("one tool (create_fk_chains)",
+     f"import {PACKAGE} as rt; rt.get_tool('create_fk_chains')"),
+    ("rig pipeline", f"import {PACKAGE}.rig_pipeline"),
+    ("every tool", f"import {PACKAGE} as rt; [rt.get_tool(name) for name in rt.TOOLS]"),
+    ("gui", f"import {PACKAGE}.rigging_gui"),
+)
+
+RUNNER = """
+import json, sys, time
+sys.path[:0] = {paths!r}
+import fake_maya
+fake_maya.install()
+before = set(sys.modules)
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+loaded = set(sys.modules) - before
+print(json.dumps({{"seconds": seconds, "modules": len(loaded),
+                  "qt": sorted(name for name in loaded if name.split(".")[0] in {qt!r})}}))
+"""
+
+
+def cold_import(statement):
+    """
+    Runs an import statement in a fresh interpreter.
+
+    :return: Seconds, number of modules loaded and Qt modules loaded, or the error.
+    :rtype: dict
+    """
+    source = RUNNER.format(paths=[TESTS, fake_maya.package_path()], statement=statement,
+                           qt=QT_PACKAGES)
+    process = subprocess.run([sys.executable, "-c", source], capture_output=True, text=True)
+    if process.returncode:
+        return {"error": process.stderr.strip().splitlines()[-1]}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def main(runs=5):
+    rows = []
+    for label, statement in CASES:
+        results = [cold_import(statement) for _ in range(runs)]
+        if "error" in results[0]:
+            rows.append([label, "-", "-", f"skipped: {results[0]['error']}"])
+            continue
+        median = statistics.median(result["seconds"] for result in results)
+        qt = ", ".join(results[0]["qt"]) or "no"
+        rows.append([label, f"{median * 1000:.1f}", results[0]["modules"], qt])
+    print(f"Cold import, median of {runs} fresh interpreters")
+    print_table(["path", "ms", "modules loaded", "Qt loaded"], rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
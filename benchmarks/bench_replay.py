@@ -0,0 +1,80 @@
+"""
+Counts the maya commands of a recorded tool session against the replay script
+compiled from it. The session clicks the FK tool on each selected chain and colors
+the new controls twice, like an artist changing their mind. The replay drops the
+queries, selection, messages and undo calls, and keeps one color per shape. With
+the fake cmds the times only show the Python side of each command.
+
+    python benchmarks/bench_replay.py
+"""
+import contextlib
+import io
+import time
+
+from bench_utils import CMDS, print_table
+
+from auto_rigging_tool_box.rigging_tools import curve_utils, fk_utils
+from auto_rigging_tool_box.rigging_tools.record_utils import record_session
+from auto_rigging_tool_box.rigging_tools.trace_utils import tool_modules
+
+
+IDENTITY = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+CASES = (
+    ("one finger", 1, 4),
+    ("both hands", 10, 4),
+    ("tail", 1, 200),
+)
+
+
+def chains(count, length):
+    return [[f"chain{c}_jnt{j}" for j in range(length)] for c in range(count)]
+
+
+def session(count, length):
+    """
+    Builds and colors FK controls chain by chain, the way the GUI buttons do.
+    """
+    for chain in chains(count, length):
+        CMDS.returns["ls"] = chain
+        fk_utils.create_fk_controls()
+        CMDS.returns["ls"] = [f"{jnt}_FK_CTRL" for jnt in chain]
+        curve_utils.set_override_color(17)
+        curve_utils.set_override_color(6)
+
+
+def measure(run):
+    """
+    Runs code against a fresh fake scene and returns its command count and seconds.
+    """
+    CMDS.reset()
+    CMDS.returns["xform"] = lambda nodes, **kwargs: (
+        IDENTITY * (len(nodes) if isinstance(nodes, list) else 1) if kwargs.get("query")
+        else None)
+    CMDS.returns["undoInfo"] = lambda *args, **kwargs: None
+    CMDS.returns["listRelatives"] = lambda node, **kwargs: [f"{node}Shape"]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run()
+    return len(CMDS.calls), time.perf_counter() - start
+
+
+def main():
+    modules = tool_modules()
+    rows = []
+    for label, count, length in CASES:
+        session_cmds, session_seconds = measure(lambda: session(count, length))
+
+        with record_session(modules) as recorder:
+            measure(lambda: session(count, length))
+        script = compile(recorder.compile(), "replay", "exec")
+        replay_cmds, replay_seconds = measure(lambda: exec(script, {}))
+        rows.append([label, count * length, session_cmds, len(recorder.calls), replay_cmds,
+                     f"{session_cmds / replay_cmds:.1f}x", f"{session_seconds * 1000:.1f}",
+                     f"{replay_seconds * 1000:.1f}"])
+    print_table(["case", "joints", "session cmds", "recorded edits", "replay cmds", "fewer",
+                 "session ms", "replay ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Counts the maya commands the transform resets issue, the reset engine against the
+per-axis setAttr loop it replaced.
+
+    python benchmarks/bench_reset_transforms.py
+"""
+import time
+
+from bench_utils import CMDS, print_table
+
+from auto_rigging_tool_box.rigging_tools import gen_utils
+from auto_rigging_tool_box.rigging_tools.gen_utils import AXES, RESET_VALUES, reset_transforms
+
+
+CHANNEL_SETS = (("translate",), ("rotate",), ("translate", "rotate"), ("scale",))
+
+
+def legacy_reset(nodes, channels):
+    """
+    The reset loop before the engine: one setAttr per node and axis.
+    """
+    for node in nodes:
+        for channel in channels:
+            for axis, value in zip(AXES, RESET_VALUES[channel]):
+                CMDS.setAttr(f"{node}.{channel}{axis}", value)
+
+
+def scene(count, blocked_every=0):
+    """
+    Fakes count controls under a rig group, every blocked_every-th one with a
+    locked translateX and the next one with a connected rotate. The lock state
+    stands in for the engine's API pass, connections list short owner names.
+    """
+    nodes = [f"ctrl_{i}" for i in range(count)]
+    locked = {f"|rig|{node}" for node in nodes[::blocked_every]} if blocked_every else set()
+    connected = nodes[1::blocked_every] if blocked_every else []
+    CMDS.reset()
+    CMDS.returns["ls"] = lambda names, **kwargs: [
+        "|rig|" + name.rsplit("|", 1)[-1] for name in names]
+    CMDS.returns["listConnections"] = lambda *args, **kwargs: [
+        plug for node in connected for plug in (f"{node}.rotate", "driver.output")]
+    gen_utils.get_locked_channels = lambda paths, channels: {
+        path: {"translateX"} if path in locked else set() for path in paths}
+    return nodes
+
+
+def measure(function, nodes, channels):
+    """
+    Runs a reset and returns its command count, scene edit count and seconds. The
+    engine's API lock pass counts as one command.
+    """
+    CMDS.calls = []
+    start = time.perf_counter()
+    function(nodes, channels)
+    seconds = time.perf_counter() - start
+    counts = CMDS.counts()
+    api_passes = 1 if function is reset_transforms else 0
+    return len(CMDS.calls) + api_passes, counts["setAttr"] + counts["xform"], seconds
+
+
+def main():
+    rows = []
+    for count in (100, 2000):
+        for blocked_every in (0, 10):
+            for channels in CHANNEL_SETS:
+                nodes = scene(count, blocked_every)
+                legacy, _, _ = measure(legacy_reset, nodes, channels)
+                engine, edits, seconds = measure(reset_transforms, nodes, channels)
+                rows.append([count, f"1/{blocked_every}" if blocked_every else "none",
+                             "+".join(channels), legacy, engine, edits,
+                             f"{legacy / engine:.1f}x", f"{seconds * 1000:.1f}"])
+    print_table(["nodes", "blocked", "channels", "legacy cmds", "engine cmds", "engine edits",
+                 "fewer", "engine ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
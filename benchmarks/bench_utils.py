@@ -0,0 +1,27 @@
+"""
+Shared setup of the benchmarks: imports the package against the call-counting
+maya.cmds stand-in of tests/fake_maya.py and prints result tables.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "tests"))
+
+import fake_maya  # noqa: E402
+
+
+sys.path.insert(0, fake_maya.package_path())
+CMDS = fake_maya.install()
+
+
+def print_table(headers, rows):
+    """
+    Prints rows as a plain text table.
+    """
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(header)), *(len(row[i]) for row in rows))
+              for i, header in enumerate(headers)]
+    print("  ".join(str(header).rjust(width) for header, width in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
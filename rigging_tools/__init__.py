@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author: Kris Hernandez
+
+:synopsis:
+Package of the rigging tools, with a lazy tool registry.
+
+:description:
+Importing the package loads none of the tool modules. Tools are listed in a registry
+by the module that defines them and that module is only imported the first time the
+tool is asked for, either with get_tool or as an attribute of the package. Batch
+scripts and the GUI only pay for the tools they use, and nothing here needs Qt.
+
+:applications:
+    Maya
+
+:see_also:
+rigging_tools.rigging_gui
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Built-in
+import importlib
+
+# Third party
+
+# Internal
+
+# External
+
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+TOOLS = {
+    # General utils
+    "freeze_transforms": "gen_utils",
+    "delete_history": "gen_utils",
+    "center_pivot": "gen_utils",
+    "mirror_joints": "gen_utils",
+    "orient_joints": "gen_utils",
+    "reset_translation": "gen_utils",
+    "reset_rotation": "gen_utils",
+    "reset_translation_rotation": "gen_utils",
+    "reset_scale": "gen_utils",
+    "rename_objects_by_type": "gen_utils",
+    # Curve utils
+    "set_override_color": "curve_utils",
+    "apply_side_colors": "curve_utils",
+    "create_control": "curve_utils",
+    "create_controls": "curve_utils",
+    "get_shape": "curve_utils",
+    "list_shapes": "curve_utils",
+    # Limb utils
+    "FK_MODES": "fk_utils",
+    "create_fk_chains": "fk_utils",
+    "create_fk_controls": "fk_utils",
+    "create_ik_limb": "ik_utils",
+    "create_ik_controls": "ik_utils",
+    "create_ik_limbs": "ik_utils",
+    "create_pole_vector_limbs": "ik_utils",
+    "create_squash_stretch_chains": "squash_stretch_utils",
+    "create_squash_stretch_limb": "squash_stretch_utils",
+    # Skin utils
+    "bind_skin": "skin_utils",
+    "delete_skin": "skin_utils",
+    "mirror_skin_weights": "skin_utils",
+    "export_skin_weights": "skin_utils",
+    "import_skin_weights": "skin_utils",
+    "prune_skin_weights": "skin_utils",
+    "smooth_skin_weights": "skin_utils",
+    # Pipeline
+    "run_rig_spec": "rig_pipeline",
+    "load_rig_spec": "rig_pipeline",
+    # Session recording
+    "start_recording": "record_utils",
+    "stop_recording": "record_utils",
+}
+
+
+def get_tool(name):
+    """
+    Returns a tool, importing its module on first use.
+
+    :param name: Name of the tool, see TOOLS.
+    :type name: str
+
+    :return: The tool function or constant.
+    :rtype: object
+    """
+    if name not in TOOLS:
+        raise KeyError(f"Unknown tool '{name}'.")
+    module = importlib.import_module(f"{__name__}.{TOOLS[name]}")
+    return getattr(module, name)
+
+
+def __getattr__(name):
+    if name in TOOLS:
+        return get_tool(name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(TOOLS))
@@ -0,0 +1,389 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author: Kris Hernandez
+
+:synopsis:
+Module for building many scene files in parallel.
+
+:description:
+This module contains the batch runner. It takes a directory of scene files and a rig
+spec, then fans the scenes out over a pool of worker processes. Each worker runs its
+own interpreter with maya.standalone and builds one scene at a time in a fresh scene,
+through the rig pipeline. Progress is streamed as files finish, failed files are
+retried and every result goes into one JSON summary report. The mock backend runs
+the same flow without Maya, for checking recipes and the runner itself.
+
+Example::
+
+    mayapy -m auto_rigging_tool_box.rigging_tools.batch_runner scenes/ hero_spec.json
+        --output built/ --workers 32 --retries 1 --report report.json
+
+:applications:
+    Maya
+    Python
+
+:see_also:
+rigging_tools.rig_pipeline
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Built-in
+import argparse
+import collections
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+import time
+
+# Third party
+
+# Internal
+
+# External
+
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+SCENE_EXTENSIONS = (".ma", ".mb")
+
+BACKENDS = ("maya", "mock")
+
+
+def find_scenes(directory, extensions=SCENE_EXTENSIONS):
+    """
+    Lists the scene files of a directory, sorted by name.
+
+    :param directory: Directory holding the scene files.
+    :type directory: str
+    :param extensions: Scene file extensions to pick up.
+    :type extensions: tuple(str)
+
+    :return: Paths of the scene files.
+    :rtype: list[str]
+    """
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.lower().endswith(extensions))
+
+
+def output_path(scene, output_dir):
+    """
+    Returns where the built version of a scene is saved, None to leave it unsaved.
+    """
+    if not output_dir:
+        return None
+    return os.path.join(output_dir, os.path.basename(scene))
+
+
+def _init_maya_worker():
+    """
+    Starts maya.standalone once per worker process.
+    """
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+
+def build_scene_maya(scene, spec_path, output=None):
+    """
+    Builds one scene in the current Maya session, starting from a fresh scene.
+
+    :param scene: Scene file to open.
+    :type scene: str
+    :param spec_path: Rig spec to build.
+    :type spec_path: str
+    :param output: Path to save the built scene to, None to leave it unsaved.
+    :type output: str
+
+    :return: Build report of the rig pipeline.
+    :rtype: dict
+    """
+    import maya.cmds as cmds
+    from auto_rigging_tool_box.rigging_tools.rig_pipeline import load_rig_spec, run_rig_spec
+
+    cmds.file(new=True, force=True)
+    cmds.file(scene, open=True, force=True)
+    report = run_rig_spec(load_rig_spec(spec_path))
+
+    if output and not report["failed"]:
+        cmds.file(rename=output)
+        file_type = "mayaAscii" if output.lower().endswith(".ma") else "mayaBinary"
+        cmds.file(save=True, force=True, type=file_type)
+    return report
+
+
+def build_scene_mock(scene, spec_path, output=None):
+    """
+    Stands in for build_scene_maya without Maya. It reads the scene and the spec
+    and reports every component as built, so recipes and the runner can be checked
+    on machines without Maya. Scenes containing "MOCK_FAIL" fail, scenes containing
+    "MOCK_CRASH" kill the worker like a Maya crash and scenes containing "MOCK_HANG"
+    never finish.
+    """
+    with open(spec_path, "r") as spec_file:
+        spec = json.load(spec_file)
+    with open(scene, "r", errors="ignore") as scene_file:
+        contents = scene_file.read()
+    if "MOCK_CRASH" in contents:
+        os._exit(139)
+    if "MOCK_HANG" in contents:
+        while True:
+            time.sleep(1.0)
+    if "MOCK_FAIL" in contents:
+        raise RuntimeError(f"Mock failure requested by '{scene}'.")
+
+    report = {
+        "name": spec.get("name", "rig"),
+        "seconds": 0.0,
+        "failed": [],
+        "stages": [{"name": component["name"], "type": component["type"],
+                    "status": "done", "seconds": 0.0}
+                   for component in spec.get("components", [])],
+    }
+    if output:
+        with open(output, "w") as output_file:
+            output_file.write(f"// built by mock backend from {scene}\n")
+    return report
+
+
+def run_task(backend, scene, spec_path, output=None):
+    """
+    Worker entry point, builds one scene and never raises.
+
+    :return: Result with scene, status, seconds, output and error or report keys.
+    :rtype: dict
+    """
+    build = build_scene_maya if backend == "maya" else build_scene_mock
+    start = time.perf_counter()
+    result = {"scene": scene, "status": "done", "output": output, "pid": os.getpid()}
+    try:
+        report = build(scene, spec_path, output)
+        result["report"] = report
+        if report["failed"]:
+            result["status"] = "failed"
+            result["error"] = f"components failed: {', '.join(report['failed'])}"
+    except Exception as error:
+        result["status"] = "failed"
+        result["error"] = f"{type(error).__name__}: {error}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def _worker_loop(connection, backend):
+    """
+    Worker process entry point, builds the scenes it is sent until it gets None.
+    """
+    if backend == "maya":
+        _init_maya_worker()
+    while True:
+        task = connection.recv()
+        if task is None:
+            break
+        connection.send(run_task(backend, *task))
+
+
+def run_batch(scenes, spec_path, output_dir=None, workers=None, retries=1, backend="maya",
+              executable=None, timeout=None, progress=print):
+    """
+    Builds many scenes over a pool of worker processes.
+
+    Every worker is a separate interpreter started with spawn, so no Maya state is
+    shared between processes. Workers build one scene at a time and are reused. A
+    worker that dies, like on a maya.standalone crash, or runs past the timeout only
+    fails the scene it was building and is replaced by a fresh one. Failed files are
+    submitted again up to retries times.
+
+    :param scenes: Scene files to build.
+    :type scenes: list[str]
+    :param spec_path: Rig spec to build in every scene.
+    :type spec_path: str
+    :param output_dir: Directory to save the built scenes to, None to leave them unsaved.
+    :type output_dir: str
+    :param workers: Number of worker processes, the CPU count if None.
+    :type workers: int
+    :param retries: Number of extra attempts for a failed file.
+    :type retries: int
+    :param backend: maya, or mock to run without Maya.
+    :type backend: str
+    :param executable: Python executable of the workers, like the path of mayapy.
+    :type executable: str
+    :param timeout: Seconds one attempt may take, worker startup included. No limit if None.
+    :type timeout: float
+    :param progress: Called with one line of text per finished attempt.
+    :type progress: function
+
+    :return: Summary with counts, seconds and a result per scene.
+    :rtype: dict
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', use one of {', '.join(BACKENDS)}.")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    context = multiprocessing.get_context("spawn")
+    if executable:
+        context.set_executable(executable)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(scenes) or 1))
+
+    start = time.perf_counter()
+    results = {}
+    attempts = dict.fromkeys(scenes, 0)
+    queue = collections.deque(scenes)
+    idle = []
+    busy = {}
+
+    def finish(worker, result):
+        scene = busy.pop(worker)["scene"]
+        result["attempts"] = attempts[scene]
+        results[scene] = result
+
+        retry = result["status"] != "done" and attempts[scene] <= retries
+        done_count = sum(1 for r in results.values() if r["status"] == "done")
+        line = (f"[{done_count}/{len(scenes)}] {os.path.basename(scene)} "
+                f"{result['status']} in {result['seconds']:.2f}s")
+        if result["status"] != "done":
+            line += f" ({result['error']})"
+        progress(line + (", retrying" if retry else ""))
+        if retry:
+            queue.append(scene)
+
+    def fail(worker, error):
+        # The worker cannot be trusted anymore, a fresh one takes its place
+        task = busy[worker]
+        worker.stop(force=True)
+        finish(worker, {"scene": task["scene"], "status": "failed", "output": task["output"],
+                        "pid": worker.process.pid, "error": error,
+                        "seconds": time.perf_counter() - task["start"]})
+
+    try:
+        while queue or busy:
+            while queue and len(busy) < workers:
+                worker = idle.pop() if idle else _Worker(context, backend)
+                scene = queue.popleft()
+                attempts[scene] += 1
+                output = output_path(scene, output_dir)
+                busy[worker] = {"scene": scene, "output": output, "start": time.perf_counter()}
+                worker.send((scene, spec_path, output))
+
+            wait = None
+            if timeout is not None:
+                deadline = min(task["start"] for task in busy.values()) + timeout
+                wait = max(0.0, deadline - time.perf_counter())
+            handles = [handle for worker in busy
+                       for handle in (worker.connection, worker.process.sentinel)]
+            multiprocessing.connection.wait(handles, timeout=wait)
+
+            now = time.perf_counter()
+            for worker, task in list(busy.items()):
+                if worker.connection.poll():
+                    try:
+                        result = worker.connection.recv()
+                    except (EOFError, OSError):
+                        fail(worker, f"worker exited with code {worker.process.exitcode}")
+                        continue
+                    finish(worker, result)
+                    idle.append(worker)
+                elif not worker.process.is_alive():
+                    fail(worker, f"worker exited with code {worker.process.exitcode}")
+                elif timeout is not None and now - task["start"] >= timeout:
+                    fail(worker, f"timed out after {timeout:g}s")
+    finally:
+        for worker in idle + list(busy):
+            worker.stop(force=worker in busy)
+
+    ordered = [results[scene] for scene in scenes]
+    return {
+        "spec": spec_path,
+        "backend": backend,
+        "workers": workers,
+        "seconds": time.perf_counter() - start,
+        "done": sum(1 for result in ordered if result["status"] == "done"),
+        "failed": [result["scene"] for result in ordered if result["status"] != "done"],
+        "results": ordered,
+    }
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    :return: Exit code, 1 if any scene failed.
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description="Build a rig spec into many scenes in parallel.")
+    parser.add_argument("scenes", help="Directory of .ma/.mb scene files.")
+    parser.add_argument("spec", help="Rig spec to build in every scene.")
+    parser.add_argument("--output", help="Directory to save the built scenes to.")
+    parser.add_argument("--workers", type=int, help="Number of worker processes.")
+    parser.add_argument("--retries", type=int, default=1, help="Extra attempts per failed file.")
+    parser.add_argument("--backend", choices=BACKENDS, default="maya")
+    parser.add_argument("--executable", help="Python executable of the workers, like mayapy.")
+    parser.add_argument("--timeout", type=float, help="Seconds one scene may take.")
+    parser.add_argument("--report", help="Path to write the JSON summary report to.")
+    args = parser.parse_args(argv)
+
+    scenes = find_scenes(args.scenes)
+    if not scenes:
+        print(f"No scene files found in '{args.scenes}'.")
+        return 1
+
+    summary = run_batch(scenes, args.spec, output_dir=args.output, workers=args.workers,
+                        retries=args.retries, backend=args.backend, executable=args.executable,
+                        timeout=args.timeout)
+    print(f"Built {summary['done']}/{len(scenes)} scenes with {summary['workers']} workers "
+          f"in {summary['seconds']:.2f}s")
+    for scene in summary["failed"]:
+        print(f"  failed: {scene}")
+
+    if args.report:
+        with open(args.report, "w") as report_file:
+            json.dump(summary, report_file, indent=4, default=str)
+    return 1 if summary["failed"] else 0
+
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
+
+class _Worker(object):
+    """
+    One worker process and the pipe its tasks and results go through.
+    """
+
+    def __init__(self, context, backend):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker_loop, args=(child, backend), daemon=True)
+        self.process.start()
+        child.close()
+
+    def send(self, task):
+        """
+        Sends a (scene, spec_path, output) task, a dead worker shows up as a failed task.
+        """
+        try:
+            self.connection.send(task)
+        except (BrokenPipeError, OSError):
+            pass
+
+    def stop(self, force=False):
+        """
+        Stops the worker, killing it when force is on or it does not exit in time.
+        """
+        if not force:
+            self.send(None)
+            self.process.join(5.0)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
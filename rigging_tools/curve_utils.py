@@ -14,6 +14,9 @@ Module for custom curve utils.
 :description:
 This module contains custom curve utils including: creating custom curves, overwriting curve
 colors and setting default colors for a basic rigging workflow. 
+Control shapes are data, read lazily from the control_shapes.json library. Adding a shape
+to the library makes it available to create_control without any new code.
+apply_side_colors colors every control in the scene by side in one pass.
 
 
 :applications:
@@ -27,16 +30,18 @@ N/A
 #----------------------------------------------------------------------------- IMPORTS --#
 
 # Built-in
+import functools
+import json
 import os
+import re
 
 # Third party
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
-try:
-    from PyQt5 import QtCore, QtGui, QtWidgets
-except ImportError:
-    from PySide2 import QtGui, QtCore, QtWidgets
+import numpy as np
 
 # Internal
+from auto_rigging_tool_box.rigging_tools.undo_utils import show_message, transaction
 
 # External
 
@@ -60,18 +65,447 @@ def set_override_color(color_index):
             cmds.setAttr(f"{shape}.overrideEnabled", 1)
             cmds.setAttr(f"{shape}.overrideColor", color_index)
 
-def create_curve_circle():
+
+# Ordered (regular expression, color index) rules, matched against the control name
+SIDE_COLOR_RULES = (
+    (r"^L_", 6),    # Blue
+    (r"^R_", 13),   # Red
+    (r"^C_", 17),   # Yellow
+)
+
+
+def get_override_colors(shapes):
     """
-    Creates a NURBS circle in the scene.
+    Reads the drawing override state of many shapes through the API.
+
+    :param shapes: Names of the shapes.
+    :type shapes: list[str]
+
+    :return: Per shape overrideEnabled, overrideColor and overrideRGBColors values.
+    :rtype: tuple(numpy.ndarray)
+    """
+    enabled = np.zeros(len(shapes), dtype=bool)
+    colors = np.zeros(len(shapes), dtype=int)
+    rgb = np.zeros(len(shapes), dtype=bool)
+
+    selection = om.MSelectionList()
+    for shape in shapes:
+        selection.add(shape)
+    for i in range(selection.length()):
+        node = om.MFnDependencyNode(selection.getDependNode(i))
+        enabled[i] = node.findPlug("overrideEnabled", False).asBool()
+        colors[i] = node.findPlug("overrideColor", False).asInt()
+        rgb[i] = node.findPlug("overrideRGBColors", False).asBool()
+    return enabled, colors, rgb
+
+
+def classify_controls(names, rules=SIDE_COLOR_RULES, default=None):
+    """
+    Picks the color of each control from the first rule its name matches.
+
+    :param names: Short names of the controls.
+    :type names: list[str]
+    :param rules: Ordered (regular expression, color index) rules.
+    :type rules: tuple(tuple(str, int))
+    :param default: Color of controls no rule matches, None to leave them as they are.
+    :type default: int
+
+    :return: Color index per control, -1 for controls to leave as they are.
+    :rtype: numpy.ndarray
+    """
+    compiled = [(re.compile(pattern), color) for pattern, color in rules]
+    targets = np.full(len(names), -1 if default is None else default, dtype=int)
+    for i, name in enumerate(names):
+        for pattern, color in compiled:
+            if pattern.search(name):
+                targets[i] = color
+                break
+    return targets
+
+
+@transaction("Apply Side Colors")
+def apply_side_colors(rules=SIDE_COLOR_RULES, default=None, dry_run=False):
+    """
+    Colors every control curve in the scene by its side in one pass.
+
+    All curve shapes come from one ls query, are classified by the name of their
+    transform and only the shapes not showing the right color yet get a setAttr.
+
+    :param rules: Ordered (regular expression, color index) rules.
+    :type rules: tuple(tuple(str, int))
+    :param default: Color of controls no rule matches, None to leave them as they are.
+    :type default: int
+    :param dry_run: Only count the changes, without editing the scene.
+    :type dry_run: bool
+
+    :return: Number of shapes recolored (or to recolor on a dry run) per color index.
+    :rtype: dict
+    """
+    shapes = cmds.ls(type="nurbsCurve", long=True, noIntermediate=True) or []
+    if not shapes:
+        cmds.warning("No control curves found in the scene.")
+        return {}
+
+    names = [shape.split("|")[-2] for shape in shapes]
+    targets = classify_controls(names, rules, default)
+    enabled, colors, rgb = get_override_colors(shapes)
+
+    wanted = targets >= 0
+    needs_enable = wanted & ~enabled
+    needs_index = wanted & rgb
+    needs_color = wanted & (colors != targets)
+    changed = needs_enable | needs_index | needs_color
+
+    if not dry_run:
+        for i in np.flatnonzero(changed):
+            if needs_enable[i]:
+                cmds.setAttr(f"{shapes[i]}.overrideEnabled", 1)
+            if needs_index[i]:
+                cmds.setAttr(f"{shapes[i]}.overrideRGBColors", 0)
+            if needs_color[i]:
+                cmds.setAttr(f"{shapes[i]}.overrideColor", int(targets[i]))
+
+    counts = {}
+    for color in targets[changed]:
+        counts[int(color)] = counts.get(int(color), 0) + 1
+
+    total = int(changed.sum())
+    skipped = int(wanted.sum()) - total
+    verb = "would recolor" if dry_run else "recolored"
+    print(f"Side colors: {verb} {total} of {len(shapes)} curve shapes, "
+          f"{skipped} already right, {len(shapes) - int(wanted.sum())} unmatched.")
+    if not dry_run:
+        show_message(f"✅ Side colors applied to <hl>{total}</hl> curve shapes")
+    return counts
+
+
+SHAPE_LIBRARY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "control_shapes.json")
+
+
+@functools.lru_cache(maxsize=None)
+def load_shape_library(library=SHAPE_LIBRARY):
+    """
+    Reads a control shape library file. The file is only read the first time it is
+    needed, shapes themselves are converted on request by get_shape.
+
+    :param library: Path to the shape library json file.
+    :type library: str
+
+    :return: Raw shape entries by shape name.
+    :rtype: dict
+    """
+    with open(library, "r") as library_file:
+        return json.load(library_file)
+
+
+@functools.lru_cache(maxsize=None)
+def get_shape(shape, library=SHAPE_LIBRARY):
+    """
+    Returns the curve data of a library shape, memoized per shape. The CVs are held
+    as a read-only Nx3 array, copy it before changing it.
+
+    :param shape: Name of the shape in the library.
+    :type shape: str
+    :param library: Path to the shape library json file.
+    :type library: str
+
+    :return: Shape data with label, group, degree, periodic and points keys.
+    :rtype: dict
+    """
+    entries = load_shape_library(library)
+    if shape not in entries:
+        raise KeyError(f"Unknown control shape '{shape}'. Available: {', '.join(entries)}")
+
+    entry = entries[shape]
+    points = np.array(entry["points"], dtype=float).reshape(-1, 3)
+    points.flags.writeable = False
+
+    return {
+        "label": entry.get("label", shape),
+        "group": entry.get("group", "Custom Shapes"),
+        "degree": entry.get("degree", 1),
+        "periodic": entry.get("periodic", False),
+        "points": points,
+    }
+
+
+def list_shapes(group=None, library=SHAPE_LIBRARY, details=False):
+    """
+    Lists the shape names of a library, in file order. Details come straight from
+    the library entries, no shape is converted, so pickers can list every shape
+    cheaply.
+
+    :param group: Only list shapes of this group.
+    :type group: str
+    :param library: Path to the shape library json file.
+    :type library: str
+    :param details: List (name, label, group) per shape instead of the names.
+    :type details: bool
+
+    :return: Shape names, or (name, label, group) per shape with details on.
+    :rtype: list[str] or list[tuple(str)]
+    """
+    entries = load_shape_library(library)
+    shapes = [(name, entry.get("label", name), entry.get("group", "Custom Shapes"))
+              for name, entry in entries.items()]
+    shapes = [shape for shape in shapes if group is None or shape[2] == group]
+    return shapes if details else [shape[0] for shape in shapes]
+
+
+def clear_shape_cache():
+    """
+    Drops the cached libraries and shapes, so edited library files are read again.
+    """
+    get_shape.cache_clear()
+    load_shape_library.cache_clear()
+
+
+# Rotations taking the library up axis (+Y) onto each axis, rows are the images of X, Y, Z
+AXIS_ORIENTS = {
+    "y": ((1, 0, 0), (0, 1, 0), (0, 0, 1)),
+    "-y": ((1, 0, 0), (0, -1, 0), (0, 0, -1)),
+    "x": ((0, -1, 0), (1, 0, 0), (0, 0, 1)),
+    "-x": ((0, 1, 0), (-1, 0, 0), (0, 0, 1)),
+    "z": ((1, 0, 0), (0, 0, 1), (0, -1, 0)),
+    "-z": ((1, 0, 0), (0, 0, -1), (0, 1, 0)),
+}
+
+MIRROR_AXES = {"x": 0, "y": 1, "z": 2}
+
+
+def euler_to_matrix(rotation):
+    """
+    Builds the rotation matrix of XYZ euler angles, for row vector points.
+
+    :param rotation: Rotation in degrees around X, Y and Z.
+    :type rotation: tuple(float)
+
+    :return: 3x3 rotation matrix.
+    :rtype: numpy.ndarray
+    """
+    rx, ry, rz = np.radians(rotation)
+    cx, sx = np.cos(rx), np.sin(rx)
+    cy, sy = np.cos(ry), np.sin(ry)
+    cz, sz = np.cos(rz), np.sin(rz)
+
+    rot_x = np.array(((1, 0, 0), (0, cx, sx), (0, -sx, cx)))
+    rot_y = np.array(((cy, 0, -sy), (0, 1, 0), (sy, 0, cy)))
+    rot_z = np.array(((cz, sz, 0), (-sz, cz, 0), (0, 0, 1)))
+    return rot_x @ rot_y @ rot_z
+
+
+def center_points(points):
+    """
+    Moves points so the center of their bounding box sits at the origin.
+
+    :param points: Nx3 array of CV positions.
+    :type points: numpy.ndarray
+
+    :return: Centered points.
+    :rtype: numpy.ndarray
+    """
+    return points - (points.min(axis=0) + points.max(axis=0)) * 0.5
+
+
+def scale_points(points, scale):
+    """
+    Scales points around the origin.
+
+    :param points: Nx3 array of CV positions.
+    :type points: numpy.ndarray
+    :param scale: Uniform scale, or a scale per axis.
+    :type scale: float or tuple(float)
+
+    :return: Scaled points.
+    :rtype: numpy.ndarray
+    """
+    return points * np.asarray(scale, dtype=float)
+
+
+def rotate_points(points, rotation):
+    """
+    Rotates points around the origin.
+
+    :param points: Nx3 array of CV positions.
+    :type points: numpy.ndarray
+    :param rotation: Rotation in degrees around X, Y and Z.
+    :type rotation: tuple(float)
+
+    :return: Rotated points.
+    :rtype: numpy.ndarray
+    """
+    return points @ euler_to_matrix(rotation)
+
+
+def mirror_points(points, axis="x"):
+    """
+    Mirrors points across the plane normal to the given axis.
+
+    :param points: Nx3 array of CV positions.
+    :type points: numpy.ndarray
+    :param axis: Axis to flip, x, y or z.
+    :type axis: str
+
+    :return: Mirrored points.
+    :rtype: numpy.ndarray
+    """
+    mirrored = np.array(points, dtype=float)
+    mirrored[:, MIRROR_AXES[axis.lower()]] *= -1.0
+    return mirrored
+
+
+def orient_points(points, axis="y"):
+    """
+    Turns a shape authored facing +Y so it faces the given axis.
+
+    :param points: Nx3 array of CV positions.
+    :type points: numpy.ndarray
+    :param axis: Target axis, x, y or z with an optional minus sign.
+    :type axis: str
+
+    :return: Oriented points.
+    :rtype: numpy.ndarray
+    """
+    return points @ np.array(AXIS_ORIENTS[axis.lower()], dtype=float)
+
+
+def fit_points(points, radius):
+    """
+    Scales points uniformly so the farthest one is radius away from the origin.
+
+    :param points: Nx3 array of CV positions.
+    :type points: numpy.ndarray
+    :param radius: Target radius.
+    :type radius: float
+
+    :return: Fitted points.
+    :rtype: numpy.ndarray
+    """
+    extent = np.linalg.norm(points, axis=1).max()
+    if extent == 0.0:
+        return np.array(points, dtype=float)
+    return points * (radius / extent)
+
+
+def transform_shape_points(points, center=True, axis=None, rotate=None, mirror=None,
+                           scale=None, radius=None):
+    """
+    Applies the control shape edits to a CV array, in the order center, orient,
+    rotate, mirror, scale and fit.
+
+    :param points: Nx3 array of CV positions.
+    :type points: numpy.ndarray
+    :param center: Center the shape on the origin.
+    :type center: bool
+    :param axis: Axis the shape should face, see orient_points.
+    :type axis: str
+    :param rotate: Rotation in degrees around X, Y and Z.
+    :type rotate: tuple(float)
+    :param mirror: Axis to mirror across.
+    :type mirror: str
+    :param scale: Uniform scale, or a scale per axis.
+    :type scale: float or tuple(float)
+    :param radius: Fit the shape to this radius.
+    :type radius: float
+
+    :return: Transformed points.
+    :rtype: numpy.ndarray
+    """
+    points = np.asarray(points, dtype=float)
+    if center:
+        points = center_points(points)
+    if axis:
+        points = orient_points(points, axis)
+    if rotate is not None:
+        points = rotate_points(points, rotate)
+    if mirror:
+        points = mirror_points(points, mirror)
+    if scale is not None:
+        points = scale_points(points, scale)
+    if radius:
+        points = fit_points(points, radius)
+    return points
+
+
+def _curve_flags(shape, library, **edits):
+    """
+    Builds the cmds.curve flags of a library shape with its edits applied.
+
+    :param shape: Name of the shape in the library.
+    :type shape: str
+    :param library: Path to the shape library json file.
+    :type library: str
+
+    :return: Keyword arguments for cmds.curve.
+    :rtype: dict
+    """
+    data = get_shape(shape, library)
+    degree = data["degree"]
+    points = transform_shape_points(data["points"], **edits)
+
+    flags = {"degree": degree}
+    if data["periodic"]:
+        # Periodic curves repeat their first CVs and need a matching knot vector
+        points = np.concatenate((points, points[:degree]))
+        flags["periodic"] = True
+        flags["knot"] = list(range(-(degree - 1), len(points)))
+    flags["point"] = [tuple(point) for point in points.tolist()]
+    return flags
+
+
+def create_control(shape, name=None, library=SHAPE_LIBRARY, **edits):
+    """
+    Creates a control curve from a library shape with one cmds.curve call. Shape
+    edits are done on the CV array first, so nothing gets selected or scaled in
+    the scene.
+
+    :param shape: Name of the shape in the library.
+    :type shape: str
+    :param name: Name of the new curve, Maya picks one if not given.
+    :type name: str
+    :param library: Path to the shape library json file.
+    :type library: str
+    :param edits: center, axis, rotate, mirror, scale and radius, see transform_shape_points.
+    :type edits: dict
 
     :return: Name of the created curve object.
     :rtype: str
     """
+    flags = _curve_flags(shape, library, **edits)
+    if name:
+        flags["name"] = name
+    return cmds.curve(**flags)
+
+
+def create_controls(shape, names, library=SHAPE_LIBRARY, **edits):
+    """
+    Creates one control curve per name from the same library shape. The shape is
+    looked up and edited once for the whole batch.
+
+    :param shape: Name of the shape in the library.
+    :type shape: str
+    :param names: Names of the new curves.
+    :type names: list[str]
+    :param library: Path to the shape library json file.
+    :type library: str
+    :param edits: center, axis, rotate, mirror, scale and radius, see transform_shape_points.
+    :type edits: dict
+
+    :return: Names of the created curve objects.
+    :rtype: list[str]
+    """
+    flags = _curve_flags(shape, library, **edits)
+    return [cmds.curve(name=name, **flags) for name in names]
 
-    curve_circle = cmds.circle(
-        c=(0, 0, 0), nr=(0, 1, 0), sw=360, r=1, d=3, s=8, ch=1)[0]
 
-    return curve_circle
+def create_curve_circle():
+    """
+    Creates a NURBS circle in the scene.
+
+    :return: Name of the created curve object.
+    :rtype: str
+    """
+    return create_control("circle")
 
 
 def create_curve_cube():
@@ -81,12 +515,8 @@ def create_curve_cube():
     :return: Name of the created curve object.
     :rtype: str
     """
-    cube = cmds.curve(d=1, p=[(0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1), (0, 0, 0),
-                              (0, 1, 0), (1, 1, 0), (1, 0, 0), (1, 1, 0),
-                              (1, 1, 1), (1, 0, 1), (1, 1, 1),
-                              (0, 1, 1), (0, 0, 1), (0, 1, 1), (0, 1, 0)])
-    cmds.CenterPivot()
-    return cube
+    return create_control("cube")
+
 
 def create_diamond_curve():
     """
@@ -95,15 +525,8 @@ def create_diamond_curve():
     :return: Name of the created curve object.
     :rtype: str
     """
+    return create_control("diamond")
 
-    diamond = cmds.curve(d=1, p=[(-0.0102, 0, -2.9423),
-        (-2.9729, 0, 0),
-        (-0.0306, 0, 3.0444),
-        (3.0138, 0, 0.0204),
-        (0.0102, 0, -2.9014)])
-
-    cmds.CenterPivot()
-    return diamond
 
 def create_ik_curve():
     """"
@@ -112,20 +535,8 @@ def create_ik_curve():
     :return: Name of the created curve object.
     :rtype: str
     """
-    cmds.select(clear=True)
-    ik_curve = cmds.circle(c=(0, 0, 0), nr=(0, 1, 0), sw=360, r=1, d=3, s=8, ch=1)[0]
-
-    cv_indices = [0, 2, 4, 6]
-    cv_selection = [f"{ik_curve}.cv[{i}]" for i in cv_indices]
-
-    cmds.select(cv_selection)
-    cmds.scale(0.179, 0.179, 0.179, r=True, pivot=(0, 0, 0))
+    return create_control("ik_star")
 
-    cmds.select(clear=True)
-    cmds.select(ik_curve)
-    cmds.CenterPivot()
-
-    return ik_curve
 
 def create_e_curve():
     """"
@@ -134,17 +545,8 @@ def create_e_curve():
     :return: Name of the created curve object.
     :rtype: str
     """
+    return create_control("letter_e")
 
-    e_curve = cmds.curve(d=1, p=[(1.923, 2.779, 0), (0.371, 2.779, 0),
-        (0.371, -0.035, 0), (2.003, -0.035, 0),
-        (2.003, 0.295, 0), (0.771, 0.295, 0),
-        (0.771, 1.297, 0), (1.733, 1.297, 0),
-        (1.733, 1.577, 0), (0.771, 1.577, 0),
-        (0.771, 2.489, 0), (1.923, 2.489, 0),
-        (1.923, 2.779, 0)])
-
-    cmds.CenterPivot()
-    return e_curve
 
 def create_k_curve():
     """"
@@ -153,15 +555,7 @@ def create_k_curve():
     :return: Name of the created curve object.
     :rtype: str
     """
-    k_curve = cmds.curve(d=1, p=[ (2.256, 2.794, 0), (1.878, 2.794, 0),
-        (0.742, 1.431, 0), (0.734, 2.777, 0),
-        (0.372, 2.785, 0), (0.355, -0.016, 0),
-        (0.734, -0.016, 0), (0.742, 1.397, 0),
-        (1.962, -0.007, 0), (2.45, -0.007, 0),
-        (1.188, 1.448, 0), (2.256, 2.777, 0)])
-
-    cmds.CenterPivot()
-    return k_curve
+    return create_control("letter_k")
 
 
 def create_arrow_curve():
@@ -171,13 +565,8 @@ def create_arrow_curve():
     :return: Name of the created curve object.
     :rtype: str
     """
-    arrow = cmds.curve(d=1, p=[ (0.022, 0, -7.982), (-3.042, 0, -4.962),
-        (-0.928, 0, -4.962), (-0.928, 0, 1.036),
-        (1.057, 0, 1.036), (1.057, 0, -4.962),
-        (3.042, 0, -4.962), (-0.022, 0, -7.853)])
+    return create_control("arrow")
 
-    cmds.CenterPivot()
-    return arrow
 
 def create_arrow_double_curve():
     """"
@@ -186,15 +575,8 @@ def create_arrow_double_curve():
     :return: Name of the created curve object.
     :rtype: str
     """
-    double_arrow = cmds.curve(d=1, p=[ (0.057, 0, -4.971), (-3.002, 0, -2.027),
-        (-0.937, 0, -2.027), (-0.937, 0, 4.015),
-        (-2.963, 0, 4.015), (0.057, 0, 7.036),
-        (3.040, 0, 4.053), (0.975, 0, 4.053),
-        (0.975, 0, -1.988), (2.963, 0, -1.988),
-        (0.057, 0, -4.933)])
+    return create_control("arrow_double")
 
-    cmds.CenterPivot()
-    return double_arrow
 
 def create_arrow_four_curve():
     """"
@@ -203,20 +585,4 @@ def create_arrow_four_curve():
     :return: Name of the created curve object.
     :rtype: str
     """
-    four_arrow = cmds.curve(d=1, p=[
-        (0.022, 0, -7.896), (-3.042, 0, -4.962),
-        (-0.971, 0, -4.962), (-0.971, 0, -1.942),
-        (-3.991, 0, -1.942), (-3.991, 0, -3.883),
-        (-6.968, 0, -0.949), (-3.948, 0, 2.071),
-        (-3.948, 0, 0.086), (-1.014, 0, 0.086),
-        (-1.014, 0, 3.063), (-3.085, 0, 3.063),
-        (0.022, 0, 5.997), (2.999, 0, 3.020),
-        (1.057, 0, 3.020), (1.057, 0, 0.129),
-        (4.077, 0, 0.129), (4.034, 0, 2.071),
-        (6.968, 0, -0.992), (4.077, 0, -3.970),
-        (4.077, 0, -1.985), (1.057, 0, -1.985),
-        (1.057, 0, -5.048), (3.042, 0, -5.005),
-        (0.022, 0, -7.810)])
-
-    cmds.CenterPivot()
-    return four_arrow
\ No newline at end of file
+    return create_control("arrow_four")
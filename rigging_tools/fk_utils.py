@@ -29,12 +29,12 @@ import os
 
 # Third party
 import maya.cmds as cmds
-try:
-    from PyQt5 import QtCore, QtGui, QtWidgets
-except ImportError:
-    from PySide2 import QtGui, QtCore, QtWidgets
+import numpy as np
 
 # Internal
+from auto_rigging_tool_box.rigging_tools.curve_utils import create_controls
+from auto_rigging_tool_box.rigging_tools.skeleton_utils import get_world_matrices, remove_scale
+from auto_rigging_tool_box.rigging_tools.undo_utils import show_message, transaction
 
 # External
 
@@ -43,9 +43,177 @@ except ImportError:
 #--------------------------------------------------------------------------- FUNCTIONS --#
 
 
-def create_fk_controls():
+FK_MODES = ("constraint", "matrix")
+
+
+def drive_joint_by_matrix(ctrl, jnt, parent_jnt=None):
+    """
+    Drives a joint through its offsetParentMatrix instead of a parentConstraint.
+    The control world matrix is brought into the parent joint space with a
+    multMatrix, or connected straight in for joints without a parent, and the
+    joint's own translate, rotate and joint orient are zeroed.
+
+    :param ctrl: Driving control.
+    :type ctrl: str
+    :param jnt: Driven joint.
+    :type jnt: str
+    :param parent_jnt: Parent of the driven joint, if any.
+    :type parent_jnt: str
+
+    :return: The multMatrix node, or None, and the number of connections made.
+    :rtype: tuple(str, int)
+    """
+    mult = None
+    if parent_jnt:
+        mult = cmds.createNode("multMatrix", name=f"{ctrl}_MM")
+        cmds.connectAttr(f"{ctrl}.worldMatrix[0]", f"{mult}.matrixIn[0]")
+        cmds.connectAttr(f"{parent_jnt}.worldInverseMatrix[0]", f"{mult}.matrixIn[1]")
+        cmds.connectAttr(f"{mult}.matrixSum", f"{jnt}.offsetParentMatrix")
+        connections = 3
+    else:
+        cmds.connectAttr(f"{ctrl}.worldMatrix[0]", f"{jnt}.offsetParentMatrix")
+        connections = 1
+
+    cmds.xform(jnt, translation=(0, 0, 0), rotation=(0, 0, 0))
+    cmds.setAttr(f"{jnt}.jointOrient", 0, 0, 0)
+
+    return mult, connections
+
+
+@transaction("Create FK Chains")
+def create_fk_chains(chains, shape="circle", radius=2.0, axis="x", group_name="GRP_FK_controls",
+                     mode="constraint", skeleton=None):
+    """
+    Creates FK controls for many joint chains in one call. All joint matrices are
+    read in one query and every offset group placement is solved in one NumPy pass.
+
+    The scene edits are not batched: cmds has no command that creates, places or
+    parents many nodes with different values, and the API ones cannot be undone.
+    Each joint still costs a curve, an offset group, an xform and its driver, about
+    what the one-chain builder issued.
+
+    In constraint mode every joint gets a parentConstraint. In matrix mode joints
+    are driven through offsetParentMatrix and no constraint node is made, see
+    drive_joint_by_matrix.
+
+    :param chains: Joint chains, each a list of joints ordered from root to tip.
+    :type chains: list[list[str]]
+    :param shape: Control shape from the curve library.
+    :type shape: str
+    :param radius: Radius of the control curves.
+    :type radius: float
+    :param axis: Axis the control curves face.
+    :type axis: str
+    :param group_name: Name of the group holding every chain.
+    :type group_name: str
+    :param mode: How joints are driven, constraint or matrix.
+    :type mode: str
+    :param skeleton: Skeleton index to read joint matrices from instead of the scene.
+    :type skeleton: SkeletonIndex
+
+    :return: One result per chain with mode, group, joints, offsets, controls, drivers
+             and direct_connections keys.
+    :rtype: list[dict]
+    """
+    if mode not in FK_MODES:
+        raise ValueError(f"Unknown FK mode '{mode}', use one of {', '.join(FK_MODES)}.")
+
+    chains = [list(chain) for chain in chains if chain]
+    all_joints = [jnt for chain in chains for jnt in chain]
+    if not all_joints:
+        return []
+
+    if skeleton is not None:
+        world = remove_scale(skeleton.matrices[skeleton.indices(all_joints)])
+    else:
+        world = remove_scale(get_world_matrices(all_joints))
+    short_names = [jnt.split("|")[-1] for jnt in all_joints]
+
+    # Row vector matrices: local = world * parent_world^-1, chain roots sit in the group
+    parent_world = np.empty_like(world)
+    starts = np.cumsum([0] + [len(chain) for chain in chains[:-1]])
+    parent_world[1:] = world[:-1]
+    parent_world[starts] = np.identity(4)
+    local_matrices = (world @ np.linalg.inv(parent_world)).reshape(-1, 16).tolist()
+
+    controls = create_controls(shape, [f"{name}_FK_CTRL" for name in short_names],
+                               axis=axis, scale=radius)
+
+    top_grp = cmds.group(empty=True, name=group_name)
+
+    results = []
+    index = 0
+    for chain in chains:
+        result = {"mode": mode, "group": top_grp, "joints": chain, "offsets": [],
+                  "controls": [], "drivers": [], "direct_connections": 0}
+        parent = top_grp
+        parent_jnt = None
+        if mode == "matrix" and skeleton is not None:
+            parent_jnt = skeleton.parent(chain[0])
+        if mode == "matrix" and parent_jnt is None:
+            parent_jnt = (cmds.listRelatives(chain[0], parent=True, fullPath=True) or [None])[0]
+
+        for jnt in chain:
+            ctrl = controls[index]
+            offset = cmds.group(ctrl, name=f"{short_names[index]}_FK_OFFSET",
+                                parent=parent, relative=True)
+            cmds.xform(offset, objectSpace=True, matrix=local_matrices[index])
+            if mode == "matrix":
+                driver, connections = drive_joint_by_matrix(ctrl, jnt, parent_jnt)
+                result["direct_connections"] += 0 if driver else connections
+            else:
+                driver = cmds.parentConstraint(ctrl, jnt, mo=True)[0]
+
+            result["offsets"].append(offset)
+            result["controls"].append(ctrl)
+            if driver:
+                result["drivers"].append(driver)
+
+            parent = ctrl
+            parent_jnt = jnt
+            index += 1
+
+        results.append(result)
+
+    return results
+
+
+def report_fk_cost(results):
+    """
+    Counts the DG nodes and connections that drive the joints of built FK chains,
+    to compare how heavy the constraint and matrix modes are.
+
+    :param results: Results returned by create_fk_chains.
+    :type results: list[dict]
+
+    :return: Report with modes, joints, nodes and connections keys.
+    :rtype: dict
+    """
+    drivers = [driver for result in results for driver in result["drivers"]]
+    connections = sum(result["direct_connections"] for result in results)
+    if drivers:
+        # With connections=True the result holds a pair of plugs per connection
+        plugs = cmds.listConnections(drivers, connections=True, plugs=True) or []
+        connections += len(plugs) // 2
+
+    report = {
+        "modes": sorted({result["mode"] for result in results}),
+        "joints": sum(len(result["joints"]) for result in results),
+        "nodes": len(drivers),
+        "connections": connections,
+    }
+    print("FK cost ({}): {} joints driven by {} nodes and {} connections".format(
+        "/".join(report["modes"]), report["joints"], report["nodes"], report["connections"]))
+    return report
+
+
+@transaction("Create FK Controls")
+def create_fk_controls(mode="constraint"):
     """
     Creates FK controls for for nay selected joint chain
+
+    :param mode: How joints are driven, constraint or matrix.
+    :type mode: str
     """
 
     joints = cmds.ls(sl=True, type="joint")
@@ -57,35 +225,8 @@ def create_fk_controls():
         cmds.warning("Select at least TWO joints in order to create FK controls.")
         return
 
-    # Create a master control group
-    top_grp = cmds.group(empty=True, name="GRP_FK_controls")
-
-    parent_ctrl = None
-
-    # Iterate through selected joints
-    for i, jnt in enumerate(joints):
-        ctrl_name = f"{jnt}_FK_CTRL"
-
-        ctrl = cmds.circle(name=ctrl_name, normal=[1, 0, 0], radius=2)[0]
-
-        cmds.matchTransform(ctrl, jnt)
-
-        if parent_ctrl:
-            cmds.parent(ctrl, parent_ctrl)
-        else:
-            cmds.parent(ctrl, top_grp)
-
-        # Constrain joint to control
-        cmds.parentConstraint(ctrl, jnt, mo=True)
-
-        parent_ctrl = ctrl
+    results = create_fk_chains([joints], mode=mode)
 
     cmds.select(clear=True)
-    cmds.inViewMessage(
-        amg=f"✅ FK controls created for <hl>{len(joints)}</hl> joints",
-        pos="topCenter",
-        fade=True
-    )
-
-
-
+    show_message(f"✅ FK controls created for <hl>{len(joints)}</hl> joints")
+    return results
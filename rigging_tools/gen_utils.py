@@ -27,15 +27,16 @@ N/A
 
 # Built-in
 import os
+import re
 
 # Third party
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
-try:
-    from PyQt5 import QtCore, QtGui, QtWidgets
-except ImportError:
-    from PySide2 import QtGui, QtCore, QtWidgets
 
 # Internal
+from auto_rigging_tool_box.rigging_tools.skeleton_utils import (MIRROR_PLANES, SIDE_TOKENS,
+                                                           mirror_skeleton, orient_skeleton)
+from auto_rigging_tool_box.rigging_tools.undo_utils import show_message, transaction
 
 # External
 
@@ -43,163 +44,462 @@ except ImportError:
 #----------------------------------------------------------------------------------------#
 #--------------------------------------------------------------------------- FUNCTIONS --#
 
-    #General Logic
-    def freeze_transforms():
-        """Freezes transforms on selected objects."""
-        sel = cmds.ls(selection=True)
-        if not sel:
-            cmds.warning("No objects selected.")
-            return
-        cmds.makeIdentity(sel, apply=True, translate=True, rotate=True, scale=True, normal=False)
-        cmds.inViewMessage(amg="✅ Transforms frozen!", pos="topCenter", fade=True)
-
-
-    def delete_history():
-        """Deletes history on selected objects."""
-        sel = cmds.ls(selection=True)
-        if not sel:
-            cmds.warning("No objects selected.")
-            return
-
-        cmds.delete(sel, constructionHistory=True)
-        cmds.inViewMessage(amg="✅ History deleted!", pos="topCenter", fade=True)
-
-
-    def center_pivot():
-        """Centers pivot on selected objects."""
-        sel = cmds.ls(selection=True)
-        if not sel:
-            cmds.warning("No objects selected.")
-            return
-        cmds.xform(sel, centerPivots=True)
-        cmds.inViewMessage(amg="✅ Pivot centered!", pos="topCenter", fade=True)
-
-
-    def mirror_joints():
-        """Mirrors selected joints."""
-        sel = cmds.ls(selection=True, type="joint")
-        if not sel:
-            cmds.warning("Select at least one joint to mirror.")
-            return
-        for joint in sel:
-            cmds.mirrorJoint(joint, mirrorYZ=True, mirrorBehavior=True, searchReplace=("L_", "R_"))
-        cmds.inViewMessage(amg="✅ Joints mirrored!", pos="topCenter", fade=True)
-
-
-    def orient_joints():
-        """Orients selected joints."""
-        sel = cmds.ls(selection=True, type="joint")
-        if not sel:
-            cmds.warning("Select joints to orient.")
-            return
-        for jnt in sel:
-            cmds.joint(jnt, edit=True, orientJoint="xyz", secondaryAxisOrient="yup", zeroScaleOrient=True)
-        cmds.inViewMessage(amg="✅ Joints oriented!", pos="topCenter", fade=True)
-
-    #Transformation Logic
-    def reset_translation():
-        """
-        Resets the translation of selected objects to (0, 0, 0).
-        """
-        sel = cmds.ls(selection=True) or []
-        if not sel:
-            cmds.warning("No object was selected.")
-            return
-
-        for obj in sel:
-            cmds.setAttr(f"{obj}.translateX", 0)
-            cmds.setAttr(f"{obj}.translateY", 0)
-            cmds.setAttr(f"{obj}.translateZ", 0)
-        cmds.inViewMessage(amg="✅ Translation Reset!", pos="topCenter", fade=True)
-
-
-    def reset_rotation():
-        """
-        Resets the rotation of selected objects to (0, 0, 0).
-        """
-        sel = cmds.ls(selection=True) or []
-        sel = cmds.ls(selection=True) or []
-        if not sel:
-            cmds.warning("No object was selected.")
-            return
-
-        for obj in sel:
-            cmds.setAttr(f"{obj}.rotateX", 0)
-            cmds.setAttr(f"{obj}.rotateY", 0)
-            cmds.setAttr(f"{obj}.rotateZ", 0)
-        cmds.inViewMessage(amg="✅ Rotation Reset!", pos="topCenter", fade=True)
-
-
-    def reset_translation_rotation():
-        """
-        Resets both translation and rotation of selected objects.
-
-        :return: Success of the reset translation and rotation function.
-        :type: bool
-        """
-        sel = cmds.ls(selection=True) or []
-        if not sel:
-            cmds.warning("No object was selected.")
-            return
-
-        for obj in sel:
-            cmds.setAttr(f"{obj}.translateX", 0)
-            cmds.setAttr(f"{obj}.translateY", 0)
-            cmds.setAttr(f"{obj}.translateZ", 0)
-            cmds.setAttr(f"{obj}.rotateX", 0)
-            cmds.setAttr(f"{obj}.rotateY", 0)
-            cmds.setAttr(f"{obj}.rotateZ", 0)
-        cmds.inViewMessage(amg="✅ Translation and Rotation Reset!", pos="topCenter", fade=True)
-
-
-    def reset_scale():
-        """
-        Resets the scale of selected objects to (1, 1, 1).
-
-        :return: Success of the reset scale function.
-        :type: bool
-        """
-        sel = cmds.ls(selection=True) or []
-        if not sel:
-            cmds.warning("No object was selected.")
-            return
-
-        for obj in sel:
-            cmds.setAttr(f"{obj}.scaleX", 1)
-            cmds.setAttr(f"{obj}.scaleY", 1)
-            cmds.setAttr(f"{obj}.scaleZ", 1)
-        cmds.inViewMessage(amg="✅ Scale Reset!", pos="topCenter", fade=True)
-
-
-    def rename_objects_by_type():
-        # Get selected objects
-        selected_objects = cmds.ls(selection=True)
-
-        # Create dictionaries for object type prefixes
-        type_prefix = {
-            'mesh': 'geo',
-            'joint': 'jnt',
-            'nurbsCurve': 'crv',
-        }
-
-        # Loop through each selected object
-        for obj in selected_objects:
-            # Get object type
-            obj_type = cmds.objectType(obj)
-
-            # Find out the prefix based on object type
-            prefix = type_prefix.get(obj_type, 'obj')
-
-            # Create a new name with a prefix and a number
-            new_name = f"{prefix}_{obj}_01"
-
-            # Rename the object
-            cmds.rename(obj, new_name)
-            print(f"Renamed {obj} to {new_name}")
-
-
-    # Run the function
-    rename_objects_by_type()
+#General Logic
+@transaction("Freeze Transforms")
+def freeze_transforms():
+    """Freezes transforms on selected objects."""
+    sel = cmds.ls(selection=True)
+    if not sel:
+        cmds.warning("No objects selected.")
+        return
+    cmds.makeIdentity(sel, apply=True, translate=True, rotate=True, scale=True, normal=False)
+    show_message("✅ Transforms frozen!")
+
+
+@transaction("Delete History")
+def delete_history():
+    """Deletes history on selected objects."""
+    sel = cmds.ls(selection=True)
+    if not sel:
+        cmds.warning("No objects selected.")
+        return
+
+    cmds.delete(sel, constructionHistory=True)
+    show_message("✅ History deleted!")
+
+
+@transaction("Center Pivot")
+def center_pivot():
+    """Centers pivot on selected objects."""
+    sel = cmds.ls(selection=True)
+    if not sel:
+        cmds.warning("No objects selected.")
+        return
+    cmds.xform(sel, centerPivots=True)
+    show_message("✅ Pivot centered!")
+
+
+@transaction("Mirror Joints")
+def mirror_joints(joints=None, mirror_plane="YZ", side_tokens=SIDE_TOKENS):
+    """
+    Mirrors selected joints. Joints below another selected joint are mirrored with
+    it, so every subtree is only mirrored once, and the mirrored pairs are added to
+    the counterpart table.
+
+    :param joints: Joints to mirror, the selection if None.
+    :type joints: list[str]
+    :param mirror_plane: Mirror plane, YZ, XZ or XY.
+    :type mirror_plane: str
+    :param side_tokens: Pairs of side prefixes to swap in the mirrored names.
+    :type side_tokens: tuple(tuple(str))
+
+    :return: Source short name to mirrored short name of every mirrored joint.
+    :rtype: dict
+    """
+    sel = joints if joints is not None else cmds.ls(selection=True, type="joint")
+    if not sel:
+        cmds.warning("Select at least one joint to mirror.")
+        return
+    if mirror_plane not in MIRROR_PLANES:
+        cmds.warning(f"Mirror plane must be one of {', '.join(MIRROR_PLANES)}.")
+        return
+
+    pairs = mirror_skeleton(sel, mirror_plane=mirror_plane, side_tokens=side_tokens)
+    show_message(f"✅ Joints mirrored! <hl>{len(pairs)}</hl> counterparts recorded")
+    return pairs
+
+
+@transaction("Orient Joints")
+def orient_joints(joints=None, aim_axis="x", up_axis="y", world_up=(0.0, 1.0, 0.0),
+                  use_chain_plane=True, hierarchy=False):
+    """
+    Orients the selected joints in one solve, see orient_skeleton. Bent chains like
+    arms and legs keep their up axis in the chain plane, end joints take their
+    parent's orientation.
+
+    :param joints: Joints to orient, the selection if None.
+    :type joints: list[str]
+    :param aim_axis: Joint axis aiming down the bone, like "x" or "-x".
+    :type aim_axis: str
+    :param up_axis: Joint axis pointing up, like "y" or "-z".
+    :type up_axis: str
+    :param world_up: World direction of the up axis on straight chains.
+    :type world_up: tuple(float)
+    :param use_chain_plane: Keep the up axis in the plane of bent chains.
+    :type use_chain_plane: bool
+    :param hierarchy: Also orient every joint below the selected ones.
+    :type hierarchy: bool
+
+    :return: Number of oriented joints.
+    :rtype: int
+    """
+    sel = joints if joints is not None else cmds.ls(selection=True, type="joint")
+    if not sel:
+        cmds.warning("Select joints to orient.")
+        return
+    try:
+        count = orient_skeleton(sel, aim_axis=aim_axis, up_axis=up_axis, world_up=world_up,
+                                use_chain_plane=use_chain_plane, hierarchy=hierarchy)
+    except ValueError as error:
+        cmds.warning(str(error))
+        return
+    show_message(f"✅ Joints oriented! <hl>{count}</hl> joints")
+    return count
+
+#Transformation Logic
+RESET_VALUES = {
+    "translate": (0.0, 0.0, 0.0),
+    "rotate": (0.0, 0.0, 0.0),
+    "scale": (1.0, 1.0, 1.0),
+}
+
+XFORM_FLAGS = {
+    "translate": "translation",
+    "rotate": "rotation",
+    "scale": "scale",
+}
+
+AXES = ("X", "Y", "Z")
+
+
+def get_locked_channels(paths, channels=tuple(RESET_VALUES)):
+    """
+    Reads which channel plugs of many nodes are locked, in one pass over the API
+    instead of one listAttr command per node.
+
+    :param paths: Long paths of the nodes.
+    :type paths: list[str]
+    :param channels: Channels to check, with their X, Y and Z children.
+    :type channels: tuple[str]
+
+    :return: Locked attribute names per long path.
+    :rtype: dict
+    """
+    attrs = [attr for channel in channels
+             for attr in (channel,) + tuple(channel + axis for axis in AXES)]
+    sel = om.MSelectionList()
+    for path in paths:
+        sel.add(path)
+
+    locked = {}
+    for i, path in enumerate(paths):
+        node_fn = om.MFnDependencyNode(sel.getDependNode(i))
+        locked[path] = {attr for attr in attrs if node_fn.findPlug(attr, False).isLocked}
+    return locked
+
+
+def get_blocked_channels(paths, channels=tuple(RESET_VALUES)):
+    """
+    Finds the locked or incoming-connected channels of the given nodes.
+
+    Connections for every node are queried with a single listConnections call and
+    their owners brought to long paths with a single ls, so they match the given
+    paths. Locks are read in one API pass, see get_locked_channels.
+
+    :param paths: Long paths of the nodes to inspect, see cmds.ls(long=True).
+    :type paths: list[str]
+    :param channels: Channels to check.
+    :type channels: tuple[str]
+
+    :return: Blocked attribute names per long path and the number of queries issued.
+    :rtype: tuple(dict, int)
+    """
+    # The API lock pass and listConnections
+    blocked = get_locked_channels(paths, channels)
+    commands = 2
+
+    plugs = cmds.listConnections(paths, source=True, destination=False,
+                                 connections=True, plugs=True) or []
+    # With connections=True the result alternates destination plug, source plug
+    destinations = [plug.split(".", 1) for plug in plugs[::2]]
+    owners = list(dict.fromkeys(node for node, _ in destinations))
+    if owners:
+        long_owners = cmds.ls(owners, long=True) or []
+        commands += 1
+        if len(long_owners) != len(owners):
+            # Owners come back as unique names, this only happens on name clashes
+            long_owners = [(cmds.ls(owner, long=True) or [owner])[0] for owner in owners]
+            commands += len(owners)
+        owner_paths = dict(zip(owners, long_owners))
+        for node, attr in destinations:
+            path = owner_paths.get(node, node)
+            if path in blocked:
+                blocked[path].add(attr)
+
+    return blocked, commands
+
+
+def reset_transforms(nodes, channels=("translate", "rotate")):
+    """
+    Resets the given transform channels on a list of nodes.
+
+    Nodes are brought to long paths first. Locked and connected channels are
+    skipped up front. Nodes with every
+    requested channel free are reset together with one xform call, the others
+    get one compound setAttr per channel, or one setAttr per free axis when only
+    part of a channel is blocked.
+
+    :param nodes: Names of the transform nodes to reset.
+    :type nodes: list[str]
+    :param channels: Channels to reset, any of translate, rotate and scale.
+    :type channels: tuple[str]
+
+    :return: Number of maya commands issued, queries included.
+    :rtype: int
+    """
+    if not nodes:
+        return 0
+    nodes = list(dict.fromkeys(cmds.ls(nodes, long=True) or []))
+    if not nodes:
+        return 1
+
+    blocked, commands = get_blocked_channels(nodes, channels)
+    commands += 1
+
+    free_nodes = []
+    for node in nodes:
+        node_blocked = blocked[node]
+        partial_channels = [channel for channel in channels
+                            if channel in node_blocked
+                            or any(channel + axis in node_blocked for axis in AXES)]
+        if not partial_channels:
+            free_nodes.append(node)
+            continue
+
+        for channel in channels:
+            values = RESET_VALUES[channel]
+            if channel not in partial_channels:
+                cmds.setAttr(f"{node}.{channel}", *values)
+                commands += 1
+                continue
+            if channel in node_blocked:
+                continue
+            for axis, value in zip(AXES, values):
+                if channel + axis not in node_blocked:
+                    cmds.setAttr(f"{node}.{channel}{axis}", value)
+                    commands += 1
+
+    if free_nodes:
+        flags = {XFORM_FLAGS[channel]: RESET_VALUES[channel] for channel in channels}
+        cmds.xform(free_nodes, objectSpace=True, **flags)
+        commands += 1
+
+    return commands
+
+
+@transaction("Reset Translation")
+def reset_translation():
+    """
+    Resets the translation of selected objects to (0, 0, 0).
+    """
+    sel = cmds.ls(selection=True) or []
+    if not sel:
+        cmds.warning("No object was selected.")
+        return
+
+    reset_transforms(sel, ("translate",))
+    show_message("✅ Translation Reset!")
+
+
+@transaction("Reset Rotation")
+def reset_rotation():
+    """
+    Resets the rotation of selected objects to (0, 0, 0).
+    """
+    sel = cmds.ls(selection=True) or []
+    if not sel:
+        cmds.warning("No object was selected.")
+        return
+
+    reset_transforms(sel, ("rotate",))
+    show_message("✅ Rotation Reset!")
+
+
+@transaction("Reset Translation and Rotation")
+def reset_translation_rotation():
+    """
+    Resets both translation and rotation of selected objects.
+
+    :return: Success of the reset translation and rotation function.
+    :type: bool
+    """
+    sel = cmds.ls(selection=True) or []
+    if not sel:
+        cmds.warning("No object was selected.")
+        return
+
+    reset_transforms(sel, ("translate", "rotate"))
+    show_message("✅ Translation and Rotation Reset!")
+
+
+@transaction("Reset Scale")
+def reset_scale():
+    """
+    Resets the scale of selected objects to (1, 1, 1).
+
+    :return: Success of the reset scale function.
+    :type: bool
+    """
+    sel = cmds.ls(selection=True) or []
+    if not sel:
+        cmds.warning("No object was selected.")
+        return
+
+    reset_transforms(sel, ("scale",))
+    show_message("✅ Scale Reset!")
+
+
+#Rename Logic
+NAMING_CONVENTION = {
+    # Prefix per node type, transforms take the type of their first shape
+    "prefixes": {
+        "mesh": "geo",
+        "joint": "jnt",
+        "nurbsCurve": "crv",
+    },
+    "default": "obj",
+    "pattern": "{prefix}_{name}_{index:02d}",
+}
+
+
+def get_rename_types(nodes):
+    """
+    Reads the long path and naming type of each node with two queries. Transforms
+    are typed by their first shape, so a mesh transform counts as a mesh.
+
+    :param nodes: Names of the nodes.
+    :type nodes: list[str]
+
+    :return: Long path and type per node.
+    :rtype: list[tuple(str, str)]
+    """
+    typed = cmds.ls(nodes, long=True, showType=True) or []
+    paths, types = typed[::2], typed[1::2]
+
+    transforms = [path for path, node_type in zip(paths, types) if node_type == "transform"]
+    shape_types = {}
+    if transforms:
+        shapes = cmds.listRelatives(transforms, shapes=True, fullPath=True,
+                                    noIntermediate=True) or []
+        shape_typed = cmds.ls(shapes, long=True, showType=True) or []
+        for shape, shape_type in zip(shape_typed[::2], shape_typed[1::2]):
+            shape_types.setdefault(shape.rsplit("|", 1)[0], shape_type)
+
+    return [(path, shape_types.get(path, node_type)) for path, node_type in zip(paths, types)]
+
+
+def plan_renames(typed_paths, taken=(), convention=NAMING_CONVENTION):
+    """
+    Plans the new names of many nodes in memory, without touching the scene.
+
+    Names already following the convention are kept. The index of a new name is
+    raised until it clashes with no other name in the scene and no planned name.
+
+    :param typed_paths: Long path and type per node, see get_rename_types.
+    :type typed_paths: list[tuple(str, str)]
+    :param taken: Short names in the scene that must not be reused.
+    :type taken: iterable[str]
+    :param convention: Prefixes per type, default prefix and name pattern.
+    :type convention: dict
+
+    :return: New short name per long path, only for nodes that change.
+    :rtype: dict
+    """
+    prefixes = convention["prefixes"]
+    pattern = convention["pattern"]
+    renamed = {path for path, _ in typed_paths}
+    used = {name for name in taken}
+    # The names being replaced are free to reuse
+    used.difference_update(path.rsplit("|", 1)[-1] for path in renamed)
+
+    # Keep the names that already follow the convention before planning new ones
+    pending = []
+    for path, node_type in typed_paths:
+        name = path.rsplit("|", 1)[-1]
+        prefix = prefixes.get(node_type, convention["default"])
+        if re.match(rf"^{re.escape(prefix)}_.+_\d+$", name) and name not in used:
+            used.add(name)
+        else:
+            pending.append((path, prefix, name))
+
+    plan = {}
+    next_index = {}
+    for path, prefix, name in pending:
+        index = next_index.get((prefix, name), 1)
+        new_name = pattern.format(prefix=prefix, name=name, index=index)
+        while new_name in used:
+            index += 1
+            new_name = pattern.format(prefix=prefix, name=name, index=index)
+        next_index[(prefix, name)] = index + 1
+        used.add(new_name)
+        plan[path] = new_name
+    return plan
+
+
+def renamed_path(path, plan):
+    """
+    Returns the long path a node ends up with once a rename plan is applied.
+    """
+    parts = path.split("|")
+    new_parts = list(parts)
+    for i in range(1, len(parts)):
+        new_name = plan.get("|".join(parts[:i + 1]))
+        if new_name:
+            new_parts[i] = new_name
+    return "|".join(new_parts)
+
+
+@transaction("Rename Objects By Type")
+def rename_objects_by_type(nodes=None, convention=NAMING_CONVENTION, dry_run=False):
+    """
+    Renames nodes by their type, following a naming convention table.
+
+    Every new name is planned up front with collisions resolved, then the renames
+    run deepest first, so the long paths of the nodes still waiting for a rename
+    never go stale. The returned paths hold the names Maya actually gave.
+
+    :param nodes: Nodes to rename, the selection if None.
+    :type nodes: list[str]
+    :param convention: Prefixes per type, default prefix and name pattern.
+    :type convention: dict
+    :param dry_run: Only plan the names, without editing the scene.
+    :type dry_run: bool
+
+    :return: Old long path to new long path of every renamed node. Only dry runs
+             print the whole plan.
+    :rtype: dict
+    """
+    # Get selected objects
+    if nodes is None:
+        nodes = cmds.ls(selection=True, long=True)
+    if not nodes:
+        cmds.warning("No object was selected.")
+        return {}
+
+    typed_paths = get_rename_types(nodes)
+    taken = [name.rsplit("|", 1)[-1] for name in cmds.ls() or []]
+    plan = plan_renames(typed_paths, taken, convention)
+
+    if not dry_run:
+        # Children first, their paths still hold the old parent names. Maya may still
+        # adjust a name, so the mapping follows the names rename gives back
+        applied = {}
+        for path in sorted(plan, key=lambda path: path.count("|"), reverse=True):
+            applied[path] = cmds.rename(path, plan[path]).rsplit("|", 1)[-1]
+        plan = applied
+    mapping = {path: renamed_path(path, plan) for path in plan}
+
+    if dry_run:
+        for old, new in mapping.items():
+            print(f"Would rename {old} to {new}")
+        print(f"Would rename {len(mapping)} of {len(typed_paths)} objects")
+        return mapping
+
+    # One line, printing every node costs more than the renames on big scenes
+    print(f"Renamed {len(mapping)} of {len(typed_paths)} objects")
+    show_message(f"✅ Renamed <hl>{len(mapping)}</hl> objects")
+    return mapping
+
 
 #----------------------------------------------------------------------------------------#
 #----------------------------------------------------------------------------- CLASSES --#
\ No newline at end of file
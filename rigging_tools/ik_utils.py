@@ -29,12 +29,12 @@ import os
 
 # Third party
 import maya.cmds as cmds
-try:
-    from PyQt5 import QtCore, QtGui, QtWidgets
-except ImportError:
-    from PySide2 import QtGui, QtCore, QtWidgets
+import numpy as np
 
 # Internal
+from auto_rigging_tool_box.rigging_tools.curve_utils import create_control
+from auto_rigging_tool_box.rigging_tools.skeleton_utils import SIDE_TOKENS, SkeletonIndex
+from auto_rigging_tool_box.rigging_tools.undo_utils import show_message, transaction
 
 # External
 
@@ -42,31 +42,29 @@ except ImportError:
 #----------------------------------------------------------------------------------------#
 #--------------------------------------------------------------------------- FUNCTIONS --#
 
-def create_ik_controls(limb_type="arm", selection=True):
+@transaction("Create IK Limb")
+def create_ik_limb(joints, limb_type="arm", skeleton=None):
     """
-    Creates an IK handle for a selected limb (arm or leg).
-    """
-    if selection:
-        sel = cmds.ls(sl=True)
-        if len(sel) < 3:
-            cmds.warning("Select at least 3 joints (shoulder/hip, elbow/knee, wrist/ankle).")
-            return
-        joints = sel[:3]
-    else:
-        cmds.warning("No joints selected.")
-        return
+    Creates an IK handle and control for a 3-joint limb (arm or leg).
 
-    start_joint, mid_joint, end_joint = joints
+    :param joints: Start, mid and end joint of the limb.
+    :type joints: list[str]
+    :param limb_type: Name used for the handle and control.
+    :type limb_type: str
+    :param skeleton: Skeleton index to read joint positions from instead of the scene.
+    :type skeleton: SkeletonIndex
 
-    # Detect limb axis direction (X, Y, or Z)
-    start_pos = cmds.xform(start_joint, q=True, ws=True, t=True)
-    end_pos   = cmds.xform(end_joint,   q=True, ws=True, t=True)
+    :return: IK handle and control.
+    :rtype: tuple(str, str)
+    """
+    if len(joints) < 3:
+        raise ValueError(f"IK limb '{limb_type}' needs 3 joints, got {len(joints)}.")
+    start_joint, mid_joint, end_joint = joints[:3]
 
-    vec = [
-        end_pos[0] - start_pos[0],
-        end_pos[1] - start_pos[1],
-        end_pos[2] - start_pos[2]
-    ]
+    # Detect limb axis direction (X, Y, or Z)
+    if skeleton is None:
+        skeleton = SkeletonIndex(joints[:3], hierarchy=False)
+    vec = skeleton.position(end_joint) - skeleton.position(start_joint)
 
     # Determine dominant axis
     axis_index = max(range(3), key=lambda i: abs(vec[i]))
@@ -96,10 +94,211 @@ def create_ik_controls(limb_type="arm", selection=True):
     cmds.delete(cmds.pointConstraint(ik_handle, ctrl))
     cmds.parent(ik_handle, ctrl)
 
-    cmds.inViewMessage(
-        amg=f"✅ IK setup created for <hl>{limb_type}</hl> limb",
-        pos="topCenter",
-        fade=True
-    )
+    show_message(f"✅ IK setup created for <hl>{limb_type}</hl> limb")
     print("Created IK handle '{}' with control '{}'.".format(ik_handle, ctrl))
+    return ik_handle, ctrl
+
+
+@transaction("Create IK Controls")
+def create_ik_controls(limb_type="arm", selection=True, skeleton=None):
+    """
+    Creates an IK handle for a selected limb (arm or leg).
+
+    :param limb_type: Name used for the handle and control.
+    :type limb_type: str
+    :param selection: Use the selected joints.
+    :type selection: bool
+    :param skeleton: Skeleton index to read joint positions from instead of the scene.
+    :type skeleton: SkeletonIndex
+    """
+    if selection:
+        sel = cmds.ls(sl=True)
+        if len(sel) < 3:
+            cmds.warning("Select at least 3 joints (shoulder/hip, elbow/knee, wrist/ankle).")
+            return
+        joints = sel[:3]
+    else:
+        cmds.warning("No joints selected.")
+        return
+
+    ik_handle, _ = create_ik_limb(joints, limb_type=limb_type, skeleton=skeleton)
     return ik_handle
+
+
+POLE_DISTANCE = 0.5
+
+AXIS_NAMES = ("x", "y", "z")
+
+
+def compute_pole_positions(starts, mids, ends, distance=POLE_DISTANCE, fallback=(0.0, 0.0, 1.0)):
+    """
+    Computes pole vector positions for many limbs at once.
+
+    Each pole sits in the limb plane, out from the mid joint, away from the line
+    between start and end. Straight limbs push their pole along fallback.
+
+    :param starts: Nx3 world positions of the start joints.
+    :type starts: numpy.ndarray
+    :param mids: Nx3 world positions of the mid joints.
+    :type mids: numpy.ndarray
+    :param ends: Nx3 world positions of the end joints.
+    :type ends: numpy.ndarray
+    :param distance: Distance of the pole from the mid joint, in limb lengths.
+    :type distance: float
+    :param fallback: Pole direction of straight limbs.
+    :type fallback: tuple(float)
+
+    :return: Nx3 world positions of the poles.
+    :rtype: numpy.ndarray
+    """
+    starts, mids, ends = (np.asarray(values, dtype=float).reshape(-1, 3)
+                          for values in (starts, mids, ends))
+    line = ends - starts
+    line_length = np.einsum("ij,ij->i", line, line)
+    ratio = np.einsum("ij,ij->i", mids - starts, line) / np.where(line_length == 0.0, 1.0,
+                                                                  line_length)
+    directions = mids - (starts + ratio[:, None] * line)
+
+    lengths = np.linalg.norm(directions, axis=1)
+    limb_lengths = np.linalg.norm(mids - starts, axis=1) + np.linalg.norm(ends - mids, axis=1)
+    straight = lengths < 1e-6 * np.maximum(limb_lengths, 1.0)
+    directions[straight] = fallback
+    lengths[straight] = np.linalg.norm(fallback)
+    return mids + directions / lengths[:, None] * (distance * limb_lengths)[:, None]
+
+
+def limb_base_name(start_joint, limb_type=None, side_tokens=SIDE_TOKENS):
+    """
+    Returns the base name of a limb: the start joint's short name, like L_shoulder,
+    or the limb type with the side of the start joint, like L_arm.
+    """
+    name = start_joint.rsplit("|", 1)[-1]
+    if limb_type is None:
+        return name
+    for left, right in side_tokens:
+        for token in (left, right):
+            if name.startswith(token):
+                return f"{token}{limb_type}"
+    return limb_type
+
+
+def unique_limb_names(base_names, suffixes=("_IK", "_CTRL", "_PV")):
+    """
+    Makes limb base names unique against the scene and each other, so every
+    handle, control and pole of a batch gets its own name.
+
+    :param base_names: Base name per limb.
+    :type base_names: list[str]
+    :param suffixes: Suffixes of the nodes made per limb.
+    :type suffixes: tuple(str)
+
+    :return: Unique base name per limb.
+    :rtype: list[str]
+    """
+    taken = set(cmds.ls([f"*{suffix}" for suffix in suffixes]) or [])
+    names = []
+    for base in base_names:
+        name, index = base, 1
+        while any(f"{name}{suffix}" in taken for suffix in suffixes):
+            index += 1
+            name = f"{base}_{index:02d}"
+        taken.update(f"{name}{suffix}" for suffix in suffixes)
+        names.append(name)
+    return names
+
+
+@transaction("Create IK Limbs")
+def create_ik_limbs(limbs, limb_type=None, names=None, pole_vectors=True,
+                    pole_distance=POLE_DISTANCE, skeleton=None):
+    """
+    Creates IK handles, controls and pole vectors for many 3-joint limbs at once.
+    Joint positions come from one skeleton snapshot and every pole position is
+    solved in one NumPy pass before anything is created.
+
+    :param limbs: Per limb (start, mid, end) joints.
+    :type limbs: list[tuple(str)]
+    :param limb_type: Base name of the limbs, prefixed by the side of the start joint.
+                      Limbs are named after their start joint if None, like L_shoulder_IK.
+    :type limb_type: str
+    :param names: Base name per limb, overrides limb_type.
+    :type names: list[str]
+    :param pole_vectors: Also create pole vector controls and constraints.
+    :type pole_vectors: bool
+    :param pole_distance: Distance of the poles from the mid joints, in limb lengths.
+    :type pole_distance: float
+    :param skeleton: Skeleton index to read joint positions from instead of the scene.
+    :type skeleton: SkeletonIndex
+
+    :return: One result per limb with name, joints, handle, effector, ctrl, pole,
+             pole_position and constraint keys.
+    :rtype: list[dict]
+    """
+    limbs = [tuple(limb) for limb in limbs]
+    for limb in limbs:
+        if len(limb) != 3:
+            raise ValueError(f"IK limbs need 3 joints, got {len(limb)}: {limb}")
+    if not limbs:
+        return []
+
+    if skeleton is None:
+        skeleton = SkeletonIndex([jnt for limb in limbs for jnt in limb], hierarchy=False)
+    positions = skeleton.positions[skeleton.indices([jnt for limb in limbs for jnt in limb])]
+    starts, mids, ends = positions[0::3], positions[1::3], positions[2::3]
+    poles = compute_pole_positions(starts, mids, ends, distance=pole_distance)
+    # Controls face the dominant direction of each limb
+    axes = np.argmax(np.abs(ends - starts), axis=1)
+
+    base_names = names or [limb_base_name(limb[0], limb_type) for limb in limbs]
+    names = unique_limb_names(base_names)
+
+    results = []
+    for i, (limb, name) in enumerate(zip(limbs, names)):
+        start_joint, _, end_joint = limb
+        ik_handle, effector = cmds.ikHandle(name=f"{name}_IK", startJoint=start_joint,
+                                            endEffector=end_joint, solver="ikRPsolver")[:2]
+
+        ctrl = create_control("circle", name=f"{name}_CTRL", axis=AXIS_NAMES[axes[i]], radius=2.0)
+        cmds.xform(ctrl, worldSpace=True, translation=ends[i].tolist())
+        cmds.parent(ik_handle, ctrl)
+
+        result = {
+            "name": name,
+            "joints": list(limb),
+            "handle": ik_handle,
+            "effector": effector,
+            "ctrl": ctrl,
+            "pole": None,
+            "pole_position": poles[i].tolist(),
+            "constraint": None,
+        }
+        if pole_vectors:
+            pole = create_control("diamond", name=f"{name}_PV", radius=0.5)
+            cmds.xform(pole, worldSpace=True, translation=poles[i].tolist())
+            result["pole"] = pole
+            result["constraint"] = cmds.poleVectorConstraint(pole, ik_handle)[0]
+        results.append(result)
+
+    show_message(f"✅ IK created for <hl>{len(results)}</hl> limbs")
+    print("Created IK limbs: {}".format(", ".join(result["name"] for result in results)))
+    return results
+
+
+@transaction("Create IK Pole Vector Limbs")
+def create_pole_vector_limbs(limb_type=None):
+    """
+    Creates IK limbs with pole vectors from the selected joints, three per limb
+    (shoulder/hip, elbow/knee, wrist/ankle), in selection order.
+
+    :param limb_type: Base name of the limbs, prefixed by the side of the start joint.
+                      Limbs are named after their start joint if None, like L_shoulder_IK.
+    :type limb_type: str
+
+    :return: Results of create_ik_limbs.
+    :rtype: list[dict]
+    """
+    sel = cmds.ls(sl=True, type="joint") or []
+    if not sel or len(sel) % 3:
+        cmds.warning("Select joints in groups of 3 (shoulder/hip, elbow/knee, wrist/ankle).")
+        return
+    return create_ik_limbs([sel[i:i + 3] for i in range(0, len(sel), 3)], limb_type=limb_type)
+
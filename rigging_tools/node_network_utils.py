@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author: Kris Hernandez
+
+:synopsis:
+Module for evaluating utility node networks outside of Maya.
+
+:description:
+This module contains an offline evaluator for the utility node networks the rig
+builders describe, like the squash & stretch network. Plugs are evaluated as NumPy
+arrays over every frame at once, so stretch and squash behavior can be checked across
+thousands of frames as a batch job, without Maya or stepping the timeline.
+
+:applications:
+    Maya
+    Python
+
+:see_also:
+rigging_tools.squash_stretch_utils
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Built-in
+
+# Third party
+import numpy as np
+
+# Internal
+
+# External
+
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+# Maya defaults for the input attributes the evaluator reads
+ATTR_DEFAULTS = {
+    "multiplyDivide": {"operation": 1, "input1": 0.0, "input2": 1.0},
+    "divide": {"input1": 0.0, "input2": 1.0},
+    "multiply": {"input": 1.0},
+    "power": {"input": 0.0, "exponent": 1.0},
+}
+
+VOLUME_TOLERANCE = 1e-3
+
+SCALE_ATTRS = ("scaleX", "scaleY", "scaleZ")
+
+
+def _split_plug(plug):
+    """
+    Splits a plug into its node and attribute.
+    """
+    node, attr = plug.split(".", 1)
+    return node, attr
+
+
+def _multiply_divide(operation, input1, input2):
+    """
+    Evaluates one multiplyDivide channel.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if operation == 1:
+            return input1 * input2
+        if operation == 2:
+            return input1 / input2
+        if operation == 3:
+            return np.power(input1, input2)
+    return input1
+
+
+def evaluate_network(network, inputs):
+    """
+    Evaluates every plug of a network that something reads from.
+
+    Values are looked up in this order: the given inputs, the source of an incoming
+    connection, the values the builder set and the Maya default of the attribute.
+
+    :param network: Network description with nodes and connections keys.
+    :type network: dict
+    :param inputs: Values of the plugs that come from outside the network, like
+                   locator world positions (Fx3 arrays) or control switches.
+    :type inputs: dict
+
+    :return: Value of every connected source plug and every driven plug.
+    :rtype: dict
+    """
+    nodes = network["nodes"]
+    sources = {destination: source for source, destination in network["connections"]}
+    values = {}
+
+    def read(plug):
+        if plug in values:
+            return values[plug]
+        if plug in inputs:
+            value = np.asarray(inputs[plug], dtype=float)
+        elif plug in sources:
+            value = read(sources[plug])
+        else:
+            node, attr = _split_plug(plug)
+            if node not in nodes:
+                raise KeyError(f"No input given for external plug '{plug}'.")
+            if attr in nodes[node]["attrs"]:
+                value = np.asarray(nodes[node]["attrs"][attr], dtype=float)
+            elif _is_output(nodes[node]["type"], attr):
+                value = compute(node, attr)
+            else:
+                value = np.asarray(_default(nodes[node]["type"], attr), dtype=float)
+        values[plug] = value
+        return value
+
+    def compute(node, attr):
+        node_type = nodes[node]["type"]
+        if node_type == "distanceBetween":
+            return np.linalg.norm(read(f"{node}.point2") - read(f"{node}.point1"), axis=-1)
+        if node_type == "multiplyDivide":
+            channel = attr[-1]
+            return _multiply_divide(int(read(f"{node}.operation")),
+                                    read(f"{node}.input1{channel}"),
+                                    read(f"{node}.input2{channel}"))
+        if node_type == "divide":
+            return _multiply_divide(2, read(f"{node}.input1"), read(f"{node}.input2"))
+        if node_type == "multiply":
+            return _multiply_divide(1, read(f"{node}.input[0]"), read(f"{node}.input[1]"))
+        if node_type == "power":
+            return _multiply_divide(3, read(f"{node}.input"), read(f"{node}.exponent"))
+        raise ValueError(f"Cannot evaluate '{node_type}' nodes.")
+
+    for source, destination in network["connections"]:
+        values[destination] = read(source)
+    return values
+
+
+def _is_output(node_type, attr):
+    """
+    Tells if an attribute is an output the evaluator computes.
+    """
+    if node_type == "distanceBetween":
+        return attr == "distance"
+    if node_type == "multiplyDivide":
+        return attr in ("outputX", "outputY", "outputZ")
+    return attr == "output"
+
+
+def _default(node_type, attr):
+    """
+    Returns the Maya default of an input attribute.
+    """
+    defaults = ATTR_DEFAULTS.get(node_type, {})
+    for name, value in defaults.items():
+        if attr == name or attr.startswith(name):
+            return value
+    return 0.0
+
+
+def squash_stretch_inputs(network, start_positions, end_positions, stretch=1.0, squash=1.0):
+    """
+    Builds the evaluator inputs of a squash & stretch network.
+
+    :param network: Network description returned by build_squash_stretch_network.
+    :type network: dict
+    :param start_positions: Per limb Fx3 world positions of the start locator.
+    :type start_positions: list[numpy.ndarray]
+    :param end_positions: Per limb Fx3 world positions of the end locator.
+    :type end_positions: list[numpy.ndarray]
+    :param stretch: Value of the stretch switch, a scalar or one value per frame.
+    :type stretch: float or numpy.ndarray
+    :param squash: Value of the squash switch, a scalar or one value per frame.
+    :type squash: float or numpy.ndarray
+
+    :return: Evaluator inputs.
+    :rtype: dict
+    """
+    inputs = {}
+    for limb, start, end in zip(network["limbs"], start_positions, end_positions):
+        start_loc, end_loc = limb["locators"]
+        inputs[f"{start_loc}.worldPosition[0]"] = start
+        inputs[f"{end_loc}.worldPosition[0]"] = end
+        inputs[f"{limb['ctrl']}.stretch"] = stretch
+        inputs[f"{limb['ctrl']}.squash"] = squash
+    return inputs
+
+
+def evaluate_squash_stretch(network, start_positions, end_positions, stretch=1.0, squash=1.0,
+                            tolerance=VOLUME_TOLERANCE):
+    """
+    Evaluates a squash & stretch network over many frames and checks volume.
+
+    The check does not trust the network's own plugs. The volume of a driven joint
+    is the product of the three scales that reach the joint, unconnected ones
+    counting as 1, and the expected stretch is worked out from the locator
+    positions and the rest length. With both switches fully on, frames where a
+    volume drifts from 1 or the stretch drifts from the expected one further than
+    the tolerance, or where a scale is not finite, are flagged.
+
+    :param network: Network description returned by build_squash_stretch_network.
+    :type network: dict
+    :param start_positions: Per limb Fx3 world positions of the start locator.
+    :type start_positions: list[numpy.ndarray]
+    :param end_positions: Per limb Fx3 world positions of the end locator.
+    :type end_positions: list[numpy.ndarray]
+    :param stretch: Value of the stretch switch, a scalar or one value per frame.
+    :type stretch: float or numpy.ndarray
+    :param squash: Value of the squash switch, a scalar or one value per frame.
+    :type squash: float or numpy.ndarray
+    :param tolerance: Largest accepted distance of the volume from 1.
+    :type tolerance: float
+
+    :return: Per limb dict with ctrl, joint_scales, stretch_scale, expected_stretch,
+             squash_scale, volume (the joint volume furthest from 1 per frame) and
+             volume_errors keys.
+    :rtype: list[dict]
+    """
+    inputs = squash_stretch_inputs(network, start_positions, end_positions, stretch, squash)
+    values = evaluate_network(network, inputs)
+
+    driven = {}
+    for _, destination in network["connections"]:
+        node, attr = _split_plug(destination)
+        driven.setdefault(node, {})[attr] = values[destination]
+
+    switches_on = (np.asarray(stretch) == 1.0) & (np.asarray(squash) == 1.0)
+    results = []
+    for limb, start, end in zip(network["limbs"], start_positions, end_positions):
+        joint_scales = {jnt: driven.get(jnt, {}) for jnt in limb["driven"]}
+        distance = np.linalg.norm(np.asarray(end, dtype=float) - np.asarray(start, dtype=float),
+                                  axis=-1)
+        expected_stretch = np.atleast_1d(distance / limb["rest_length"])
+
+        frames = expected_stretch.shape
+        volumes = np.ones((len(joint_scales),) + frames)
+        with np.errstate(invalid="ignore", over="ignore"):
+            for row, scales in enumerate(joint_scales.values()):
+                for attr in SCALE_ATTRS:
+                    volumes[row] *= np.broadcast_to(scales.get(attr, 1.0), frames)
+            deviation = np.nan_to_num(np.abs(volumes - 1.0), nan=np.inf)
+            volume = np.take_along_axis(volumes, deviation.argmax(axis=0)[None], axis=0)[0]
+
+            stretch_scale = np.atleast_1d(values[limb["stretch"]])
+            drift = (deviation > tolerance).any(axis=0)
+            drift |= np.abs(stretch_scale - expected_stretch) > tolerance * expected_stretch
+
+        error = ~np.isfinite(volumes).all(axis=0) | (switches_on & drift)
+        results.append({
+            "ctrl": limb["ctrl"],
+            "joint_scales": joint_scales,
+            "stretch_scale": stretch_scale,
+            "expected_stretch": expected_stretch,
+            "squash_scale": np.atleast_1d(values[limb["squash"]]),
+            "volume": volume,
+            "volume_errors": np.flatnonzero(error),
+        })
+    return results
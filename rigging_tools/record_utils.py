@@ -0,0 +1,462 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author: Kris Hernandez
+
+:synopsis:
+Module for recording tool sessions and compiling them into replay scripts.
+
+:description:
+This module contains the session recorder. While recording, the cmds attribute of
+every rigging tools module is swapped for a CmdsRecorder that keeps only the scene
+edits the tools make. Queries, selection changes, messages and undo or refresh calls
+are dropped. The recorded edits compile into a plain Python script. Repeated setAttrs
+on one plug keep the last value, duplicate connections are dropped, runs of setAttrs
+and connections are batched into loops over data tables, and created node names are
+kept in variables, so the script still works if Maya renames a node on replay.
+
+Edits made through the API, like skin weights set with set_skin_weights, cannot be
+replayed. They are logged while recording and compiling refuses to drop them
+silently, see CmdsRecorder.compile. Recording and tracing can run at the same time,
+each proxy stays in the chain in front of cmds.
+
+:applications:
+    Maya
+
+:see_also:
+rigging_tools.trace_utils
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Built-in
+import contextlib
+import functools
+import importlib
+import itertools
+import time
+
+# Third party
+
+# Internal
+from auto_rigging_tool_box.rigging_tools.trace_utils import (PACKAGE, install_proxy,
+                                                            remove_proxy, tool_modules)
+
+# External
+
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+# Commands that never edit the scene
+QUERY_COMMANDS = {
+    "allNodeTypes", "attributeQuery", "getAttr", "listAttr", "listConnections",
+    "listHistory", "listRelatives", "ls", "nodeType", "objExists", "objectType",
+}
+
+# Commands that only talk to the user or the session
+SESSION_COMMANDS = {
+    "confirmDialog", "headsUpMessage", "inViewMessage", "progressWindow", "refresh",
+    "select", "undo", "undoInfo", "warning", "error",
+}
+
+QUERY_FLAGS = ("query", "q")
+
+# Positional arguments from this index on are values, never node names
+VALUE_ARGS = {"setAttr": 1, "rename": 1, "createNode": 0, "shadingNode": 0}
+
+# Flags whose string values name existing nodes
+NODE_FLAGS = {
+    "addInfluence", "ai", "endEffector", "ee", "influence", "inf", "parent", "p",
+    "startJoint", "sj",
+}
+
+# Tool functions that edit the scene through the API, by module
+API_EDITS = {"skin_utils": ("set_skin_weights",)}
+
+_RECORDING = {"recorder": None, "modules": [], "api_originals": []}
+
+
+def is_recorded(command, kwargs):
+    """
+    Tells if a command call edits the scene and belongs in the replay script.
+
+    :param command: Name of the command.
+    :type command: str
+    :param kwargs: Flags of the call.
+    :type kwargs: dict
+
+    :return: True if the call is kept.
+    :rtype: bool
+    """
+    if command in QUERY_COMMANDS or command in SESSION_COMMANDS:
+        return False
+    return not any(kwargs.get(flag) for flag in QUERY_FLAGS)
+
+
+def start_recording(modules=None):
+    """
+    Starts recording the scene edits of the rigging tools.
+
+    :param modules: Modules to record, every rigging tools module if None.
+    :type modules: list[module]
+
+    :return: The active recorder.
+    :rtype: CmdsRecorder
+    """
+    if _RECORDING["recorder"] is not None:
+        stop_recording()
+    modules = tool_modules() if modules is None else modules
+    recorder = CmdsRecorder(modules[0].cmds if modules else None)
+    install_proxy(recorder, modules)
+    _RECORDING["recorder"] = recorder
+    _RECORDING["modules"] = modules
+
+    for module_name, functions in API_EDITS.items():
+        module = importlib.import_module(f"{PACKAGE}.{module_name}")
+        for function_name in functions:
+            original = getattr(module, function_name)
+            _RECORDING["api_originals"].append((module, function_name, original))
+            setattr(module, function_name, recorder.wrap_api_edit(
+                f"{module_name}.{function_name}", original))
+    return recorder
+
+
+def stop_recording():
+    """
+    Stops recording and puts the original cmds back.
+
+    :return: The recorder that was active, or None.
+    :rtype: CmdsRecorder
+    """
+    recorder, _RECORDING["recorder"] = _RECORDING["recorder"], None
+    if recorder is not None:
+        remove_proxy(recorder, _RECORDING["modules"])
+    for module, function_name, original in _RECORDING["api_originals"]:
+        setattr(module, function_name, original)
+    _RECORDING["modules"] = []
+    _RECORDING["api_originals"] = []
+    return recorder
+
+
+def is_recording():
+    """
+    Tells if a session is being recorded.
+    """
+    return _RECORDING["recorder"] is not None
+
+
+@contextlib.contextmanager
+def record_session(modules=None):
+    """
+    Records the scene edits of the enclosed code.
+
+    :param modules: Modules to record, every rigging tools module if None.
+    :type modules: list[module]
+    """
+    recorder = start_recording(modules)
+    try:
+        yield recorder
+    finally:
+        stop_recording()
+
+
+def _short_args(args, kwargs, limit=80):
+    """
+    Describes the arguments of an API edit, arrays by their shape.
+    """
+    def describe(value):
+        shape = getattr(value, "shape", None)
+        return f"<array {'x'.join(map(str, shape))}>" if shape is not None else repr(value)
+
+    text = ", ".join([describe(arg) for arg in args] +
+                     [f"{key}={describe(value)}" for key, value in kwargs.items()])
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def node_args(call):
+    """
+    Returns the positions of the positional arguments of a call that name nodes or
+    plugs, and the flags that do.
+    """
+    first_value = VALUE_ARGS.get(call["command"], len(call["args"]))
+    positions = [i for i, arg in enumerate(call["args"][:first_value]) if isinstance(arg, str)]
+    flags = [flag for flag, value in call["kwargs"].items()
+             if flag in NODE_FLAGS and isinstance(value, str)]
+    return positions, flags
+
+
+def plug_keys(calls):
+    """
+    Keys the node and plug arguments of every call by node identity instead of name,
+    so plugs of one node match before and after it is renamed, and a new node that
+    reuses the name of a deleted one does not.
+
+    :param calls: Recorded calls.
+    :type calls: list[dict]
+
+    :return: Per call, a tuple of (node id, attribute) per node positional argument.
+    :rtype: list[tuple]
+    """
+    ids = {}
+    counter = itertools.count()
+
+    def identify(name):
+        node, _, attribute = name.partition(".")
+        if node not in ids:
+            ids[node] = next(counter)
+        return ids[node], attribute
+
+    keys = []
+    for call in calls:
+        positions, _ = node_args(call)
+        keys.append(tuple(identify(call["args"][i]) for i in positions))
+        if call["command"] == "rename" and call["args"] and isinstance(call["result"], str):
+            node = call["args"][0].partition(".")[0]
+            ids[call["result"]] = ids.pop(node)
+        elif call["command"] == "delete":
+            for arg in call["args"]:
+                for node in arg if isinstance(arg, (list, tuple)) else [arg]:
+                    ids.pop(str(node).partition(".")[0], None)
+    return keys
+
+
+def _dedupe(calls):
+    """
+    Keeps the last setAttr of each plug and the first of each identical connection.
+    """
+    keys = plug_keys(calls)
+
+    def set_key(i):
+        return keys[i][0], tuple(sorted(calls[i]["kwargs"]))
+
+    last_set = {}
+    for i, call in enumerate(calls):
+        if call["command"] == "setAttr" and keys[i]:
+            last_set[set_key(i)] = i
+
+    kept = []
+    connections = set()
+    for i, call in enumerate(calls):
+        if call["command"] == "setAttr" and keys[i]:
+            if last_set[set_key(i)] != i:
+                continue
+        elif call["command"] == "connectAttr" and len(keys[i]) == 2:
+            if keys[i] in connections:
+                continue
+            connections.add(keys[i])
+        elif call["command"] == "disconnectAttr" and len(keys[i]) == 2:
+            connections.discard(keys[i])
+        kept.append(call)
+    return kept
+
+
+def compile_script(calls, name="replay", api_edits=None):
+    """
+    Compiles recorded calls into a replay script.
+
+    :param calls: Calls recorded by a CmdsRecorder.
+    :type calls: list[dict]
+    :param name: Name of the undo chunk the script runs in.
+    :type name: str
+    :param api_edits: API edits of the session the script leaves out, listed in its header.
+    :type api_edits: list[dict]
+
+    :return: Source of the replay script.
+    :rtype: str
+    """
+    calls = _dedupe(calls)
+    names = {}
+
+    def expr(value):
+        if isinstance(value, (list, tuple)):
+            items = ", ".join(expr(item) for item in value)
+            if isinstance(value, tuple):
+                return f"({items},)" if len(value) == 1 else f"({items})"
+            return f"[{items}]"
+        if isinstance(value, str):
+            if value in names:
+                return names[value]
+            node, dot, attr = value.partition(".")
+            if dot and node in names:
+                return f"{names[node]} + {('.' + attr)!r}"
+        return repr(value)
+
+    def call_source(call):
+        positions, flags = node_args(call)
+        parts = [expr(arg) if i in positions else repr(arg) for i, arg in enumerate(call["args"])]
+        parts += [f"{key}={expr(value) if key in flags else repr(value)}"
+                  for key, value in call["kwargs"].items()]
+        return f"cmds.{call['command']}({', '.join(parts)})"
+
+    def batchable(call):
+        return call["command"] in ("setAttr", "connectAttr") and len(call["args"]) == 2
+
+    body = []
+    count = 0
+    i = 0
+    while i < len(calls):
+        call = calls[i]
+        if batchable(call):
+            run = [call]
+            while (i + len(run) < len(calls) and batchable(calls[i + len(run)])
+                   and calls[i + len(run)]["command"] == call["command"]
+                   and calls[i + len(run)]["kwargs"] == call["kwargs"]):
+                run.append(calls[i + len(run)])
+            if len(run) > 1:
+                first, second = ("plug", "value") if call["command"] == "setAttr" else \
+                    ("source", "destination")
+                second_expr = repr if call["command"] == "setAttr" else expr
+                flags = "".join(f", {key}={value!r}" for key, value in call["kwargs"].items())
+                body.append(f"for {first}, {second} in [")
+                body += [f"        ({expr(item['args'][0])}, {second_expr(item['args'][1])}),"
+                         for item in run]
+                body.append("]:")
+                body.append(f"    cmds.{call['command']}({first}, {second}{flags})")
+                i += len(run)
+                continue
+
+        result = call["result"]
+        if isinstance(result, str):
+            variable = f"n{count}"
+            count += 1
+            body.append(f"{variable} = {call_source(call)}")
+            if call["command"] == "rename" and call["args"]:
+                names.pop(call["args"][0], None)
+            names[result] = variable
+        elif isinstance(result, (list, tuple)) and result and \
+                all(isinstance(item, str) for item in result):
+            variable = f"n{count}"
+            count += 1
+            body.append(f"{variable} = {call_source(call)}")
+            for j, item in enumerate(result):
+                names[item] = f"{variable}[{j}]"
+        else:
+            body.append(call_source(call))
+            if call["command"] == "delete":
+                for arg in call["args"]:
+                    for node in arg if isinstance(arg, (list, tuple)) else [arg]:
+                        names.pop(node, None)
+        i += 1
+
+    lines = [
+        "# Replay script compiled by rigging_tools.record_utils",
+        f"# {len(calls)} scene edits, recorded {time.strftime('%Y-%m-%d %H:%M:%S')}",
+    ]
+    if api_edits:
+        lines.append(f"# Missing {len(api_edits)} edits made through the API:")
+        lines += [f"#     {edit['function']}({edit['args']})" for edit in api_edits]
+    lines += [
+        "import maya.cmds as cmds",
+        "",
+        f"cmds.undoInfo(openChunk=True, chunkName={name!r})",
+        "cmds.refresh(suspend=True)",
+        "try:",
+    ]
+    lines += [f"    {line}" for line in body] or ["    pass"]
+    lines += [
+        "finally:",
+        "    cmds.refresh(suspend=False)",
+        "    cmds.undoInfo(closeChunk=True)",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
+
+class CmdsRecorder(object):
+    """
+    Stand-in for cmds that forwards every command and records the scene edits.
+
+    Each recorded call is a dict with command, args, kwargs and result keys. Edits
+    made through the API are logged in api_edits as dicts with function and args keys.
+    """
+
+    def __init__(self, cmds):
+        self._cmds = cmds
+        self._wrapped = {}
+        self.calls = []
+        self.api_edits = []
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        wrapped = self._wrapped.get(name)
+        if wrapped is None:
+            wrapped = self._wrap(name, getattr(self._cmds, name))
+            self._wrapped[name] = wrapped
+        return wrapped
+
+    def _wrap(self, name, command):
+        """
+        Returns a recording version of one command.
+        """
+        if not callable(command):
+            return command
+
+        def recorded(*args, **kwargs):
+            result = command(*args, **kwargs)
+            if is_recorded(name, kwargs):
+                self.calls.append({"command": name, "args": list(args), "kwargs": dict(kwargs),
+                                   "result": result})
+            return result
+        recorded.__name__ = name
+        return recorded
+
+    def wrap_api_edit(self, name, function):
+        """
+        Returns a version of a tool function that logs its calls as API edits.
+        """
+        @functools.wraps(function)
+        def logged(*args, **kwargs):
+            self.api_edits.append({"function": name, "args": _short_args(args, kwargs)})
+            return function(*args, **kwargs)
+        return logged
+
+    def clear(self):
+        """
+        Drops every recorded call and API edit.
+        """
+        self.calls = []
+        self.api_edits = []
+
+    def compile(self, name="replay", partial=False):
+        """
+        Compiles the recorded calls into a replay script, see compile_script.
+
+        :param name: Name of the undo chunk the script runs in.
+        :type name: str
+        :param partial: Compile even though the session made API edits the script
+                        cannot replay, they are listed in the script header.
+        :type partial: bool
+
+        :raises RuntimeError: If the session made API edits and partial is off.
+        """
+        if self.api_edits and not partial:
+            functions = sorted({edit["function"] for edit in self.api_edits})
+            raise RuntimeError(f"The session made {len(self.api_edits)} edits through the API "
+                               f"({', '.join(functions)}) that a replay script cannot "
+                               f"rebuild.")
+        return compile_script(self.calls, name, self.api_edits)
+
+    def write_script(self, path, name="replay", partial=False):
+        """
+        Writes the replay script to a file.
+
+        :param path: Path of the script.
+        :type path: str
+        :param name: Name of the undo chunk the script runs in.
+        :type name: str
+        :param partial: Write it even if API edits are missing, see compile.
+        :type partial: bool
+        """
+        source = self.compile(name, partial)
+        with open(path, "w") as script_file:
+            script_file.write(source)
@@ -0,0 +1,586 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author: Kris Hernandez
+
+:synopsis:
+Module for building rigs from a rig spec file.
+
+:description:
+This module contains the headless rig build pipeline. A rig spec (JSON, or YAML when
+PyYAML is installed) lists the components of a rig, like FK chains, IK limbs, squash
+& stretch and skin binds. The pipeline orders them by their dependencies, resolves
+joint chains through one skeleton index and calls the explicit-argument builders,
+so no selection or GUI is needed. Every stage is timed and runs in its own
+transaction, so a failed stage is rolled back.
+
+Each built component stores a hash of its inputs (options, joints and their world
+matrices) and the UUIDs of the nodes it created on a network node. FK components in
+matrix mode also store the joint values they zero, so a teardown can put them back. An incremental
+run only tears down and rebuilds the components whose hash changed, along with the
+components depending on them, and skips the rest.
+
+Example spec::
+
+    {
+        "name": "hero",
+        "components": [
+            {"name": "spine", "type": "fk", "start": "C_spine_01", "end": "C_spine_05",
+             "options": {"mode": "matrix"}},
+            {"name": "L_arm", "type": "ik", "start": "L_shoulder", "end": "L_wrist"},
+            {"name": "L_arm_stretch", "type": "squash_stretch", "ctrl": "L_arm_CTRL",
+             "start": "L_shoulder", "end": "L_wrist", "depends": ["L_arm"]},
+            {"name": "body_skin", "type": "skin", "mesh": "body_GEO",
+             "options": {"max_influences": 4}, "depends": ["spine", "L_arm_stretch"]}
+        ]
+    }
+
+Run it in batch with ``mayapy -m auto_rigging_tool_box.rigging_tools.rig_pipeline spec.json``.
+
+:applications:
+    Maya
+    Python
+
+:see_also:
+rigging_tools.fk_utils
+rigging_tools.ik_utils
+rigging_tools.squash_stretch_utils
+rigging_tools.skin_utils
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Built-in
+import argparse
+import hashlib
+import json
+import sys
+import time
+
+# Third party
+import maya.cmds as cmds
+import numpy as np
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# Internal
+from auto_rigging_tool_box.rigging_tools.fk_utils import create_fk_chains
+from auto_rigging_tool_box.rigging_tools.ik_utils import create_ik_limb
+from auto_rigging_tool_box.rigging_tools.skeleton_utils import SkeletonIndex
+from auto_rigging_tool_box.rigging_tools.skin_utils import bind_skin
+from auto_rigging_tool_box.rigging_tools.squash_stretch_utils import create_squash_stretch_chains
+from auto_rigging_tool_box.rigging_tools.undo_utils import in_transaction, rig_transaction
+
+# External
+
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+YAML_EXTENSIONS = (".yaml", ".yml")
+
+META_SUFFIX = "_META"
+
+# Decimals of the world matrices that go into a component hash
+HASH_PRECISION = 5
+
+# Joint channels zeroed by FK components in matrix mode, see fk_utils.drive_joint_by_matrix
+JOINT_CHANNELS = ("translate", "rotate", "jointOrient")
+
+
+def load_rig_spec(path):
+    """
+    Loads a rig spec from a JSON or YAML file.
+
+    :param path: Path of the spec file.
+    :type path: str
+
+    :return: The rig spec.
+    :rtype: dict
+    """
+    with open(path, "r") as spec_file:
+        if path.lower().endswith(YAML_EXTENSIONS):
+            if yaml is None:
+                raise ImportError("PyYAML is needed to read YAML rig specs.")
+            spec = yaml.safe_load(spec_file)
+        else:
+            spec = json.load(spec_file)
+
+    if not isinstance(spec, dict) or not isinstance(spec.get("components"), list):
+        raise ValueError(f"Rig spec '{path}' needs a list of components.")
+    return spec
+
+
+def sort_components(components):
+    """
+    Orders components so each one comes after the components it depends on.
+    Independent components keep their order from the spec.
+
+    :param components: Components of a rig spec.
+    :type components: list[dict]
+
+    :return: The ordered components.
+    :rtype: list[dict]
+    """
+    by_name = {}
+    for component in components:
+        name = component.get("name")
+        if not name:
+            raise ValueError(f"Component without a name: {component}")
+        if component.get("type") not in COMPONENT_BUILDERS:
+            raise ValueError(f"Component '{name}' has unknown type '{component.get('type')}', "
+                             f"use one of {', '.join(COMPONENT_BUILDERS)}.")
+        if name in by_name:
+            raise ValueError(f"Component name '{name}' is used twice.")
+        by_name[name] = component
+
+    for name, component in by_name.items():
+        for dependency in component.get("depends", []):
+            if dependency not in by_name:
+                raise ValueError(f"Component '{name}' depends on unknown '{dependency}'.")
+
+    ordered = []
+    done = set()
+    remaining = list(by_name)
+    while remaining:
+        ready = [name for name in remaining
+                 if all(dependency in done for dependency in by_name[name].get("depends", []))]
+        if not ready:
+            raise ValueError(f"Components have a dependency cycle: {', '.join(remaining)}")
+        for name in ready:
+            ordered.append(by_name[name])
+            done.add(name)
+        remaining = [name for name in remaining if name not in done]
+    return ordered
+
+
+def _short_names(paths):
+    """
+    Strips long paths down to short node names.
+    """
+    return [path.rsplit("|", 1)[-1] for path in paths]
+
+
+def resolve_joints(component, skeleton):
+    """
+    Returns the joints of a component, either listed under joints or the chain
+    from start down to end.
+
+    :param component: Component of a rig spec.
+    :type component: dict
+    :param skeleton: Skeleton index of the rig.
+    :type skeleton: SkeletonIndex
+
+    :return: Short names of the joints, ordered from root to tip.
+    :rtype: list[str]
+    """
+    if component.get("joints"):
+        return list(component["joints"])
+    if component.get("start") and component.get("end"):
+        return _short_names(skeleton.chain_between(component["start"], component["end"]))
+    raise ValueError(f"Component '{component['name']}' needs joints or start and end.")
+
+
+def binds_every_joint(component):
+    """
+    Returns whether a component is a skin without listed joints, bound to every
+    indexed joint.
+    """
+    return component["type"] == "skin" and not (component.get("joints") or component.get("start"))
+
+
+def component_joints(component, skeleton):
+    """
+    Returns the joints of a component, skin components without listed joints use
+    every indexed joint.
+    """
+    if binds_every_joint(component):
+        return _short_names(skeleton.paths)
+    return resolve_joints(component, skeleton)
+
+
+def build_fk(component, skeleton):
+    """
+    Builds an FK chain component.
+    """
+    return create_fk_chains([resolve_joints(component, skeleton)], skeleton=skeleton,
+                            **component.get("options", {}))
+
+
+def build_ik(component, skeleton):
+    """
+    Builds an IK limb component, limb_type defaults to the component name.
+    """
+    options = dict(component.get("options", {}))
+    options.setdefault("limb_type", component["name"])
+    joints = resolve_joints(component, skeleton)
+    if len(joints) > 3:
+        # Keep the root, the middle joint and the tip of longer chains
+        joints = [joints[0], joints[len(joints) // 2], joints[-1]]
+    return create_ik_limb(joints, skeleton=skeleton, **options)
+
+
+def build_squash_stretch(component, skeleton):
+    """
+    Builds a squash & stretch component driven by the component's ctrl.
+    """
+    if not component.get("ctrl"):
+        raise ValueError(f"Component '{component['name']}' needs a ctrl.")
+    options = dict(component.get("options", {}))
+    options.setdefault("name", component["name"])
+    return create_squash_stretch_chains([(component["ctrl"], resolve_joints(component, skeleton))],
+                                        skeleton=skeleton, **options)
+
+
+def build_skin(component, skeleton):
+    """
+    Builds a skin component, binding every indexed joint if none are listed.
+    """
+    if not component.get("mesh"):
+        raise ValueError(f"Component '{component['name']}' needs a mesh.")
+    skin = bind_skin(joints=component_joints(component, skeleton), mesh=component["mesh"],
+                     **component.get("options", {}))
+    if skin is None:
+        raise RuntimeError(f"Could not bind '{component['mesh']}'.")
+    return skin
+
+
+COMPONENT_BUILDERS = {
+    "fk": build_fk,
+    "ik": build_ik,
+    "squash_stretch": build_squash_stretch,
+    "skin": build_skin,
+}
+
+
+def component_hash(component, skeleton):
+    """
+    Hashes the inputs of a component: its spec entry (type, options, shape, ctrl,
+    mesh), its joints and their world matrices.
+
+    Skins bound to every indexed joint only hash the joint names, otherwise moving
+    any joint would rebind every such skin. They are rebuilt with the components
+    they depend on instead.
+
+    :param component: Component of a rig spec.
+    :type component: dict
+    :param skeleton: Skeleton index of the rig.
+    :type skeleton: SkeletonIndex
+
+    :return: Hex digest of the inputs.
+    :rtype: str
+    """
+    joints = component_joints(component, skeleton)
+
+    entry = {key: value for key, value in component.items() if key != "depends"}
+    digest = hashlib.sha1()
+    digest.update(json.dumps(entry, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(json.dumps(joints).encode("utf-8"))
+    if not binds_every_joint(component):
+        matrices = np.round(skeleton.matrices[skeleton.indices(joints)], HASH_PRECISION) + 0.0
+        digest.update(matrices.tobytes())
+    return digest.hexdigest()
+
+
+def meta_node_name(spec, component):
+    """
+    Returns the name of the network node holding a component's build data.
+    """
+    return f"{spec.get('name', 'rig')}_{component['name']}{META_SUFFIX}"
+
+
+def read_component_meta(spec, component):
+    """
+    Reads the input hash and created node UUIDs stored for a component.
+
+    :return: (input hash, created node UUIDs), or None if the component was never built.
+    :rtype: tuple(str, list[str])
+    """
+    meta = meta_node_name(spec, component)
+    if not cmds.objExists(meta):
+        return None
+    input_hash = cmds.getAttr(f"{meta}.inputHash") or ""
+    created = json.loads(cmds.getAttr(f"{meta}.createdNodes") or "[]")
+    return input_hash, created
+
+
+def write_component_meta(spec, component, input_hash, created, joint_values=None):
+    """
+    Stores the input hash, created node UUIDs and original joint values of a
+    component on its network node.
+    """
+    meta = meta_node_name(spec, component)
+    if not cmds.objExists(meta):
+        meta = cmds.createNode("network", name=meta)
+        for attr in ("componentType", "inputHash", "createdNodes", "jointValues"):
+            cmds.addAttr(meta, longName=attr, dataType="string")
+    cmds.setAttr(f"{meta}.componentType", component["type"], type="string")
+    cmds.setAttr(f"{meta}.inputHash", input_hash, type="string")
+    cmds.setAttr(f"{meta}.createdNodes", json.dumps(created), type="string")
+    cmds.setAttr(f"{meta}.jointValues", json.dumps(joint_values or {}), type="string")
+
+
+def read_joint_values(component, skeleton):
+    """
+    Reads the joint values an FK component in matrix mode is about to zero, along
+    with the offsetParentMatrix it drives.
+
+    :param component: Component of a rig spec.
+    :type component: dict
+    :param skeleton: Skeleton index of the rig.
+    :type skeleton: SkeletonIndex
+
+    :return: Channel values per joint, empty for every other component.
+    :rtype: dict
+    """
+    if component["type"] != "fk" or component.get("options", {}).get("mode") != "matrix":
+        return {}
+    values = {}
+    for jnt in resolve_joints(component, skeleton):
+        values[jnt] = {channel: list(cmds.getAttr(f"{jnt}.{channel}")[0])
+                       for channel in JOINT_CHANNELS}
+        values[jnt]["offsetParentMatrix"] = list(cmds.getAttr(f"{jnt}.offsetParentMatrix"))
+    return values
+
+
+def restore_joint_values(joint_values):
+    """
+    Sets joints back to the values read by read_joint_values.
+    """
+    for jnt, values in joint_values.items():
+        for channel in JOINT_CHANNELS:
+            cmds.setAttr(f"{jnt}.{channel}", *values[channel])
+        cmds.setAttr(f"{jnt}.offsetParentMatrix", values["offsetParentMatrix"], type="matrix")
+
+
+def teardown_component(spec, component):
+    """
+    Deletes the nodes a component created and its network node, and sets the joints
+    it zeroed back to their original values.
+
+    :return: Number of nodes deleted.
+    :rtype: int
+    """
+    meta = read_component_meta(spec, component)
+    if meta is None:
+        return 0
+    meta_node = meta_node_name(spec, component)
+    nodes = cmds.ls(meta[1], long=True) if meta[1] else []
+    if nodes:
+        cmds.delete(nodes)
+    # Restore after the delete, which drops the connections driving the joints
+    restore_joint_values(json.loads(cmds.getAttr(f"{meta_node}.jointValues") or "{}"))
+    cmds.delete(meta_node)
+    return len(nodes)
+
+
+def created_nodes(component_type, result):
+    """
+    Lists the top nodes a builder created, from the builder's result. Deleting them
+    removes the component, children like offset groups and effectors go with them.
+
+    :param component_type: Type of the component, see COMPONENT_BUILDERS.
+    :type component_type: str
+    :param result: What the component's builder returned.
+    :type result: object
+
+    :return: Names of the created nodes.
+    :rtype: list[str]
+    """
+    if component_type == "fk":
+        nodes = [result[0]["group"]] if result else []
+        nodes += [driver for chain in result for driver in chain["drivers"]]
+    elif component_type == "ik":
+        nodes = list(result)
+    elif component_type == "squash_stretch":
+        nodes = list(result["nodes"])
+        nodes += [locator for limb in result["limbs"] for locator in limb["locators"]]
+    else:
+        nodes = [result]
+    return nodes
+
+
+def build_component(spec, component, skeleton, input_hash):
+    """
+    Builds one component in its own transaction and records the UUIDs of the nodes
+    it created, taken from the builder's result.
+
+    A failed build is rolled back. When it cannot be, inside a transaction that is
+    already open or with undo turned off, the nodes it left behind are recorded with
+    an empty hash instead, and the next incremental run tears them down.
+
+    :return: Result of the component's builder.
+    :rtype: object
+    """
+    # Only scan the scene when the transaction cannot roll a failed build back
+    no_rollback = in_transaction() or not cmds.undoInfo(query=True, state=True)
+    before = set(cmds.ls(uuid=True) or []) if no_rollback else None
+    joint_values = read_joint_values(component, skeleton)
+    try:
+        with rig_transaction(f"Build {component['name']}"):
+            result = COMPONENT_BUILDERS[component["type"]](component, skeleton)
+            nodes = created_nodes(component["type"], result)
+            created = (cmds.ls(nodes, uuid=True) or []) if nodes else []
+            write_component_meta(spec, component, input_hash, created, joint_values)
+    except Exception:
+        if no_rollback:
+            left = [uuid for uuid in cmds.ls(uuid=True) or [] if uuid not in before]
+            if left:
+                write_component_meta(spec, component, "", left, joint_values)
+        raise
+    return result
+
+
+def run_rig_spec(spec, skeleton=None, incremental=False):
+    """
+    Builds every component of a rig spec in dependency order.
+
+    A failing component is recorded and the components depending on it are skipped,
+    the rest of the rig is still built. In incremental mode, components whose input
+    hash matches the one stored in the scene are left as they are. The others, and
+    everything depending on them, are torn down and built again.
+
+    :param spec: The rig spec, see load_rig_spec.
+    :type spec: dict
+    :param skeleton: Skeleton index to build from, every joint in the scene if None.
+    :type skeleton: SkeletonIndex
+    :param incremental: Only rebuild the components whose inputs changed.
+    :type incremental: bool
+
+    :return: Report with name, seconds, failed, unchanged and stages keys. Each stage
+             has name, type, status, seconds and error or result keys.
+    :rtype: dict
+    """
+    start = time.perf_counter()
+    rig_name = spec.get("name", "rig")
+    components = sort_components(spec["components"])
+    if skeleton is None:
+        skeleton = SkeletonIndex(spec.get("roots"))
+
+    # Hash every component up front, before any teardown touches the scene
+    hashes = {}
+    for component in components:
+        try:
+            hashes[component["name"]] = component_hash(component, skeleton)
+        except (KeyError, ValueError):
+            hashes[component["name"]] = None
+
+    rebuild = set()
+    if incremental:
+        for component in components:
+            meta = read_component_meta(spec, component)
+            changed = (meta is None or hashes[component["name"]] is None
+                       or meta[0] != hashes[component["name"]])
+            if changed or any(dependency in rebuild for dependency in component.get("depends", [])):
+                rebuild.add(component["name"])
+        for component in reversed(components):
+            if component["name"] in rebuild:
+                teardown_component(spec, component)
+    else:
+        rebuild = {component["name"] for component in components}
+
+    stages = []
+    failed = set()
+    unchanged = []
+    for component in components:
+        name = component["name"]
+        stage = {"name": name, "type": component["type"], "status": "done", "seconds": 0.0}
+        stages.append(stage)
+
+        if name not in rebuild:
+            stage["status"] = "unchanged"
+            unchanged.append(name)
+            print(f"[{rig_name}] {name} ({component['type']}) unchanged, skipped")
+            continue
+
+        blocked = [dependency for dependency in component.get("depends", [])
+                   if dependency in failed]
+        if blocked:
+            stage["status"] = "skipped"
+            stage["error"] = f"depends on failed {', '.join(blocked)}"
+            failed.add(name)
+            continue
+
+        stage_start = time.perf_counter()
+        try:
+            stage["result"] = build_component(spec, component, skeleton, hashes[name] or "")
+        except Exception as error:
+            stage["status"] = "failed"
+            stage["error"] = str(error)
+            failed.add(name)
+        stage["seconds"] = time.perf_counter() - stage_start
+        print(f"[{rig_name}] {name} ({component['type']}) "
+              f"{stage['status']} in {stage['seconds']:.3f}s")
+
+    report = {
+        "name": rig_name,
+        "seconds": time.perf_counter() - start,
+        "failed": sorted(failed),
+        "unchanged": unchanged,
+        "stages": stages,
+    }
+    built = len(stages) - len(failed) - len(unchanged)
+    print(f"[{rig_name}] built {built}/{len(stages)} components, {len(unchanged)} unchanged, "
+          f"in {report['seconds']:.3f}s")
+    return report
+
+
+def initialize_standalone():
+    """
+    Starts maya.standalone when running outside of an interactive Maya.
+
+    :return: True if standalone was started, False when it is not available.
+    :rtype: bool
+    """
+    try:
+        import maya.standalone
+    except ImportError:
+        return False
+    maya.standalone.initialize(name="python")
+    return True
+
+
+def main(argv=None):
+    """
+    Command line entry point, builds one rig spec and optionally saves the scene.
+
+    :return: Exit code, 1 if any component failed.
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description="Build a rig from a rig spec file.")
+    parser.add_argument("spec", help="JSON or YAML rig spec.")
+    parser.add_argument("--scene", help="Scene to open before building, overrides the spec.")
+    parser.add_argument("--save", help="Path to save the built scene to.")
+    parser.add_argument("--report", help="Path to write the JSON build report to.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only rebuild the components whose inputs changed.")
+    args = parser.parse_args(argv)
+
+    initialize_standalone()
+    spec = load_rig_spec(args.spec)
+
+    scene = args.scene or spec.get("scene")
+    if scene:
+        cmds.file(scene, open=True, force=True)
+
+    report = run_rig_spec(spec, incremental=args.incremental)
+
+    if args.save:
+        cmds.file(rename=args.save)
+        file_type = "mayaAscii" if args.save.lower().endswith(".ma") else "mayaBinary"
+        cmds.file(save=True, force=True, type=file_type)
+    if args.report:
+        with open(args.report, "w") as report_file:
+            json.dump(report, report_file, indent=4, default=str)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -37,20 +37,9 @@ import os
 
 # Third party
 from PySide2 import QtWidgets, QtCore, QtGui
-from functools import partial
 
 # Internal
-from auto_rigging_tool_box.rigging_tools.gen_utils import (freeze_transforms, delete_history, center_pivot,
-                                     mirror_joints, orient_joints, reset_translation,
-                                     reset_rotation, reset_scale, reset_translation_rotation)
-from auto_rigging_tool_box.rigging_tools.curve_utils import (set_override_color, create_curve_circle,
-                                                         create_curve_cube, create_ik_curve, create_e_curve,
-                                                         create_k_curve,create_arrow_curve, create_diamond_curve,
-                                                         create_arrow_four_curve, create_arrow_double_curve)
-from auto_rigging_tool_box.rigging_tools.ik_utils import create_ik_controls
-from auto_rigging_tool_box.rigging_tools.fk_utils import create_fk_controls
-from auto_rigging_tool_box.rigging_tools.squash_stretch_utils import create_squash_stretch_limb
-from auto_rigging_tool_box.rigging_tools.skin_utils import (bind_skin, mirror_skin_weights, delete_skin)
+from auto_rigging_tool_box.rigging_tools import get_tool
 
 
  # External
@@ -59,6 +48,10 @@ from auto_rigging_tool_box.rigging_tools.skin_utils import (bind_skin, mirror_sk
 #----------------------------------------------------------------------------------------#
 #--------------------------------------------------------------------------- FUNCTIONS --#
 
+# Same as fk_utils.FK_MODES, listed here so building the window does not import fk_utils
+FK_MODE_LABELS = ("constraint", "matrix")
+
+
 def get_maya_window():
     """
     Return Maya's main window as a QWidget, so we can parent custom UIs to it.
@@ -72,6 +65,24 @@ def get_maya_window():
     main_window_ptr = omui.MQtUtil.mainWindow()
     return wrapInstance(int(main_window_ptr), QtWidgets.QWidget)
 
+
+def tool_slot(tool, *tool_args, **tool_kwargs):
+    """
+    Wraps a tool for a button, so Qt's clicked(checked) argument is not passed on.
+    Tools given by name are looked up in the tool registry on the first click, so
+    their modules are not imported while the GUI is built.
+
+    :param tool: Tool function, or its name in the tool registry, to call on click.
+    :type tool: function or str
+
+    :return: Slot function for the clicked signal.
+    :rtype: function
+    """
+    def slot(*args):
+        func = get_tool(tool) if isinstance(tool, str) else tool
+        return func(*tool_args, **tool_kwargs)
+    return slot
+
 #----------------------------------------------------------------------------------------#
 #----------------------------------------------------------------------------- CLASSES --#
 
@@ -118,9 +129,9 @@ class RiggingToolsGUI(QtWidgets.QDialog):
         gen_layout.addWidget(self.center_pivot_btn)
 
         # Connect buttons
-        self.freeze_transforms_btn.clicked.connect(freeze_transforms)
-        self.delete_history_btn.clicked.connect(delete_history)
-        self.center_pivot_btn.clicked.connect(center_pivot)
+        self.freeze_transforms_btn.clicked.connect(tool_slot("freeze_transforms"))
+        self.delete_history_btn.clicked.connect(tool_slot("delete_history"))
+        self.center_pivot_btn.clicked.connect(tool_slot("center_pivot"))
 
         # Add widgets
         gen_layout.addWidget(self.freeze_transforms_btn)
@@ -140,8 +151,8 @@ class RiggingToolsGUI(QtWidgets.QDialog):
         general_tab_layout.addWidget(joint_group)
 
         # Connect buttons
-        self.mirror_joints_btn.clicked.connect(mirror_joints)
-        self.orient_joints_btn.clicked.connect(orient_joints)
+        self.mirror_joints_btn.clicked.connect(tool_slot("mirror_joints"))
+        self.orient_joints_btn.clicked.connect(tool_slot("orient_joints"))
 
         # Add widgets
         joint_layout.addWidget(self.mirror_joints_btn)
@@ -156,21 +167,37 @@ class RiggingToolsGUI(QtWidgets.QDialog):
         self.bind_skin_btn = QtWidgets.QPushButton("Bind Skin")
         self.mirror_skin_btn = QtWidgets.QPushButton("Mirror Skin")
         self.delete_skin_btn = QtWidgets.QPushButton("Delete Skin Cluster")
+        self.export_weights_btn = QtWidgets.QPushButton("Export Skin Weights")
+        self.import_weights_btn = QtWidgets.QPushButton("Import Skin Weights")
+        self.prune_weights_btn = QtWidgets.QPushButton("Prune Skin Weights")
+        self.smooth_weights_btn = QtWidgets.QPushButton("Smooth Skin Weights")
         skin_layout.addWidget(self.bind_skin_btn)
         skin_layout.addWidget(self.mirror_skin_btn)
         skin_layout.addWidget(self.delete_skin_btn)
+        skin_layout.addWidget(self.export_weights_btn)
+        skin_layout.addWidget(self.import_weights_btn)
+        skin_layout.addWidget(self.prune_weights_btn)
+        skin_layout.addWidget(self.smooth_weights_btn)
 
         general_tab_layout.addWidget(skin_group)
 
         # Connect buttons
-        self.bind_skin_btn.clicked.connect(bind_skin)
-        self.mirror_skin_btn.clicked.connect(mirror_skin_weights)
-        self.delete_skin_btn.clicked.connect(delete_skin)
+        self.bind_skin_btn.clicked.connect(tool_slot("bind_skin"))
+        self.mirror_skin_btn.clicked.connect(tool_slot("mirror_skin_weights"))
+        self.delete_skin_btn.clicked.connect(tool_slot("delete_skin"))
+        self.export_weights_btn.clicked.connect(self.export_weights)
+        self.import_weights_btn.clicked.connect(self.import_weights)
+        self.prune_weights_btn.clicked.connect(tool_slot("prune_skin_weights"))
+        self.smooth_weights_btn.clicked.connect(tool_slot("smooth_skin_weights"))
 
         # Add widgets
         skin_layout.addWidget(self.bind_skin_btn)
         skin_layout.addWidget(self.mirror_skin_btn)
         skin_layout.addWidget(self.delete_skin_btn)
+        skin_layout.addWidget(self.export_weights_btn)
+        skin_layout.addWidget(self.import_weights_btn)
+        skin_layout.addWidget(self.prune_weights_btn)
+        skin_layout.addWidget(self.smooth_weights_btn)
         general_tab_layout.addWidget(gen_group)
 
         # -------------------------------
@@ -184,10 +211,10 @@ class RiggingToolsGUI(QtWidgets.QDialog):
         self.reset_scale_btn = QtWidgets.QPushButton("Reset Scale")
 
         # Connect buttons
-        self.reset_translation_btn.clicked.connect(reset_translation)
-        self.reset_rotation_btn.clicked.connect(reset_rotation)
-        self.reset_trans_rot_btn.clicked.connect(reset_translation_rotation)
-        self.reset_scale_btn.clicked.connect(reset_scale)
+        self.reset_translation_btn.clicked.connect(tool_slot("reset_translation"))
+        self.reset_rotation_btn.clicked.connect(tool_slot("reset_rotation"))
+        self.reset_trans_rot_btn.clicked.connect(tool_slot("reset_translation_rotation"))
+        self.reset_scale_btn.clicked.connect(tool_slot("reset_scale"))
 
         # Add widgets
         trans_layout.addWidget(self.reset_translation_btn)
@@ -198,6 +225,23 @@ class RiggingToolsGUI(QtWidgets.QDialog):
 
         # -------------------------------
 
+        # Session Recording Group
+        record_group = QtWidgets.QGroupBox("Session Recording")
+        record_layout = QtWidgets.QVBoxLayout(record_group)
+        self.start_recording_btn = QtWidgets.QPushButton("Start Recording")
+        self.stop_recording_btn = QtWidgets.QPushButton("Stop and Save Replay Script")
+
+        # Connect buttons
+        self.start_recording_btn.clicked.connect(tool_slot("start_recording"))
+        self.stop_recording_btn.clicked.connect(self.save_replay_script)
+
+        # Add widgets
+        record_layout.addWidget(self.start_recording_btn)
+        record_layout.addWidget(self.stop_recording_btn)
+        general_tab_layout.addWidget(record_group)
+
+        # -------------------------------
+
         # Add this tab to the window
         tab_widget.addTab(general_tab, "General Tools")
 
@@ -231,11 +275,18 @@ class RiggingToolsGUI(QtWidgets.QDialog):
         for name, index in colors.items():
             btn = QtWidgets.QPushButton(name)
             # Pass the color index to the function
-            btn.clicked.connect(partial(set_override_color, index))
+            btn.clicked.connect(tool_slot("set_override_color", index))
             color_tab_layout.addWidget(btn)
 
         # -------------------------------
 
+        # Scene-wide side colors, L_ blue, R_ red, C_ yellow
+        self.side_colors_btn = QtWidgets.QPushButton("Apply Side Colors To All Controls")
+        self.side_colors_btn.clicked.connect(tool_slot("apply_side_colors"))
+        color_tab_layout.addWidget(self.side_colors_btn)
+
+        # -------------------------------
+
         # Add this tab to the window
         tab_widget.addTab(color_tab, "Color Curve Override Util")
 
@@ -246,78 +297,12 @@ class RiggingToolsGUI(QtWidgets.QDialog):
 
         # -------------------------------
 
-        # Shape Buttons Group
-        shapes_group = QtWidgets.QGroupBox("Custom Shapes")
-        shapes_layout = QtWidgets.QVBoxLayout(shapes_group)
-        self.circle_btn = QtWidgets.QPushButton("Circle")
-        self.cube_btn = QtWidgets.QPushButton("3D Cube")
-        self.diamond_btn = QtWidgets.QPushButton("Diamond")
-        self.ik_btn = QtWidgets.QPushButton("IK Star Handle")
-
-        shapes_layout.addWidget(self.circle_btn)
-        shapes_layout.addWidget(self.cube_btn)
-        shapes_layout.addWidget(self.diamond_btn)
-        shapes_layout.addWidget(self.ik_btn)
-        curves_tab_layout.addWidget(shapes_group)
-
-        # Connect buttons
-        self.circle_btn.clicked.connect(create_curve_circle)
-        self.cube_btn.clicked.connect(create_curve_cube)
-        self.diamond_btn.clicked.connect(create_diamond_curve)
-        self.ik_btn.clicked.connect(create_ik_curve)
-
-        # Add widgets
-        shapes_layout.addWidget(self.circle_btn)
-        shapes_layout.addWidget(self.cube_btn)
-        shapes_layout.addWidget(self.diamond_btn)
-        shapes_layout.addWidget(self.ik_btn)
-        curves_tab_layout.addWidget(shapes_group)
-
-        # -------------------------------
-
-        # Letter Buttons Group
-        letter_group = QtWidgets.QGroupBox("Custom Letters")
-        letter_layout = QtWidgets.QVBoxLayout(letter_group)
-        self.e_btn = QtWidgets.QPushButton("E")
-        self.k_btn = QtWidgets.QPushButton("K")
-
-        letter_layout.addWidget(self.e_btn)
-        letter_layout.addWidget(self.k_btn)
-        curves_tab_layout.addWidget(letter_group)
-
-        # Connect buttons
-        self.e_btn.clicked.connect(create_e_curve)
-        self.k_btn.clicked.connect(create_k_curve)
-
-        # Add widgets
-        letter_layout.addWidget(self.e_btn)
-        letter_layout.addWidget(self.k_btn)
-        curves_tab_layout.addWidget(letter_group)
-
-        # -------------------------------
-
-        # Arrow Buttons Group
-        arrow_group = QtWidgets.QGroupBox("Custom Arrows")
-        arrow_layout = QtWidgets.QVBoxLayout(arrow_group)
-        self.arrow_btn = QtWidgets.QPushButton("One Sided Arrow")
-        self.arrow_double_btn = QtWidgets.QPushButton("Double Sided Arrow")
-        self.arrow_four_btn = QtWidgets.QPushButton("Four Sided Arrow")
-
-        arrow_layout.addWidget(self.arrow_btn)
-        arrow_layout.addWidget(self.arrow_double_btn)
-        arrow_layout.addWidget(self.arrow_four_btn)
-        curves_tab_layout.addWidget(arrow_group)
-
-        # Connect buttons
-        self.arrow_btn.clicked.connect(create_arrow_curve)
-        self.arrow_double_btn.clicked.connect(create_arrow_double_curve)
-        self.arrow_four_btn.clicked.connect(create_arrow_four_curve)
-
-        # Add widgets
-        arrow_layout.addWidget(self.arrow_btn)
-        arrow_layout.addWidget(self.arrow_double_btn)
-        arrow_layout.addWidget(self.arrow_four_btn)
-        curves_tab_layout.addWidget(arrow_group)
+        # Shape Buttons Groups are added the first time the tab is shown, see add_shape_buttons
+        self.curves_tab_layout = curves_tab_layout
+        self.shape_buttons_added = False
+        tab_widget.currentChanged.connect(
+            lambda index: self.add_shape_buttons() if tab_widget.widget(index) is curves_tab
+            else None)
 
         # -------------------------------
 
@@ -336,12 +321,15 @@ class RiggingToolsGUI(QtWidgets.QDialog):
         limbs_group = QtWidgets.QGroupBox("Automation Limbs Utils")
         limbs_layout = QtWidgets.QVBoxLayout(limbs_group)
         self.fk_btn = QtWidgets.QPushButton("Create FK Tool")
+        self.fk_mode_combo = QtWidgets.QComboBox()
+        self.fk_mode_combo.addItems(FK_MODE_LABELS)
         self.ik_btn = QtWidgets.QPushButton("Create IK Tool")
         self.pole_vector_btn = QtWidgets.QPushButton("Create Pole Vector (BETA)")
         self.ribbon_btn = QtWidgets.QPushButton("Create Ribbon Joints (BETA")
         self.squash_stretch_btn = QtWidgets.QPushButton("Create Squash & Stretch Function")
 
         limbs_layout.addWidget(self.fk_btn)
+        limbs_layout.addWidget(self.fk_mode_combo)
         limbs_layout.addWidget(self.ik_btn)
         limbs_layout.addWidget(self.pole_vector_btn)
         limbs_layout.addWidget(self.ribbon_btn)
@@ -349,14 +337,16 @@ class RiggingToolsGUI(QtWidgets.QDialog):
         auto_tab_layout.addWidget(limbs_group)
 
         # # Connect buttons
-        self.fk_btn.clicked.connect(create_fk_controls)
-        self.ik_btn.clicked.connect(create_ik_controls)
-        # self.pole_vector_btn.clicked.connect()
+        self.fk_btn.clicked.connect(
+            lambda *args: get_tool("create_fk_controls")(mode=self.fk_mode_combo.currentText()))
+        self.ik_btn.clicked.connect(tool_slot("create_ik_controls"))
+        self.pole_vector_btn.clicked.connect(tool_slot("create_pole_vector_limbs"))
         #self.ribbon_btn.clicked.connect()
-        self.squash_stretch_btn.clicked.connect(create_squash_stretch_limb)
+        self.squash_stretch_btn.clicked.connect(tool_slot("create_squash_stretch_limb"))
 
         # Add widgets
         limbs_layout.addWidget(self.fk_btn)
+        limbs_layout.addWidget(self.fk_mode_combo)
         limbs_layout.addWidget(self.ik_btn)
         limbs_layout.addWidget(self.pole_vector_btn)
         limbs_layout.addWidget(self.ribbon_btn)
@@ -372,4 +362,65 @@ class RiggingToolsGUI(QtWidgets.QDialog):
 
         self.setLayout(main_layout)
 
+    def add_shape_buttons(self):
+        """
+        Adds one button per library shape to the curves tab, in one group box per
+        library group. Runs once, when the tab is first shown, so opening the window
+        does not import curve_utils or read the shape library.
+        """
+        if self.shape_buttons_added:
+            return
+        self.shape_buttons_added = True
+
+        shape_groups = {}
+        for shape, label, group_name in get_tool("list_shapes")(details=True):
+            if group_name not in shape_groups:
+                group_box = QtWidgets.QGroupBox(group_name)
+                shape_groups[group_name] = QtWidgets.QVBoxLayout(group_box)
+                self.curves_tab_layout.addWidget(group_box)
+
+            btn = QtWidgets.QPushButton(label)
+            # Pass the shape name to the function
+            btn.clicked.connect(tool_slot("create_control", shape))
+            shape_groups[group_name].addWidget(btn)
+
+    def export_weights(self):
+        """
+        Asks for a weight file and saves the selected mesh's skin weights to it.
+        """
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Export Skin Weights", "", "Skin Weights (*.skinw)")
+        if path:
+            get_tool("export_skin_weights")(path)
+
+    def import_weights(self):
+        """
+        Asks for a weight file and loads it onto the selected mesh.
+        """
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Import Skin Weights", "", "Skin Weights (*.skinw)")
+        if path:
+            get_tool("import_skin_weights")(path)
 
+    def save_replay_script(self):
+        """
+        Stops the session recording and saves the compiled replay script.
+        """
+        recorder = get_tool("stop_recording")()
+        if recorder is None:
+            QtWidgets.QMessageBox.warning(self, "Session Recording",
+                                          "No session is being recorded.")
+            return
+        partial = False
+        if recorder.api_edits:
+            answer = QtWidgets.QMessageBox.question(
+                self, "Session Recording",
+                f"{len(recorder.api_edits)} edits, like skin weights, were made through the "
+                "API and cannot be replayed.\nSave the script without them?")
+            if answer != QtWidgets.QMessageBox.Yes:
+                return
+            partial = True
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Save Replay Script", "", "Python (*.py)")
+        if path:
+            recorder.write_script(path, partial=partial)
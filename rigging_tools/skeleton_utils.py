@@ -0,0 +1,761 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author: Kris Hernandez
+
+:synopsis:
+Module for skeleton utils.
+
+:description:
+This module contains the skeleton index, a one-pass snapshot of joint hierarchies.
+The index reads the hierarchy and every world matrix with a couple of queries and
+answers parent, child, world-space, side counterpart and chain lookups from memory,
+so builders stop querying the scene joint by joint. Indices are snapshots: invalidate
+them once joints are moved, renamed or reparented.
+Mirrored joints are recorded in a counterpart table stored on a network node in the
+scene, so side partners are looked up instead of matched by name again. Cached
+tables and indices are dropped whenever another scene is opened or a new one made. Joint
+orientations for whole skeletons are solved in NumPy from one snapshot and written
+back with one undoable setAttr per compound plug.
+
+:applications:
+    Maya
+
+:see_also:
+rigging_tools.fk_utils
+rigging_tools.ik_utils
+rigging_tools.squash_stretch_utils
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Built-in
+import json
+
+# Third party
+import maya.api.OpenMaya as om
+import maya.cmds as cmds
+import numpy as np
+
+# Internal
+
+# External
+
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+SIDE_TOKENS = (("L_", "R_"),)
+
+MIRROR_PLANES = ("YZ", "XZ", "XY")
+
+COUNTERPART_NODE = "rigging_tools_counterparts"
+
+_INDEX_CACHE = {}
+
+_COUNTERPART_CACHE = {}
+
+_SCENE_CALLBACKS = []
+
+AXIS_NAMES = ("X", "Y", "Z")
+
+ORIENT_TOLERANCE = 1e-6
+
+
+def get_world_matrices(nodes):
+    """
+    Reads the world matrices of all given nodes with one xform query.
+
+    :param nodes: Names of the nodes.
+    :type nodes: list[str]
+
+    :return: Nx4x4 array of world matrices, in Maya's row vector layout.
+    :rtype: numpy.ndarray
+    """
+    if not nodes:
+        return np.zeros((0, 4, 4))
+
+    values = cmds.xform(nodes, query=True, worldSpace=True, matrix=True) or []
+    if len(values) != 16 * len(nodes):
+        # Older Maya versions only answer for the first node
+        values = [value for node in nodes
+                  for value in cmds.xform(node, query=True, worldSpace=True, matrix=True)]
+    return np.array(values, dtype=float).reshape(len(nodes), 4, 4)
+
+
+def remove_scale(matrices):
+    """
+    Normalizes the axes of each matrix, so controls do not inherit joint scale.
+
+    :param matrices: Nx4x4 array of matrices.
+    :type matrices: numpy.ndarray
+
+    :return: Nx4x4 array of unscaled matrices.
+    :rtype: numpy.ndarray
+    """
+    matrices = np.array(matrices, dtype=float)
+    axes = matrices[:, :3, :3]
+    lengths = np.linalg.norm(axes, axis=2, keepdims=True)
+    matrices[:, :3, :3] = axes / np.where(lengths == 0.0, 1.0, lengths)
+    return matrices
+
+
+def swap_side(name, side_tokens=SIDE_TOKENS):
+    """
+    Swaps the side prefix of a short node name.
+
+    :param name: Short name of the node.
+    :type name: str
+    :param side_tokens: Pairs of side prefixes, like ("L_", "R_").
+    :type side_tokens: tuple(tuple(str))
+
+    :return: Name of the counterpart, or None for names without a side prefix.
+    :rtype: str
+    """
+    for left, right in side_tokens:
+        if name.startswith(left):
+            return right + name[len(left):]
+        if name.startswith(right):
+            return left + name[len(right):]
+    return None
+
+
+def reduce_to_roots(joints):
+    """
+    Drops every joint that has an ancestor in the list, so each hierarchy is only
+    handled once.
+
+    :param joints: Names of the joints.
+    :type joints: list[str]
+
+    :return: Long paths of the top-most joints, in their given order.
+    :rtype: list[str]
+    """
+    paths = list(dict.fromkeys(cmds.ls(joints, long=True) or []))
+    selected = set(paths)
+    roots = []
+    for path in paths:
+        parts = path.split("|")
+        if not any("|".join(parts[:i]) in selected for i in range(2, len(parts))):
+            roots.append(path)
+    return roots
+
+
+def _depth_first(root):
+    """
+    Lists a joint hierarchy depth first, siblings in their outliner order, with two
+    queries however deep it is.
+
+    :param root: Long path of the top joint.
+    :type root: str
+
+    :return: Long paths of the root and every joint below it.
+    :rtype: list[str]
+    """
+    # allDescendents lists the hierarchy bottom up, reversed it keeps sibling order
+    descendants = cmds.listRelatives(root, allDescendents=True, type="joint", fullPath=True) or []
+    children = {}
+    for path in reversed(descendants):
+        children.setdefault(path.rsplit("|", 1)[0], []).append(path)
+
+    ordered = []
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        ordered.append(path)
+        stack.extend(reversed(children.get(path, [])))
+    return ordered
+
+
+def _on_scene_change(*args):
+    """
+    Drops what was cached from the previous scene.
+    """
+    clear_counterpart_cache()
+    invalidate_skeleton_indices()
+
+
+def _watch_scene_changes():
+    """
+    Clears the scene caches whenever a scene is opened or a new one is made, the
+    callbacks are only added once per session.
+    """
+    if _SCENE_CALLBACKS:
+        return
+    for message in (om.MSceneMessage.kAfterOpen, om.MSceneMessage.kAfterNew):
+        _SCENE_CALLBACKS.append(om.MSceneMessage.addCallback(message, _on_scene_change))
+
+
+def get_counterpart_table(refresh=False):
+    """
+    Returns the joint counterpart table, read from the scene on first request and
+    read again after another scene is opened.
+
+    :param refresh: Read the table from the scene again.
+    :type refresh: bool
+
+    :return: Short name to counterpart short name, both directions.
+    :rtype: dict
+    """
+    if refresh or "table" not in _COUNTERPART_CACHE:
+        _watch_scene_changes()
+        table = {}
+        if cmds.objExists(COUNTERPART_NODE):
+            table = json.loads(cmds.getAttr(f"{COUNTERPART_NODE}.counterparts") or "{}")
+        _COUNTERPART_CACHE["table"] = table
+    return _COUNTERPART_CACHE["table"]
+
+
+def store_counterparts(pairs):
+    """
+    Adds counterpart pairs to the table and saves it on its network node.
+
+    :param pairs: Short name to counterpart short name.
+    :type pairs: dict
+    """
+    table = get_counterpart_table()
+    for name, other in pairs.items():
+        table[name] = other
+        table[other] = name
+
+    if not cmds.objExists(COUNTERPART_NODE):
+        cmds.createNode("network", name=COUNTERPART_NODE)
+        cmds.addAttr(COUNTERPART_NODE, longName="counterparts", dataType="string")
+    cmds.setAttr(f"{COUNTERPART_NODE}.counterparts", json.dumps(table, sort_keys=True),
+                 type="string")
+
+
+def get_counterpart(joint):
+    """
+    Looks up the counterpart of a joint in the counterpart table.
+
+    :param joint: Short name or long path of the joint.
+    :type joint: str
+
+    :return: Short name of the counterpart, or None.
+    :rtype: str
+    """
+    return get_counterpart_table().get(joint.rsplit("|", 1)[-1])
+
+
+def clear_counterpart_cache():
+    """
+    Drops the cached counterpart table, opening or making a scene already does.
+    """
+    _COUNTERPART_CACHE.clear()
+
+
+def mirror_skeleton(joints, mirror_plane="YZ", side_tokens=SIDE_TOKENS, behavior=True):
+    """
+    Mirrors joint hierarchies, each subtree once, and records the counterparts.
+    Mirrored joints are paired by their place in the hierarchy, so names Maya had
+    to make unique, or that hold a side token twice, still pair up.
+
+    :param joints: Joints to mirror, joints below another given joint are skipped.
+    :type joints: list[str]
+    :param mirror_plane: Mirror plane, YZ, XZ or XY.
+    :type mirror_plane: str
+    :param side_tokens: Pairs of side prefixes to swap in the mirrored names.
+    :type side_tokens: tuple(tuple(str))
+    :param behavior: Mirror the joint orientation behavior instead of the orientation.
+    :type behavior: bool
+
+    :return: Source short name to mirrored short name of every mirrored joint.
+    :rtype: dict
+    """
+    if mirror_plane not in MIRROR_PLANES:
+        raise ValueError(f"Unknown mirror plane '{mirror_plane}', "
+                         f"use one of {', '.join(MIRROR_PLANES)}.")
+
+    pairs = {}
+    for root in reduce_to_roots(joints):
+        root_name = root.rsplit("|", 1)[-1]
+        flags = {f"mirror{mirror_plane}": True, "mirrorBehavior": behavior}
+        tokens = None
+        for left, right in side_tokens:
+            if root_name.startswith(left):
+                tokens = (left, right)
+            elif root_name.startswith(right):
+                tokens = (right, left)
+            if tokens:
+                flags["searchReplace"] = tokens
+                break
+
+        sources = _depth_first(root)
+        mirrored = cmds.mirrorJoint(root, **flags) or []
+        targets = _depth_first(cmds.ls(mirrored[0], long=True)[0]) if mirrored else []
+        if len(targets) != len(sources):
+            cmds.warning(f"Mirror of '{root_name}' does not match its hierarchy, "
+                         f"no counterparts recorded for it.")
+            continue
+        for source, target in zip(sources, targets):
+            name, other = source.rsplit("|", 1)[-1], target.rsplit("|", 1)[-1]
+            if name != other:
+                pairs[name] = other
+
+    if pairs:
+        store_counterparts(pairs)
+    invalidate_skeleton_indices()
+    return pairs
+
+
+def get_skeleton_index(joints=None, hierarchy=True):
+    """
+    Returns a cached skeleton index, building it on first request.
+
+    :param joints: Joints, or roots when hierarchy is on. Every joint in the scene if None.
+    :type joints: list[str]
+    :param hierarchy: Also index every joint below the given ones.
+    :type hierarchy: bool
+
+    :return: The skeleton index.
+    :rtype: SkeletonIndex
+    """
+    key = (tuple(joints) if joints else None, hierarchy)
+    index = _INDEX_CACHE.get(key)
+    if index is None or not index.valid:
+        index = SkeletonIndex(joints, hierarchy=hierarchy)
+        _INDEX_CACHE[key] = index
+    return index
+
+
+def invalidate_skeleton_indices():
+    """
+    Invalidates every cached skeleton index, call it after editing joints.
+    """
+    for index in _INDEX_CACHE.values():
+        index.invalidate()
+    _INDEX_CACHE.clear()
+
+
+def _parse_axis(axis):
+    """
+    Splits an axis like "x" or "-y" into its index and sign.
+    """
+    sign = -1.0 if axis.startswith("-") else 1.0
+    name = axis.lstrip("+-").upper()
+    if name not in AXIS_NAMES:
+        raise ValueError(f"Unknown axis '{axis}', use x, y or z with an optional sign.")
+    return AXIS_NAMES.index(name), sign
+
+
+def _normalize(vectors):
+    """
+    Normalizes Nx3 vectors, zero length vectors stay zero.
+    """
+    lengths = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(lengths < ORIENT_TOLERANCE, 1.0, lengths)
+
+
+def matrix_to_euler(rotations):
+    """
+    Converts rotation matrices to XYZ euler angles, the inverse of
+    curve_utils.euler_to_matrix.
+
+    :param rotations: Nx3x3 rotation matrices, for row vector points.
+    :type rotations: numpy.ndarray
+
+    :return: Nx3 rotations in degrees around X, Y and Z.
+    :rtype: numpy.ndarray
+    """
+    rx = np.arctan2(rotations[:, 1, 2], rotations[:, 2, 2])
+    ry = np.arctan2(-rotations[:, 0, 2], np.hypot(rotations[:, 0, 0], rotations[:, 0, 1]))
+    rz = np.arctan2(rotations[:, 0, 1], rotations[:, 0, 0])
+    return np.degrees(np.stack((rx, ry, rz), axis=1))
+
+
+def chain_plane_normals(skeleton):
+    """
+    Computes the plane normal of every bent chain of a skeleton, like an arm or a leg.
+
+    The normal is the sum of the cross products of consecutive bones, signed to
+    agree with the most bent joint, so every joint of a chain shares one plane.
+
+    :param skeleton: Skeleton index.
+    :type skeleton: SkeletonIndex
+
+    :return: Nx3 unit normals, zero for joints of straight chains.
+    :rtype: numpy.ndarray
+    """
+    normals = np.zeros((len(skeleton), 3))
+    for chain in skeleton.chains():
+        indices = skeleton.indices(chain)
+        if len(indices) < 3:
+            continue
+        bones = np.diff(skeleton.positions[indices], axis=0)
+        crosses = np.cross(bones[:-1], bones[1:])
+        reference = crosses[np.argmax(np.linalg.norm(crosses, axis=1))]
+        signs = np.where(crosses @ reference < 0.0, -1.0, 1.0)
+        normal = (crosses * signs[:, None]).sum(axis=0)
+        length = np.linalg.norm(normal)
+        bone_length = np.linalg.norm(bones, axis=1).max()
+        if length > ORIENT_TOLERANCE * max(bone_length * bone_length, 1.0):
+            normals[indices] = normal / length
+    return normals
+
+
+def solve_joint_frames(skeleton, aim_axis="x", up_axis="y", world_up=(0.0, 1.0, 0.0),
+                       use_chain_plane=True, solved=None):
+    """
+    Solves the world orientation of every joint of a skeleton in NumPy.
+
+    Each joint aims its aim axis at its first child. In bent chains the up axis stays
+    in the chain plane, so the third axis is the plane normal and the chain bends
+    around it. Straight chains point their up axis at world_up, or at the world axis
+    furthest from the aim when the two line up. End joints take their parent's frame.
+
+    :param skeleton: Skeleton index.
+    :type skeleton: SkeletonIndex
+    :param aim_axis: Joint axis aiming down the bone, like "x" or "-x".
+    :type aim_axis: str
+    :param up_axis: Joint axis pointing up, like "y" or "-z".
+    :type up_axis: str
+    :param world_up: World direction of the up axis on straight chains.
+    :type world_up: tuple(float)
+    :param use_chain_plane: Keep the up axis in the plane of bent chains.
+    :type use_chain_plane: bool
+    :param solved: Mask of the joints to solve, the others keep their current
+                   orientation. Every joint if None.
+    :type solved: numpy.ndarray
+
+    :return: Nx3x3 world rotations, one row per joint axis.
+    :rtype: numpy.ndarray
+    """
+    aim_index, aim_sign = _parse_axis(aim_axis)
+    up_index, up_sign = _parse_axis(up_axis)
+    if aim_index == up_index:
+        raise ValueError("The aim and up axes must differ.")
+    third_index = 3 - aim_index - up_index
+
+    positions = skeleton.positions
+    count = len(skeleton)
+    first_child = np.array([children[0] if children else -1 for children in skeleton.children],
+                           dtype=int)
+    aims = np.zeros((count, 3))
+    has_child = first_child >= 0
+    aims[has_child] = positions[first_child[has_child]] - positions[has_child]
+    aims = _normalize(aims)
+    aiming = np.linalg.norm(aims, axis=1) > 0.5
+
+    # Up hints, in the chain plane for bent chains and world_up for straight ones
+    hints = np.tile(np.asarray(world_up, dtype=float), (count, 1))
+    if use_chain_plane:
+        normals = chain_plane_normals(skeleton)
+        planar = np.linalg.norm(normals, axis=1) > 0.5
+        hints[planar] = np.cross(normals[planar], aims[planar])
+
+    sides = np.cross(aims, hints)
+    parallel = np.linalg.norm(sides, axis=1) < ORIENT_TOLERANCE
+    if parallel.any():
+        fallback = np.eye(3)[np.argmin(np.abs(aims[parallel]), axis=1)]
+        sides[parallel] = np.cross(aims[parallel], fallback)
+    sides = _normalize(sides)
+    ups = np.cross(sides, aims)
+
+    frames = np.zeros((count, 3, 3))
+    frames[:, aim_index] = aim_sign * aims
+    frames[:, up_index] = up_sign * ups
+    frames[:, third_index] = np.cross(frames[:, (third_index + 1) % 3],
+                                      frames[:, (third_index + 2) % 3])
+
+    current = remove_scale(skeleton.matrices)[:, :3, :3]
+    if solved is not None:
+        frames[~solved] = current[~solved]
+        aiming |= ~solved
+
+    # End joints follow their parent, joints are sorted parents first
+    for i in np.flatnonzero(~aiming):
+        parent = skeleton.parents[i]
+        frames[i] = frames[parent] if parent >= 0 else current[i]
+    return frames
+
+
+def local_joint_values(skeleton, frames):
+    """
+    Converts solved world frames into the joint orients and translations that keep
+    every joint in place, with rotate zeroed.
+
+    :param skeleton: Skeleton index.
+    :type skeleton: SkeletonIndex
+    :param frames: Nx3x3 world rotations, see solve_joint_frames.
+    :type frames: numpy.ndarray
+
+    :return: Nx3 local translations and Nx3 joint orients in degrees.
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+    """
+    count = len(skeleton)
+    parents = skeleton.parents
+    indexed = parents >= 0
+
+    # Joints outside the index keep their parent's current world matrix
+    parent_matrices = np.tile(np.eye(4), (count, 1, 1))
+    outer = [i for i in np.flatnonzero(~indexed) if "|" in skeleton.paths[i][1:]]
+    if outer:
+        parent_matrices[outer] = get_world_matrices(
+            [skeleton.paths[i].rsplit("|", 1)[0] for i in outer])
+
+    scales = np.linalg.norm(skeleton.matrices[:, :3, :3], axis=2)
+    parent_matrices[indexed, :3, :3] = scales[parents[indexed], :, None] * frames[parents[indexed]]
+    parent_matrices[indexed, 3, :3] = skeleton.positions[parents[indexed]]
+
+    parent_rotations = remove_scale(parent_matrices)[:, :3, :3]
+    orients = matrix_to_euler(frames @ np.transpose(parent_rotations, (0, 2, 1)))
+    offsets = skeleton.positions - parent_matrices[:, 3, :3]
+    translations = np.einsum("ni,nij->nj", offsets, np.linalg.inv(parent_matrices[:, :3, :3]))
+    return translations, orients
+
+
+def set_joint_values(joints, translations, orients):
+    """
+    Writes translations and joint orients, and zeroes rotate, on many joints. Each
+    compound plug is set with one setAttr, so the write is undoable and rolls back
+    with the transaction it runs in.
+
+    :param joints: Long paths of the joints.
+    :type joints: list[str]
+    :param translations: Nx3 local translations.
+    :type translations: numpy.ndarray
+    :param orients: Nx3 joint orients in degrees.
+    :type orients: numpy.ndarray
+    """
+    for joint, translation, orient in zip(joints, translations.tolist(), orients.tolist()):
+        cmds.setAttr(f"{joint}.translate", *translation)
+        cmds.setAttr(f"{joint}.jointOrient", *orient)
+        cmds.setAttr(f"{joint}.rotate", 0.0, 0.0, 0.0)
+
+
+def orient_skeleton(joints=None, aim_axis="x", up_axis="y", world_up=(0.0, 1.0, 0.0),
+                    use_chain_plane=True, hierarchy=False):
+    """
+    Orients joints from one snapshot read and a NumPy solve.
+
+    Joints aim at their children whether those are oriented or not. Children of
+    oriented joints that are not oriented themselves keep their world pose.
+
+    :param joints: Joints to orient, every joint in the scene if None.
+    :type joints: list[str]
+    :param aim_axis: Joint axis aiming down the bone, like "x" or "-x".
+    :type aim_axis: str
+    :param up_axis: Joint axis pointing up, like "y" or "-z".
+    :type up_axis: str
+    :param world_up: World direction of the up axis on straight chains.
+    :type world_up: tuple(float)
+    :param use_chain_plane: Keep the up axis in the plane of bent chains.
+    :type use_chain_plane: bool
+    :param hierarchy: Also orient every joint below the given ones.
+    :type hierarchy: bool
+
+    :return: Number of oriented joints.
+    :rtype: int
+    """
+    skeleton = SkeletonIndex(joints, hierarchy=True)
+    if not len(skeleton):
+        return 0
+    if joints is None or hierarchy:
+        solved = np.ones(len(skeleton), dtype=bool)
+    else:
+        solved = np.zeros(len(skeleton), dtype=bool)
+        solved[skeleton.indices(cmds.ls(joints, type="joint", long=True) or [])] = True
+
+    frames = solve_joint_frames(skeleton, aim_axis, up_axis, world_up, use_chain_plane,
+                                solved=solved)
+    translations, orients = local_joint_values(skeleton, frames)
+    # Children of oriented joints are written too, so they stay in place
+    written = solved | ((skeleton.parents >= 0) & solved[skeleton.parents])
+    indices = np.flatnonzero(written)
+    set_joint_values([skeleton.paths[i] for i in indices], translations[indices],
+                     orients[indices])
+    invalidate_skeleton_indices()
+    return int(solved.sum())
+
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
+
+class SkeletonIndex(object):
+    """
+    Snapshot of one or more joint hierarchies.
+
+    Joints are stored by long path, parents before children. parents holds the
+    parent index of each joint (-1 outside the index), matrices the Nx4x4 world
+    matrices and counterparts the index of the opposite side joint (-1 if none).
+    """
+
+    def __init__(self, joints=None, hierarchy=True, side_tokens=SIDE_TOKENS):
+        self.joints = list(joints) if joints else None
+        self.hierarchy = hierarchy
+        self.side_tokens = side_tokens
+        self.valid = False
+        self.refresh()
+
+    def refresh(self):
+        """
+        Reads the joint hierarchy and world matrices from the scene.
+        """
+        if self.joints is None:
+            paths = cmds.ls(type="joint", long=True) or []
+        else:
+            paths = cmds.ls(self.joints, type="joint", long=True) or []
+            if self.hierarchy and paths:
+                paths += cmds.listRelatives(paths, allDescendents=True, type="joint",
+                                            fullPath=True) or []
+
+        # Parents always have shorter paths than their children
+        paths = sorted(dict.fromkeys(paths), key=lambda path: path.count("|"))
+
+        self.paths = paths
+        self.names = [path.rsplit("|", 1)[-1] for path in paths]
+        self._lookup = {}
+        for i, name in enumerate(self.names):
+            self._lookup.setdefault(name, i)
+        self._lookup.update({path: i for i, path in enumerate(paths)})
+
+        self.parents = np.full(len(paths), -1, dtype=int)
+        self.children = [[] for _ in paths]
+        for i, path in enumerate(paths):
+            parent = self._lookup.get(path.rsplit("|", 1)[0], -1)
+            if parent >= 0:
+                self.parents[i] = parent
+                self.children[parent].append(i)
+
+        self.matrices = get_world_matrices(paths)
+
+        # Recorded counterparts win over name matching
+        table = get_counterpart_table()
+        self.counterparts = np.full(len(paths), -1, dtype=int)
+        for i, name in enumerate(self.names):
+            other = table.get(name) or swap_side(name, self.side_tokens)
+            if other is not None:
+                self.counterparts[i] = self._lookup.get(other, -1)
+
+        self.valid = True
+
+    def invalidate(self):
+        """
+        Marks the snapshot as stale, lookups raise until it is refreshed.
+        """
+        self.valid = False
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, joint):
+        return joint in self._lookup
+
+    @property
+    def positions(self):
+        """
+        World positions of every joint as an Nx3 array.
+        """
+        return self.matrices[:, 3, :3]
+
+    def index(self, joint):
+        """
+        Returns the index of a joint.
+
+        :param joint: Short name or long path of the joint.
+        :type joint: str
+
+        :return: Index of the joint.
+        :rtype: int
+        """
+        if not self.valid:
+            raise RuntimeError("Skeleton index is stale, refresh it first.")
+        if joint not in self._lookup:
+            raise KeyError(f"Joint '{joint}' is not in the skeleton index.")
+        return self._lookup[joint]
+
+    def indices(self, joints):
+        """
+        Returns the indices of several joints.
+
+        :param joints: Short names or long paths of the joints.
+        :type joints: list[str]
+
+        :return: Indices of the joints.
+        :rtype: numpy.ndarray
+        """
+        return np.array([self.index(joint) for joint in joints], dtype=int)
+
+    def parent(self, joint):
+        """
+        Returns the long path of a joint's parent, or None.
+        """
+        parent = self.parents[self.index(joint)]
+        return self.paths[parent] if parent >= 0 else None
+
+    def get_children(self, joint):
+        """
+        Returns the long paths of a joint's child joints.
+        """
+        return [self.paths[child] for child in self.children[self.index(joint)]]
+
+    def world_matrix(self, joint):
+        """
+        Returns the 4x4 world matrix of a joint.
+        """
+        return self.matrices[self.index(joint)]
+
+    def position(self, joint):
+        """
+        Returns the world position of a joint.
+        """
+        return self.positions[self.index(joint)]
+
+    def counterpart(self, joint):
+        """
+        Returns the long path of a joint's opposite side joint, or None.
+        """
+        other = self.counterparts[self.index(joint)]
+        return self.paths[other] if other >= 0 else None
+
+    def roots(self):
+        """
+        Returns the long paths of the joints without an indexed parent.
+        """
+        return [self.paths[i] for i in np.flatnonzero(self.parents < 0)]
+
+    def chain_between(self, start, end):
+        """
+        Returns the joints from start down to end, following parents up from end.
+
+        :param start: Top joint of the chain.
+        :type start: str
+        :param end: Bottom joint of the chain.
+        :type end: str
+
+        :return: Long paths from start to end.
+        :rtype: list[str]
+        """
+        start_index = self.index(start)
+        current = self.index(end)
+        chain = [current]
+        while current != start_index:
+            current = self.parents[current]
+            if current < 0:
+                raise ValueError(f"'{start}' is not above '{end}' in the hierarchy.")
+            chain.append(current)
+        return [self.paths[i] for i in reversed(chain)]
+
+    def chains(self):
+        """
+        Splits the hierarchy into chains that run from a root or a branch to a tip
+        or the next branch.
+
+        :return: Chains as lists of long paths.
+        :rtype: list[list[str]]
+        """
+        starts = [i for i in range(len(self.paths))
+                  if self.parents[i] < 0 or len(self.children[self.parents[i]]) != 1]
+        chains = []
+        for start in starts:
+            chain = [start]
+            while len(self.children[chain[-1]]) == 1:
+                chain.append(self.children[chain[-1]][0])
+            chains.append([self.paths[i] for i in chain])
+        return chains
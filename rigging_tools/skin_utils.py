@@ -12,7 +12,8 @@ Module for skin utils.
 
 :description:
 This module contains utils for basic skin utils for rigging such as binding, deleting
-and mirroring.
+and mirroring, plus saving and loading skin weights. Weights are read and written in
+bulk through the API and stored in a compact, memory-mappable binary file.
 
 :applications:
     Maya
@@ -25,16 +26,24 @@ N/A
 #----------------------------------------------------------------------------- IMPORTS --#
 
 # Built-in
+import hashlib
+import json
 import os
+import struct
 
 # Third party
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
 import maya.cmds as cmds
+import numpy as np
 try:
-    from PyQt5 import QtCore, QtGui, QtWidgets
+    from scipy.spatial import cKDTree
 except ImportError:
-    from PySide2 import QtGui, QtCore, QtWidgets
+    cKDTree = None
 
 # Internal
+from auto_rigging_tool_box.rigging_tools.skeleton_utils import SIDE_TOKENS, swap_side
+from auto_rigging_tool_box.rigging_tools.undo_utils import show_message, transaction
 
 # External
 
@@ -42,21 +51,34 @@ except ImportError:
 #----------------------------------------------------------------------------------------#
 #--------------------------------------------------------------------------- FUNCTIONS --#
 
-def bind_skin(max_influences=4, dropoff=4.0):
+def bind_skin(max_influences=4, dropoff=4.0, joints=None, mesh=None):
     """
     Binds selected joints to the selected mesh.
+
+    :param max_influences: Maximum number of influences per vertex.
+    :type max_influences: int
+    :param dropoff: Dropoff rate of the influences.
+    :type dropoff: float
+    :param joints: Joints to bind, the selection but the last object if None.
+    :type joints: list[str]
+    :param mesh: Mesh to bind, the last selected object if None.
+    :type mesh: str
+
+    :return: Name of the new skinCluster, or None if the bind failed.
+    :rtype: str
     """
-    sel = cmds.ls(sl=True)
+    if joints is None or mesh is None:
+        sel = cmds.ls(sl=True)
 
-    if len(sel) < 2:
-        cmds.warning("Select at least one joint and a mesh.")
-        return
+        if len(sel) < 2:
+            cmds.warning("Select at least one joint and a mesh.")
+            return
 
-    mesh = sel[-1]
-    joints = sel[:-1]
+        mesh = mesh or sel[-1]
+        joints = joints or sel[:-1]
 
     try:
-        cmds.skinCluster(
+        skin = cmds.skinCluster(
             joints,
             mesh,
             toSelectedBones=True,
@@ -66,44 +88,60 @@ def bind_skin(max_influences=4, dropoff=4.0):
             name=f"{mesh}_skinCluster"
         )
         cmds.inViewMessage(amg="✅ Skin bound.", pos="topCenter", fade=True)
+        return skin[0] if isinstance(skin, list) else skin
     except:
         cmds.warning("Failed to bind skin. Check your selection.")
 
-def mirror_skin_weights(direction="leftToRight"):
+@transaction("Mirror Skin Weights")
+def mirror_skin_weights(direction="leftToRight", mirror_plane="YZ", mesh=None,
+                        side_tokens=SIDE_TOKENS):
     """
     Mirrors skin weights on the selected mesh.
     direction options: 'leftToRight' or 'rightToLeft'
-    """
 
-    sel = cmds.ls(sl=True)
+    Left is the positive side of the mirror plane. The vertex symmetry map is
+    cached by topology and points, influences are swapped by their side prefix and only
+    the destination vertices are written, as one undoable step.
 
-    if not sel:
-        cmds.warning("Select a skinned mesh.")
+    :param direction: leftToRight copies positive side weights onto the negative side.
+    :type direction: str
+    :param mirror_plane: Mirror plane, YZ, XZ or XY.
+    :type mirror_plane: str
+    :param mesh: Name of the mesh, the first selected object if None.
+    :type mesh: str
+    :param side_tokens: Pairs of side prefixes used to swap influences.
+    :type side_tokens: tuple(tuple(str))
+
+    :return: Number of vertices that received mirrored weights.
+    :rtype: int
+    """
+    if direction not in ("leftToRight", "rightToLeft"):
+        cmds.warning("Mirror direction must be 'leftToRight' or 'rightToLeft'.")
+        return
+    if mirror_plane not in MIRROR_PLANE_AXES:
+        cmds.warning(f"Mirror plane must be one of {', '.join(MIRROR_PLANE_AXES)}.")
         return
 
-    mesh = sel[0]
+    mesh = mesh or (cmds.ls(sl=True) or [None])[0]
+    if not mesh:
+        cmds.warning("Select a skinned mesh.")
+        return
 
-    skin = cmds.ls(cmds.listHistory(mesh), type="skinCluster")
+    skin = get_skin_cluster(mesh)
     if not skin:
         cmds.warning("No skinCluster found on selected mesh.")
         return
 
-    # Maya uses these conventions
-    if direction == "leftToRight":
-        dir_flag = "YZ"
-    else:
-        dir_flag = "YZ"
+    symmetry, points = get_symmetry_map(mesh, mirror_plane)
+    weights, influences = get_skin_weights(mesh, skin)
+    destination, mirrored = mirror_weight_matrix(
+        weights, influences, symmetry, points[:, MIRROR_PLANE_AXES[mirror_plane]],
+        direction=direction, side_tokens=side_tokens)
 
-    try:
-        cmds.copySkinWeights(
-            surfaceAssociation="closestPoint",
-            influenceAssociation="closestJoint",
-            mirrorMode=dir_flag,
-            noMirroring=False
-        )
-        cmds.inViewMessage(amg="✅ Skin weights mirrored.", pos="topCenter", fade=True)
-    except:
-        cmds.warning("Skin weight mirroring failed.")
+    if destination.size:
+        set_skin_weights(mesh, mirrored, influences, skin=skin, vertices=destination)
+    show_message("✅ Skin weights mirrored.")
+    return int(destination.size)
 
 def delete_skin():
     """
@@ -126,3 +164,879 @@ def delete_skin():
         cmds.inViewMessage(amg="✅️ Skin binding removed.", pos="topCenter", fade=True)
     except:
         cmds.warning("Could not delete skinCluster.")
+
+WEIGHT_FILE_MAGIC = b"RTSKINW1"
+WEIGHT_FILE_ALIGN = 64
+WEIGHT_EPSILON = 1e-6
+
+
+def get_skin_cluster(mesh):
+    """
+    Returns the skinCluster deforming a mesh.
+
+    :param mesh: Name of the mesh.
+    :type mesh: str
+
+    :return: Name of the skinCluster, or None.
+    :rtype: str
+    """
+    skin = cmds.ls(cmds.listHistory(mesh) or [], type="skinCluster")
+    return skin[0] if skin else None
+
+
+def _get_skin_api(mesh, skin, vertices=None):
+    """
+    Returns the API objects needed to read or write weights.
+
+    :param mesh: Name of the mesh.
+    :type mesh: str
+    :param skin: Name of the skinCluster.
+    :type skin: str
+    :param vertices: Vertex indices to address, every vertex if None.
+    :type vertices: list[int]
+
+    :return: Skin function set, mesh shape dag path and vertex components.
+    :rtype: tuple
+    """
+    sel = om.MSelectionList()
+    sel.add(skin)
+    sel.add(mesh)
+    skin_fn = oma.MFnSkinCluster(sel.getDependNode(0))
+    shape = sel.getDagPath(1)
+    shape.extendToShape()
+
+    comp_fn = om.MFnSingleIndexedComponent()
+    components = comp_fn.create(om.MFn.kMeshVertComponent)
+    if vertices is None:
+        comp_fn.setCompleteData(om.MFnMesh(shape).numVertices)
+    else:
+        comp_fn.addElements([int(vertex) for vertex in vertices])
+    return skin_fn, shape, components
+
+
+def get_influence_names(skin):
+    """
+    Returns the influence names of a skinCluster, in weight column order.
+
+    :param skin: Name of the skinCluster.
+    :type skin: str
+
+    :return: Influence names.
+    :rtype: list[str]
+    """
+    sel = om.MSelectionList()
+    sel.add(skin)
+    skin_fn = oma.MFnSkinCluster(sel.getDependNode(0))
+    return [path.partialPathName() for path in skin_fn.influenceObjects()]
+
+
+def get_skin_weights(mesh, skin=None, vertices=None):
+    """
+    Reads the skin weights of a mesh in one API call.
+
+    :param mesh: Name of the mesh.
+    :type mesh: str
+    :param skin: Name of the skinCluster, found from the mesh if None.
+    :type skin: str
+    :param vertices: Vertex indices to read, every vertex if None.
+    :type vertices: list[int]
+
+    :return: VxI weight matrix and the influence names of its columns.
+    :rtype: tuple(numpy.ndarray, list[str])
+    """
+    skin = skin or get_skin_cluster(mesh)
+    skin_fn, shape, components = _get_skin_api(mesh, skin, vertices)
+    weights, influence_count = skin_fn.getWeights(shape, components)
+    weights = np.fromiter(weights, dtype=np.float64, count=len(weights))
+    return weights.reshape(-1, influence_count), get_influence_names(skin)
+
+
+def _index_runs(indices):
+    """
+    Splits sorted indices into runs of consecutive ones.
+
+    :return: First index, last index, start and stop position of each run.
+    :rtype: list[tuple(int)]
+    """
+    runs = []
+    start = 0
+    for i in range(1, len(indices) + 1):
+        if i == len(indices) or indices[i] != indices[i - 1] + 1:
+            runs.append((int(indices[start]), int(indices[i - 1]), start, i))
+            start = i
+    return runs
+
+
+def set_skin_weights(mesh, weights, influences=None, skin=None, vertices=None, undoable=True):
+    """
+    Writes skin weights of a mesh. Columns of influences that are not given are
+    left untouched.
+
+    Undoable writes set the weightList plugs, one setAttr per vertex and run of
+    consecutive influence indices, so the write goes into the undo queue like any
+    other edit. Otherwise the weights are written in one API call, which is much
+    faster on dense meshes but can never be undone, only use it on scenes that are
+    built headless.
+
+    :param mesh: Name of the mesh.
+    :type mesh: str
+    :param weights: VxI weight matrix.
+    :type weights: numpy.ndarray
+    :param influences: Influence names of the columns, every influence in order if None.
+    :type influences: list[str]
+    :param skin: Name of the skinCluster, found from the mesh if None.
+    :type skin: str
+    :param vertices: Vertex indices of the rows, every vertex if None.
+    :type vertices: list[int]
+    :param undoable: Write through setAttr so the write can be undone.
+    :type undoable: bool
+    """
+    skin = skin or get_skin_cluster(mesh)
+    skin_names = get_influence_names(skin)
+    influences = influences or skin_names
+    columns = [skin_names.index(influence) for influence in influences]
+
+    if undoable:
+        # weightList is indexed by the logical index of each influence's matrix plug
+        logical = np.asarray(cmds.getAttr(f"{skin}.matrix", multiIndices=True), dtype=np.int64)
+        indices = logical[columns]
+        order = np.argsort(indices, kind="stable")
+        weights = np.asarray(weights, dtype=np.float64)[:, order]
+        runs = _index_runs(indices[order])
+        rows = range(weights.shape[0]) if vertices is None else vertices
+        for vertex, row in zip(rows, weights.tolist()):
+            for first, last, start, stop in runs:
+                cmds.setAttr(f"{skin}.weightList[{int(vertex)}].weights[{first}:{last}]",
+                             *row[start:stop])
+        return
+
+    skin_fn, shape, components = _get_skin_api(mesh, skin, vertices)
+    skin_fn.setWeights(shape, components, om.MIntArray(columns),
+                       om.MDoubleArray(np.ascontiguousarray(weights, dtype=np.float64).ravel()),
+                       normalize=False, returnOldWeights=False)
+
+
+def dense_to_influence_major(weights):
+    """
+    Packs a dense weight matrix into influence-major sparse arrays. Every
+    influence owns one contiguous slice of vertex ids and values, so single
+    influences can be read back without touching the rest.
+
+    :param weights: VxI weight matrix.
+    :type weights: numpy.ndarray
+
+    :return: indptr, vertices and values arrays.
+    :rtype: tuple(numpy.ndarray)
+    """
+    transposed = np.asarray(weights).T
+    mask = transposed > WEIGHT_EPSILON
+    influence_ids, vertex_ids = np.nonzero(mask)
+    indptr = np.zeros(transposed.shape[0] + 1, dtype=np.int64)
+    np.cumsum(mask.sum(axis=1), out=indptr[1:])
+    return (indptr, vertex_ids.astype(np.int32),
+            transposed[influence_ids, vertex_ids].astype(np.float32))
+
+
+def write_weight_file(path, weights, influences, mesh=""):
+    """
+    Writes a weight matrix to a binary weight file.
+
+    The file holds the magic bytes, the header size, a json header with the
+    influence table and array layout, then the 64 byte aligned indptr, vertices
+    and values arrays.
+
+    :param path: Path of the weight file.
+    :type path: str
+    :param weights: VxI weight matrix.
+    :type weights: numpy.ndarray
+    :param influences: Influence names of the columns.
+    :type influences: list[str]
+    :param mesh: Name of the mesh the weights come from.
+    :type mesh: str
+    """
+    arrays = dict(zip(("indptr", "vertices", "values"), dense_to_influence_major(weights)))
+
+    def align(offset):
+        return -(-offset // WEIGHT_FILE_ALIGN) * WEIGHT_FILE_ALIGN
+
+    # The header size depends on the offsets it lists, so lay out from a fixed header budget
+    header = {"version": 1, "mesh": mesh, "vertex_count": int(weights.shape[0]),
+              "influences": list(influences), "arrays": {}}
+    header_budget = align(len(json.dumps(header)) + 128 * len(arrays) + 16)
+    offset = header_budget
+    for name, array in arrays.items():
+        header["arrays"][name] = {"dtype": array.dtype.str, "count": int(array.size),
+                                  "offset": offset}
+        offset = align(offset + array.nbytes)
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    prefix = WEIGHT_FILE_MAGIC + struct.pack("<Q", len(header_bytes))
+    if len(prefix) + len(header_bytes) > header_budget:
+        raise ValueError("Weight file header does not fit its budget.")
+
+    with open(path, "wb") as weight_file:
+        weight_file.write(prefix + header_bytes)
+        for name, array in arrays.items():
+            weight_file.seek(header["arrays"][name]["offset"])
+            weight_file.write(array.tobytes())
+
+
+def read_weight_file(path):
+    """
+    Opens a binary weight file. The arrays are memory-mapped, so nothing is read
+    until weights are pulled out with weight_file_to_dense.
+
+    :param path: Path of the weight file.
+    :type path: str
+
+    :return: The header keys plus memory-mapped indptr, vertices and values arrays.
+    :rtype: dict
+    """
+    with open(path, "rb") as weight_file:
+        if weight_file.read(len(WEIGHT_FILE_MAGIC)) != WEIGHT_FILE_MAGIC:
+            raise ValueError(f"'{path}' is not a skin weight file.")
+        header_size = struct.unpack("<Q", weight_file.read(8))[0]
+        header = json.loads(weight_file.read(header_size).decode("utf-8"))
+
+    data = dict(header)
+    for name, layout in header["arrays"].items():
+        if layout["count"]:
+            data[name] = np.memmap(path, dtype=np.dtype(layout["dtype"]), mode="r",
+                                   offset=layout["offset"], shape=(layout["count"],))
+        else:
+            data[name] = np.zeros(0, dtype=np.dtype(layout["dtype"]))
+    return data
+
+
+def weight_file_to_dense(data, influences=None):
+    """
+    Builds a dense weight matrix from an opened weight file. Only the slices of
+    the requested influences are read from disk.
+
+    :param data: Weight file opened with read_weight_file.
+    :type data: dict
+    :param influences: Influence names to load, all of them if None.
+    :type influences: list[str]
+
+    :return: VxI weight matrix, columns in the order of influences.
+    :rtype: numpy.ndarray
+    """
+    names = data["influences"]
+    influences = names if influences is None else influences
+    weights = np.zeros((data["vertex_count"], len(influences)), dtype=np.float64)
+    indptr = data["indptr"]
+    for column, influence in enumerate(influences):
+        if influence not in names:
+            continue
+        row = names.index(influence)
+        start, stop = int(indptr[row]), int(indptr[row + 1])
+        weights[data["vertices"][start:stop], column] = data["values"][start:stop]
+    return weights
+
+
+def export_skin_weights(path, mesh=None):
+    """
+    Saves the skin weights of a mesh, or the selected mesh, to a weight file.
+
+    :param path: Path of the weight file.
+    :type path: str
+    :param mesh: Name of the mesh, the first selected object if None.
+    :type mesh: str
+
+    :return: Path of the written file.
+    :rtype: str
+    """
+    mesh = mesh or (cmds.ls(sl=True) or [None])[0]
+    if not mesh:
+        cmds.warning("Select a skinned mesh.")
+        return
+    skin = get_skin_cluster(mesh)
+    if not skin:
+        cmds.warning("No skinCluster found on selected mesh.")
+        return
+
+    weights, influences = get_skin_weights(mesh, skin)
+    write_weight_file(path, weights, influences, mesh=mesh)
+    show_message(f"✅ Skin weights saved for <hl>{len(influences)}</hl> influences.")
+    return path
+
+
+@transaction("Import Skin Weights")
+def import_skin_weights(path, mesh=None, influences=None, add_missing=False):
+    """
+    Loads skin weights from a weight file onto a mesh, or the selected mesh. The
+    influences are matched by name. Loading every influence also zeroes the skin
+    influences missing from the file. Loading a subset only writes those columns.
+
+    File influences that are not bound to the skin are added to it with
+    add_missing, when the joint exists. Otherwise they are skipped with a warning
+    and the weights that are left are renormalized, so every vertex keeps the total
+    weight the file gives it. The import is one undoable step.
+
+    :param path: Path of the weight file.
+    :type path: str
+    :param mesh: Name of the mesh, the first selected object if None.
+    :type mesh: str
+    :param influences: Influence names to load, all of them if None.
+    :type influences: list[str]
+    :param add_missing: Bind file influences missing from the skin before loading.
+    :type add_missing: bool
+
+    :return: Names of the influences loaded from the file.
+    :rtype: list[str]
+    """
+    mesh = mesh or (cmds.ls(sl=True) or [None])[0]
+    if not mesh:
+        cmds.warning("Select a skinned mesh.")
+        return
+    skin = get_skin_cluster(mesh)
+    if not skin:
+        cmds.warning("No skinCluster found on selected mesh.")
+        return
+
+    data = read_weight_file(path)
+    vertex_count = cmds.polyEvaluate(mesh, vertex=True)
+    if vertex_count != data["vertex_count"]:
+        cmds.warning(f"Weight file has {data['vertex_count']} vertices, "
+                     f"{mesh} has {vertex_count}.")
+        return
+
+    wanted = list(data["influences"]) if influences is None else list(influences)
+    skin_names = get_influence_names(skin)
+    missing = [name for name in wanted if name not in skin_names]
+    if missing and add_missing:
+        for joint in cmds.ls(missing, type="joint") or []:
+            cmds.skinCluster(skin, edit=True, addInfluence=joint, weight=0.0)
+        skin_names = get_influence_names(skin)
+        missing = [name for name in wanted if name not in skin_names]
+    if missing:
+        cmds.warning(f"Skipping influences not bound to {skin}: {', '.join(missing)}")
+
+    loaded = [name for name in wanted if name not in missing]
+    columns = skin_names if influences is None else loaded
+    weights = weight_file_to_dense(data, columns)
+    if missing:
+        # Spread the skipped weight over what is left, in proportion
+        target = weight_file_to_dense(data, wanted).sum(axis=1)
+        totals = weights.sum(axis=1)
+        covered = totals > WEIGHT_EPSILON
+        weights[covered] *= (target[covered] / totals[covered])[:, None]
+        lost = int(np.count_nonzero(~covered & (target > WEIGHT_EPSILON)))
+        if lost:
+            cmds.warning(f"{lost} vertices only had weight on skipped influences.")
+
+    set_skin_weights(mesh, weights, columns, skin=skin)
+    show_message(f"✅ Skin weights loaded for <hl>{len(loaded)}</hl> influences.")
+    return loaded
+
+
+MIRROR_PLANE_AXES = {"YZ": 0, "XZ": 1, "XY": 2}
+
+SYMMETRY_TOLERANCE = 1e-3
+
+SYMMETRY_CACHE_DIR = os.environ.get(
+    "RIGGING_TOOLS_CACHE", os.path.join(os.path.expanduser("~"), ".rigging_tools_cache"))
+
+_SYMMETRY_CACHE = {}
+
+
+def get_mesh_topology(mesh):
+    """
+    Reads the polygon layout and object space points of a mesh.
+
+    :param mesh: Name of the mesh.
+    :type mesh: str
+
+    :return: Vertex count per face, flat face vertex ids and Vx3 points.
+    :rtype: tuple(numpy.ndarray)
+    """
+    sel = om.MSelectionList()
+    sel.add(mesh)
+    shape = sel.getDagPath(0)
+    shape.extendToShape()
+    mesh_fn = om.MFnMesh(shape)
+
+    counts, vertex_ids = mesh_fn.getVertices()
+    points = mesh_fn.getPoints(om.MSpace.kObject)
+    return (np.array(counts, dtype=np.int32), np.array(vertex_ids, dtype=np.int32),
+            np.array([(point.x, point.y, point.z) for point in points], dtype=np.float64))
+
+
+def topology_hash(counts, vertex_ids):
+    """
+    Hashes a polygon layout. Meshes that only differ by point positions share it.
+
+    :param counts: Vertex count per face.
+    :type counts: numpy.ndarray
+    :param vertex_ids: Flat face vertex ids.
+    :type vertex_ids: numpy.ndarray
+
+    :return: Hex digest of the layout.
+    :rtype: str
+    """
+    digest = hashlib.sha1()
+    digest.update(np.ascontiguousarray(counts, dtype=np.int32).tobytes())
+    digest.update(np.ascontiguousarray(vertex_ids, dtype=np.int32).tobytes())
+    return digest.hexdigest()
+
+
+def symmetry_key(counts, vertex_ids, points, mirror_plane, tolerance=SYMMETRY_TOLERANCE):
+    """
+    Hashes everything a symmetry map depends on: the polygon layout, the points
+    snapped to the tolerance, the mirror plane and the tolerance itself. A mesh
+    that was reshaped, or searched with another tolerance, gets a new map.
+
+    :param counts: Vertex count per face.
+    :type counts: numpy.ndarray
+    :param vertex_ids: Flat face vertex ids.
+    :type vertex_ids: numpy.ndarray
+    :param points: Vx3 vertex positions.
+    :type points: numpy.ndarray
+    :param mirror_plane: Mirror plane, YZ, XZ or XY.
+    :type mirror_plane: str
+    :param tolerance: Largest distance accepted between a mirrored point and its match.
+    :type tolerance: float
+
+    :return: Hex digest of the inputs.
+    :rtype: str
+    """
+    digest = hashlib.sha1(topology_hash(counts, vertex_ids).encode("utf-8"))
+    digest.update(np.round(np.asarray(points, dtype=np.float64) / tolerance)
+                  .astype(np.int64).tobytes())
+    digest.update(f"{mirror_plane}_{tolerance!r}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_symmetry_map(points, axis=0, tolerance=SYMMETRY_TOLERANCE):
+    """
+    Finds the mirror vertex of every vertex, through a KD-tree when scipy is
+    available and a quantized position lookup otherwise.
+
+    :param points: Vx3 vertex positions.
+    :type points: numpy.ndarray
+    :param axis: Axis normal to the mirror plane.
+    :type axis: int
+    :param tolerance: Largest distance accepted between a mirrored point and its match.
+    :type tolerance: float
+
+    :return: Mirror vertex per vertex, -1 where no vertex was close enough.
+    :rtype: numpy.ndarray
+    """
+    mirrored = np.array(points, dtype=np.float64)
+    mirrored[:, axis] *= -1.0
+
+    if cKDTree is not None:
+        distances, matches = cKDTree(points).query(mirrored, distance_upper_bound=tolerance)
+        return np.where(np.isfinite(distances), matches, -1).astype(np.int64)
+
+    keys = np.round(points / tolerance).astype(np.int64)
+    lookup = {key: i for i, key in enumerate(map(tuple, keys))}
+    mirrored_keys = np.round(mirrored / tolerance).astype(np.int64)
+    symmetry = np.array([lookup.get(key, -1) for key in map(tuple, mirrored_keys)],
+                        dtype=np.int64)
+
+    # Points close to a rounding boundary miss the lookup, match those by distance
+    for i in np.flatnonzero(symmetry < 0):
+        distances = np.linalg.norm(points - mirrored[i], axis=1)
+        closest = int(np.argmin(distances))
+        if distances[closest] <= tolerance:
+            symmetry[i] = closest
+    return symmetry
+
+
+def get_symmetry_map(mesh, mirror_plane="YZ", tolerance=SYMMETRY_TOLERANCE):
+    """
+    Returns the vertex symmetry map of a mesh. Maps are cached in memory and on
+    disk, keyed by symmetry_key, so mirroring the same mesh again skips the search.
+
+    :param mesh: Name of the mesh.
+    :type mesh: str
+    :param mirror_plane: Mirror plane, YZ, XZ or XY.
+    :type mirror_plane: str
+    :param tolerance: Largest distance accepted between a mirrored point and its match.
+    :type tolerance: float
+
+    :return: Mirror vertex per vertex and the Vx3 object space points.
+    :rtype: tuple(numpy.ndarray)
+    """
+    counts, vertex_ids, points = get_mesh_topology(mesh)
+    key = symmetry_key(counts, vertex_ids, points, mirror_plane, tolerance)
+
+    symmetry = _SYMMETRY_CACHE.get(key)
+    cache_path = os.path.join(SYMMETRY_CACHE_DIR, f"symmetry_{key}.npy")
+    if symmetry is None and os.path.isfile(cache_path):
+        symmetry = np.load(cache_path)
+    if symmetry is None:
+        symmetry = build_symmetry_map(points, MIRROR_PLANE_AXES[mirror_plane], tolerance)
+        try:
+            os.makedirs(SYMMETRY_CACHE_DIR, exist_ok=True)
+            np.save(cache_path, symmetry)
+        except OSError:
+            print(f"Could not write symmetry cache '{cache_path}'.")
+
+    _SYMMETRY_CACHE[key] = symmetry
+    unmatched = int(np.count_nonzero(symmetry < 0))
+    if unmatched:
+        cmds.warning(f"{unmatched} vertices of {mesh} have no mirror vertex and are skipped.")
+    return symmetry, points
+
+
+def mirror_weight_matrix(weights, influences, symmetry, side_coords, direction="leftToRight",
+                         side_tokens=SIDE_TOKENS, tolerance=SYMMETRY_TOLERANCE):
+    """
+    Mirrors a weight matrix across the symmetry map. Destination vertices take the
+    weights of their mirror vertex with left and right influences swapped. Vertices
+    on the mirror plane are left alone.
+
+    :param weights: VxI weight matrix.
+    :type weights: numpy.ndarray
+    :param influences: Influence names of the columns.
+    :type influences: list[str]
+    :param symmetry: Mirror vertex per vertex, -1 for unmatched vertices.
+    :type symmetry: numpy.ndarray
+    :param side_coords: Coordinate of each vertex along the mirror axis.
+    :type side_coords: numpy.ndarray
+    :param direction: leftToRight copies positive side weights onto the negative side.
+    :type direction: str
+    :param side_tokens: Pairs of side prefixes used to swap influences.
+    :type side_tokens: tuple(tuple(str))
+    :param tolerance: Distance from the plane under which vertices count as center.
+    :type tolerance: float
+
+    :return: Destination vertex ids and their mirrored weight rows.
+    :rtype: tuple(numpy.ndarray)
+    """
+    columns = {name: i for i, name in enumerate(influences)}
+    swap = np.array([columns.get(swap_side(name, side_tokens), i)
+                     for i, name in enumerate(influences)], dtype=np.int64)
+
+    if direction == "leftToRight":
+        is_destination = side_coords < -tolerance
+    else:
+        is_destination = side_coords > tolerance
+    destination = np.flatnonzero(is_destination & (symmetry >= 0))
+
+    mirrored = weights[symmetry[destination]][:, swap]
+    return destination, mirrored
+
+
+PRUNE_CHUNK_SIZE = 65536
+
+
+def prune_weight_matrix(weights, max_influences=4, threshold=0.01, locked=None,
+                        chunk_size=PRUNE_CHUNK_SIZE):
+    """
+    Prunes every vertex to its strongest influences and renormalizes it.
+
+    Locked columns keep their weights and count against the influence budget. Free
+    weights outside the top influences or under the threshold are zeroed and the
+    remaining ones are scaled to fill what the locked weights leave. The strongest
+    free influence is always kept while the budget allows one. Rows are processed
+    in chunks to bound memory on very dense meshes.
+
+    :param weights: VxI weight matrix.
+    :type weights: numpy.ndarray
+    :param max_influences: Largest number of influences per vertex.
+    :type max_influences: int
+    :param threshold: Free weights below this value are dropped.
+    :type threshold: float
+    :param locked: Column indices whose weights must not change.
+    :type locked: list[int]
+    :param chunk_size: Number of vertices processed at once.
+    :type chunk_size: int
+
+    :return: Pruned VxI weight matrix and a per vertex changed mask.
+    :rtype: tuple(numpy.ndarray)
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    pruned = np.empty_like(weights)
+    changed = np.zeros(weights.shape[0], dtype=bool)
+
+    is_locked = np.zeros(weights.shape[1], dtype=bool)
+    if locked is not None:
+        is_locked[list(locked)] = True
+
+    for start in range(0, weights.shape[0], chunk_size):
+        chunk = weights[start:start + chunk_size]
+
+        locked_weights = np.where(is_locked, chunk, 0.0)
+        budget = max_influences - np.count_nonzero(locked_weights > WEIGHT_EPSILON, axis=1)
+
+        # Rank the free weights per vertex, strongest first
+        free = np.where(is_locked, -np.inf, chunk)
+        order = np.argsort(-free, axis=1, kind="stable")
+        rank = np.empty_like(order)
+        np.put_along_axis(rank, order, np.arange(chunk.shape[1])[None, :], axis=1)
+
+        keep = ~is_locked & (rank < budget[:, None]) & (chunk >= threshold)
+        keep |= ~is_locked & (rank == 0) & (budget[:, None] > 0)
+        free_weights = np.where(keep, chunk, 0.0)
+
+        target = np.clip(1.0 - locked_weights.sum(axis=1), 0.0, None)
+        free_sum = free_weights.sum(axis=1)
+        scale = np.divide(target, free_sum, out=np.ones_like(free_sum), where=free_sum > 0.0)
+        result = locked_weights + free_weights * scale[:, None]
+
+        pruned[start:start + chunk_size] = result
+        changed[start:start + chunk_size] = np.any(
+            np.abs(result - chunk) > WEIGHT_EPSILON, axis=1)
+
+    return pruned, changed
+
+
+@transaction("Prune Skin Weights")
+def prune_skin_weights(mesh=None, max_influences=4, threshold=0.01, locked_influences=None):
+    """
+    Prunes and renormalizes the skin weights of a mesh, or the selected mesh, so no
+    vertex goes over the engine's influence budget. Only changed vertices are
+    written, as one undoable step.
+
+    :param mesh: Name of the mesh, the first selected object if None.
+    :type mesh: str
+    :param max_influences: Largest number of influences per vertex.
+    :type max_influences: int
+    :param threshold: Weights below this value are dropped.
+    :type threshold: float
+    :param locked_influences: Names of influences whose weights must not change.
+    :type locked_influences: list[str]
+
+    :return: Number of vertices that changed.
+    :rtype: int
+    """
+    mesh = mesh or (cmds.ls(sl=True) or [None])[0]
+    if not mesh:
+        cmds.warning("Select a skinned mesh.")
+        return
+    skin = get_skin_cluster(mesh)
+    if not skin:
+        cmds.warning("No skinCluster found on selected mesh.")
+        return
+
+    weights, influences = get_skin_weights(mesh, skin)
+    locked = [influences.index(name) for name in locked_influences or [] if name in influences]
+    pruned, changed = prune_weight_matrix(weights, max_influences, threshold, locked)
+
+    vertices = np.flatnonzero(changed)
+    if vertices.size:
+        set_skin_weights(mesh, pruned[vertices], influences, skin=skin, vertices=vertices)
+
+    print(f"Pruned {mesh} to {max_influences} influences: {vertices.size} of "
+          f"{weights.shape[0]} vertices changed.")
+    show_message(f"✅ Skin weights pruned on <hl>{vertices.size}</hl> vertices.")
+    return int(vertices.size)
+
+
+_ADJACENCY_CACHE = {}
+
+
+def build_vertex_adjacency(counts, vertex_ids, vertex_count):
+    """
+    Builds the vertex adjacency of a polygon mesh as a CSR sparse matrix.
+
+    :param counts: Vertex count per face.
+    :type counts: numpy.ndarray
+    :param vertex_ids: Flat face vertex ids.
+    :type vertex_ids: numpy.ndarray
+    :param vertex_count: Number of vertices of the mesh.
+    :type vertex_count: int
+
+    :return: indptr and indices arrays, the neighbours of vertex v are
+             indices[indptr[v]:indptr[v + 1]].
+    :rtype: tuple(numpy.ndarray)
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    vertex_ids = np.asarray(vertex_ids, dtype=np.int64)
+
+    # Each face vertex connects to the next one, the last one wraps to the face start
+    face_starts = np.repeat(np.cumsum(counts) - counts, counts)
+    position = np.arange(vertex_ids.size)
+    next_position = position + 1
+    is_last = next_position == np.repeat(np.cumsum(counts), counts)
+    next_position[is_last] = face_starts[is_last]
+
+    starts = np.concatenate((vertex_ids, vertex_ids[next_position]))
+    ends = np.concatenate((vertex_ids[next_position], vertex_ids))
+
+    # Dedupe shared edges through a single sorted int64 key per directed edge
+    keys = np.sort(starts[starts != ends] * vertex_count + ends[starts != ends])
+    keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    rows, neighbours = np.divmod(keys, vertex_count)
+
+    indptr = np.zeros(vertex_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=vertex_count), out=indptr[1:])
+    return indptr, neighbours
+
+
+def get_vertex_adjacency(mesh):
+    """
+    Returns the vertex adjacency of a mesh, cached per topology hash.
+
+    :param mesh: Name of the mesh.
+    :type mesh: str
+
+    :return: indptr and indices arrays, see build_vertex_adjacency.
+    :rtype: tuple(numpy.ndarray)
+    """
+    counts, vertex_ids, points = get_mesh_topology(mesh)
+    key = topology_hash(counts, vertex_ids)
+    if key not in _ADJACENCY_CACHE:
+        _ADJACENCY_CACHE[key] = build_vertex_adjacency(counts, vertex_ids, len(points))
+    return _ADJACENCY_CACHE[key]
+
+
+SMOOTH_CHUNK_SIZE = 1 << 22
+
+
+def sparse_matrix_product(row_starts, columns, values, matrix, chunk_size=SMOOTH_CHUNK_SIZE):
+    """
+    Multiplies a CSR sparse matrix with a dense matrix. Rows are done in chunks, so
+    only about chunk_size gathered values of the dense matrix are held at once.
+
+    :param row_starts: Start of each row in columns and values, rows are never empty.
+    :type row_starts: numpy.ndarray
+    :param columns: Column of each stored value.
+    :type columns: numpy.ndarray
+    :param values: Stored values of the sparse matrix.
+    :type values: numpy.ndarray
+    :param matrix: Dense matrix with one row per sparse column.
+    :type matrix: numpy.ndarray
+    :param chunk_size: Number of dense values gathered per chunk.
+    :type chunk_size: int
+
+    :return: Dense product with one row per sparse row.
+    :rtype: numpy.ndarray
+    """
+    row_count = row_starts.size
+    row_ends = np.append(row_starts[1:], columns.size)
+    result = np.empty((row_count, matrix.shape[1]), dtype=np.float64)
+    step = max(1, chunk_size // max(matrix.shape[1], 1))
+
+    row = 0
+    while row < row_count:
+        stop = max(row + 1, int(np.searchsorted(row_starts, row_starts[row] + step)))
+        first, last = row_starts[row], row_ends[stop - 1]
+        gathered = matrix[columns[first:last]] * values[first:last, None]
+        result[row:stop] = np.add.reduceat(gathered, row_starts[row:stop] - first, axis=0)
+        row = stop
+    return result
+
+
+def smooth_weight_matrix(weights, indptr, indices, vertices=None, iterations=5, strength=0.5):
+    """
+    Relaxes weights with masked Laplacian smoothing. Each iteration moves every
+    masked vertex toward the average of its neighbours, neighbours outside the
+    mask are read but never changed. Smoothed rows are renormalized.
+
+    The averaging is a product with the row normalized adjacency of the masked
+    vertices, built once and applied in chunks, see sparse_matrix_product.
+
+    :param weights: VxI weight matrix.
+    :type weights: numpy.ndarray
+    :param indptr: Adjacency row pointers.
+    :type indptr: numpy.ndarray
+    :param indices: Adjacency neighbour ids.
+    :type indices: numpy.ndarray
+    :param vertices: Vertex ids to smooth, every vertex if None.
+    :type vertices: list[int]
+    :param iterations: Number of smoothing passes.
+    :type iterations: int
+    :param strength: How far each pass moves toward the neighbour average, 0 to 1.
+    :type strength: float
+
+    :return: Smoothed VxI weight matrix.
+    :rtype: numpy.ndarray
+    """
+    weights = np.array(weights, dtype=np.float64)
+    if vertices is None:
+        vertices = np.arange(weights.shape[0])
+    vertices = np.asarray(vertices, dtype=np.int64)
+
+    # Row normalized adjacency of the masked vertices
+    lengths = indptr[vertices + 1] - indptr[vertices]
+    vertices, lengths = vertices[lengths > 0], lengths[lengths > 0]
+    if not vertices.size:
+        return weights
+
+    row_starts = np.cumsum(lengths) - lengths
+    offsets = np.arange(lengths.sum()) - np.repeat(row_starts, lengths)
+    neighbours = indices[np.repeat(indptr[vertices], lengths) + offsets]
+    values = np.repeat(1.0 / lengths, lengths)
+
+    for _ in range(iterations):
+        average = sparse_matrix_product(row_starts, neighbours, values, weights)
+        weights[vertices] += strength * (average - weights[vertices])
+
+    totals = weights[vertices].sum(axis=1, keepdims=True)
+    weights[vertices] /= np.where(totals > 0.0, totals, 1.0)
+    return weights
+
+
+def get_selected_vertices():
+    """
+    Returns the selected meshes with the ids of their selected vertices.
+
+    :return: Vertex ids per mesh transform, None for meshes selected as a whole.
+    :rtype: dict
+    """
+    by_node = {}
+    for item in cmds.ls(sl=True) or []:
+        node, dot, _ = item.partition(".")
+        if cmds.objectType(node) == "mesh":
+            node = (cmds.listRelatives(node, parent=True) or [node])[0]
+        items = by_node.setdefault(node, [])
+        if items is not None:
+            by_node[node] = items + [item] if dot else None
+
+    selected = {}
+    for node, items in by_node.items():
+        if items is None:
+            selected[node] = None
+            continue
+        components = cmds.polyListComponentConversion(items, toVertex=True) or []
+        vertices = {int(component.rsplit("[", 1)[1].rstrip("]"))
+                    for component in cmds.ls(components, flatten=True) or []}
+        selected[node] = np.array(sorted(vertices), dtype=np.int64)
+    return selected
+
+
+@transaction("Smooth Skin Weights")
+def smooth_skin_weights(mesh=None, vertices=None, iterations=5, strength=0.5):
+    """
+    Smooths the skin weights of a mesh, or of the selected vertices, and writes
+    back only the smoothed vertices, as one undoable step. With nothing given every
+    selected mesh is smoothed, each on its own selected vertices.
+
+    :param mesh: Name of the mesh, taken from the selection if None.
+    :type mesh: str
+    :param vertices: Vertex ids to smooth, the selected ones or every vertex if None.
+    :type vertices: list[int]
+    :param iterations: Number of smoothing passes.
+    :type iterations: int
+    :param strength: How far each pass moves toward the neighbour average, 0 to 1.
+    :type strength: float
+
+    :return: Number of smoothed vertices.
+    :rtype: int
+    """
+    targets = get_selected_vertices() if mesh is None else {mesh: vertices}
+    if not targets:
+        cmds.warning("Select a skinned mesh or some of its vertices.")
+        return
+
+    smoothed_count = 0
+    for mesh, vertices in targets.items():
+        skin = get_skin_cluster(mesh)
+        if not skin:
+            cmds.warning(f"No skinCluster found on {mesh}.")
+            continue
+
+        indptr, indices = get_vertex_adjacency(mesh)
+        weights, influences = get_skin_weights(mesh, skin)
+        if vertices is None:
+            vertices = np.arange(weights.shape[0])
+        smoothed = smooth_weight_matrix(weights, indptr, indices, vertices, iterations, strength)
+        set_skin_weights(mesh, smoothed[vertices], influences, skin=skin, vertices=vertices)
+        smoothed_count += len(vertices)
+
+    show_message(f"✅ Skin weights smoothed on <hl>{smoothed_count}</hl> vertices.")
+    return smoothed_count
@@ -14,6 +14,8 @@ Module for squash and stretchy limbs
 :description:
 This module contains the utils for making the function for squash and stretchy limbs. This 
 Takes the mesurements of the original limb and creates the stretch and squash function. 
+Chains of any length and any primary axis are supported, and many chains can be built
+in one call with their math packed into shared nodes.
 
 
 :applications:
@@ -31,12 +33,11 @@ import os
 
 # Third party
 import maya.cmds as cmds
-try:
-    from PyQt5 import QtCore, QtGui, QtWidgets
-except ImportError:
-    from PySide2 import QtGui, QtCore, QtWidgets
+import numpy as np
 
 # Internal
+from auto_rigging_tool_box.rigging_tools.skeleton_utils import SkeletonIndex
+from auto_rigging_tool_box.rigging_tools.undo_utils import show_message, transaction
 
 # External
 
@@ -44,90 +45,334 @@ except ImportError:
 #----------------------------------------------------------------------------------------#
 #--------------------------------------------------------------------------- FUNCTIONS --#
 
-def create_squash_stretch_limb():
-    """
-    Creates squash & stretch setup for a 3-joint limb.
-    Select the control FIRST, then the 3 joints in order.
-    Example selection: ctrl, upperJnt, lowerJnt, endJnt
-    """
+# Nodes the original per-limb network used: a distanceBetween and five multiplyDivides
+LEGACY_NODES_PER_LIMB = 6
 
-    sel = cmds.ls(sl=True)
+CHANNELS = ("X", "Y", "Z")
 
-    if len(sel) != 4:
-        cmds.warning("Select the curve control first, then upper, lower and end joints.")
-        return
+# Single-purpose math nodes: node type, first input, second input and output attributes
+MATH_NODES = {
+    "divide": ("divide", "input1", "input2", "output"),
+    "multiply": ("multiply", "input[0]", "input[1]", "output"),
+    "power": ("power", "input", "exponent", "output"),
+}
 
-    ctrl, upper, lower, end = sel
+MULTIPLY_DIVIDE_OPERATIONS = {"multiply": 1, "divide": 2, "power": 3}
 
 
-    # Measure original length of the limb
-    upper_pos = cmds.xform(upper, q=True, ws=True, t=True)
-    lower_pos = cmds.xform(lower, q=True, ws=True, t=True)
-    end_pos   = cmds.xform(end, q=True, ws=True, t=True)
+def _create_node(network, node_type, name, **attrs):
+    """
+    Creates a utility node and records it in the network description.
+
+    :param network: Network description being built.
+    :type network: dict
+    :param node_type: Maya node type.
+    :type node_type: str
+    :param name: Name of the node.
+    :type name: str
+
+    :return: Name of the created node.
+    :rtype: str
+    """
+    node = cmds.createNode(node_type, name=name)
+    network["nodes"][node] = {"type": node_type, "attrs": {}}
+    for attr, value in attrs.items():
+        _set_attr(network, f"{node}.{attr}", value)
+    return node
 
-    upper_len = cmds.getAttr(upper + ".translateX")
-    lower_len = cmds.getAttr(lower + ".translateX")
-    original_length = abs(upper_len) + abs(lower_len)
 
-    # Create distance measuring setup
-    start_loc = cmds.spaceLocator(name=upper + "_distStart_LOC")[0]
-    end_loc = cmds.spaceLocator(name=end + "_distEnd_LOC")[0]
+def _set_attr(network, plug, value):
+    """
+    Sets a plug value and records it in the network description.
+    """
+    cmds.setAttr(plug, value)
+    node, attr = plug.split(".", 1)
+    if node in network["nodes"]:
+        network["nodes"][node]["attrs"][attr] = value
 
-    cmds.delete(cmds.pointConstraint(upper, start_loc))
-    cmds.delete(cmds.pointConstraint(end, end_loc))
 
-    dist = cmds.createNode("distanceBetween", name=upper + "_distanceBetween")
+def _connect(network, source, destination):
+    """
+    Connects two plugs and records the connection in the network description.
+    """
+    cmds.connectAttr(source, destination, force=True)
+    network["connections"].append((source, destination))
 
-    cmds.connectAttr(start_loc + ".worldPosition[0]", dist + ".point1")
-    cmds.connectAttr(end_loc + ".worldPosition[0]", dist + ".point2")
 
-    # Create a stretch ratio
-    md = cmds.createNode("multiplyDivide", name=upper + "_stretch_MD")
-    cmds.setAttr(md + ".operation", 2)  # Divide
+def _math_step(network, operation, name, slots, use_math_nodes):
+    """
+    Adds one math step for a group of limbs. multiplyDivide nodes take up to three
+    limbs, one per X/Y/Z channel; single-purpose math nodes take one limb each.
+
+    :param network: Network description being built.
+    :type network: dict
+    :param operation: multiply, divide or power.
+    :type operation: str
+    :param name: Base name of the new nodes.
+    :type name: str
+    :param slots: Per limb (first input, second input), plugs or values.
+    :type slots: list[tuple]
+    :param use_math_nodes: Use single-purpose math nodes instead of packed multiplyDivides.
+    :type use_math_nodes: bool
+
+    :return: Output plug of each limb.
+    :rtype: list[str]
+    """
+    def feed(plug, value):
+        if isinstance(value, str):
+            _connect(network, value, plug)
+        else:
+            _set_attr(network, plug, value)
+
+    outputs = []
+    if use_math_nodes:
+        node_type, input1, input2, output = MATH_NODES[operation]
+        for i, (value1, value2) in enumerate(slots):
+            node = _create_node(network, node_type, f"{name}_{i}_{node_type.upper()}")
+            feed(f"{node}.{input1}", value1)
+            feed(f"{node}.{input2}", value2)
+            outputs.append(f"{node}.{output}")
+        return outputs
+
+    for start in range(0, len(slots), len(CHANNELS)):
+        node = _create_node(network, "multiplyDivide", f"{name}_{start // 3}_MD",
+                            operation=MULTIPLY_DIVIDE_OPERATIONS[operation])
+        for channel, (value1, value2) in zip(CHANNELS, slots[start:start + len(CHANNELS)]):
+            feed(f"{node}.input1{channel}", value1)
+            feed(f"{node}.input2{channel}", value2)
+            outputs.append(f"{node}.output{channel}")
+    return outputs
+
+
+def _short_name(node):
+    """
+    Strips a long path down to the short node name, for naming new nodes after it.
+    """
+    return node.rsplit("|", 1)[-1]
 
-    cmds.connectAttr(dist + ".distance", md + ".input1X")
-    cmds.setAttr(md + ".input2X", original_length)
 
-    # Add attributes to control
+def _add_switch_attrs(ctrl):
+    """
+    Adds the stretch and squash switches to a control if it does not have them.
+    """
     if not cmds.attributeQuery("stretch", node=ctrl, exists=True):
         cmds.addAttr(ctrl, ln="stretch", min=0, max=1, dv=1, k=True)
     if not cmds.attributeQuery("squash", node=ctrl, exists=True):
         cmds.addAttr(ctrl, ln="squash", min=0, max=1, dv=1, k=True)
 
-    # Multiply stretch factor
-    stretch_md = cmds.createNode("multiplyDivide", name=upper + "_stretchSwitch_MD")
-    cmds.connectAttr(md + ".outputX", stretch_md + ".input1X")
-    cmds.connectAttr(ctrl + ".stretch", stretch_md + ".input2X")
 
-    # Drive joint scaling
-    cmds.connectAttr(stretch_md + ".outputX", upper + ".scaleX")
-    cmds.connectAttr(stretch_md + ".outputX", lower + ".scaleX")
+def build_squash_stretch_network(entries, name="squashStretch", use_math_nodes=False):
+    """
+    Builds the squash & stretch math for many limbs at once.
+
+    Every limb gets a distanceBetween fed by two locators, the start one placed on
+    the first joint and the end one parented under the control. The ratio, stretch
+    switch, inverse square root (a power of -0.5) and squash switch steps are each
+    packed three limbs to a multiplyDivide, or use single-purpose math nodes.
+
+    :param entries: Per limb dict with ctrl, start, end, driven and rest_length keys.
+    :type entries: list[dict]
+    :param name: Base name of the shared nodes.
+    :type name: str
+    :param use_math_nodes: Use single-purpose math nodes instead of packed multiplyDivides.
+    :type use_math_nodes: bool
+
+    :return: Network description with nodes, connections and limbs keys.
+    :rtype: dict
+    """
+    network = {"nodes": {}, "connections": [], "limbs": []}
+
+    distances = []
+    for entry in entries:
+        ctrl, start, end = entry["ctrl"], entry["start"], entry["end"]
+        _add_switch_attrs(ctrl)
+
+        start_loc = cmds.spaceLocator(name=_short_name(start) + "_distStart_LOC")[0]
+        end_loc = cmds.spaceLocator(name=_short_name(end) + "_distEnd_LOC")[0]
+        cmds.xform(start_loc, worldSpace=True, translation=entry["start_position"])
+        cmds.xform(end_loc, worldSpace=True, translation=entry["end_position"])
+        start_parent = cmds.listRelatives(start, parent=True)
+        if start_parent:
+            cmds.parent(start_loc, start_parent[0])
+        cmds.parent(end_loc, ctrl)
+
+        dist = _create_node(network, "distanceBetween", _short_name(start) + "_distanceBetween")
+        _connect(network, start_loc + ".worldPosition[0]", dist + ".point1")
+        _connect(network, end_loc + ".worldPosition[0]", dist + ".point2")
+        distances.append(dist + ".distance")
+        entry["locators"] = [start_loc, end_loc]
+
+    ratio = _math_step(network, "divide", name + "_ratio",
+                       [(dist, entry["rest_length"]) for dist, entry in zip(distances, entries)],
+                       use_math_nodes)
+    stretch = _math_step(network, "multiply", name + "_stretchSwitch",
+                         [(plug, entry["ctrl"] + ".stretch") for plug, entry in zip(ratio, entries)],
+                         use_math_nodes)
+    inverse = _math_step(network, "power", name + "_invSqrt",
+                         [(plug, -0.5) for plug in stretch], use_math_nodes)
+    squash = _math_step(network, "multiply", name + "_squashSwitch",
+                        [(plug, entry["ctrl"] + ".squash") for plug, entry in zip(inverse, entries)],
+                        use_math_nodes)
+
+    for entry, stretch_plug, squash_plug in zip(entries, stretch, squash):
+        stretch_attr = "scale" + entry.get("axis", "X")
+        squash_attrs = ["scale" + channel for channel in CHANNELS
+                        if channel != entry.get("axis", "X")]
+        for jnt in entry["driven"]:
+            _connect(network, stretch_plug, f"{jnt}.{stretch_attr}")
+            for attr in squash_attrs:
+                _connect(network, squash_plug, f"{jnt}.{attr}")
+
+        network["limbs"].append({
+            "ctrl": entry["ctrl"],
+            "driven": list(entry["driven"]),
+            "axis": entry.get("axis", "X"),
+            "rest_length": entry["rest_length"],
+            "locators": entry["locators"],
+            "stretch": stretch_plug,
+            "squash": squash_plug,
+        })
+
+    return network
+
+
+def report_node_counts(network):
+    """
+    Prints and returns the utility node count of a network next to what the
+    original one-limb-at-a-time network would have needed.
+
+    :param network: Network description returned by build_squash_stretch_network.
+    :type network: dict
+
+    :return: Report with limbs, legacy_nodes, nodes and by_type keys.
+    :rtype: dict
+    """
+    by_type = {}
+    for node in network["nodes"].values():
+        by_type[node["type"]] = by_type.get(node["type"], 0) + 1
+
+    limbs = len(network["limbs"])
+    report = {
+        "limbs": limbs,
+        "legacy_nodes": limbs * LEGACY_NODES_PER_LIMB,
+        "nodes": len(network["nodes"]),
+        "by_type": by_type,
+    }
+    print("Squash & Stretch nodes for {} limbs: {} before, {} now ({})".format(
+        limbs, report["legacy_nodes"], report["nodes"],
+        ", ".join(f"{count} {node_type}" for node_type, count in sorted(by_type.items()))))
+    return report
+
+
+@transaction("Create Squash & Stretch Chains")
+def create_squash_stretch_chains(chains, axis="x", use_math_nodes=False, skeleton=None,
+                                 name="squashStretch"):
+    """
+    Creates squash & stretch setups for any number of joint chains of any length,
+    like spines, tails and tentacles, in one undo step. Rest lengths come from the
+    cached world positions and every segment of a chain is driven by the chain's
+    single distance network.
+
+    :param chains: Per chain (ctrl, joints), joints ordered from root to tip.
+    :type chains: list[tuple(str, list[str])]
+    :param axis: Primary axis the joints point down, x, y or z.
+    :type axis: str
+    :param use_math_nodes: Use single-purpose math nodes instead of packed multiplyDivides.
+    :type use_math_nodes: bool
+    :param skeleton: Skeleton index to read joint positions from instead of the scene.
+    :type skeleton: SkeletonIndex
+    :param name: Base name of the shared nodes.
+    :type name: str
+
+    :return: Network description, see build_squash_stretch_network.
+    :rtype: dict
+    """
+    axis = axis.upper()
+    if axis not in CHANNELS:
+        raise ValueError(f"Unknown axis '{axis}', use x, y or z.")
+    for ctrl, joints in chains:
+        if len(joints) < 2:
+            raise ValueError(f"Chain driven by '{ctrl}' needs at least two joints.")
+
+    if use_math_nodes and "divide" not in (cmds.allNodeTypes() or []):
+        cmds.warning("Math nodes are not available in this Maya, using multiplyDivide nodes.")
+        use_math_nodes = False
+
+    if skeleton is None:
+        skeleton = SkeletonIndex([jnt for _, joints in chains for jnt in joints], hierarchy=False)
+
+    entries = []
+    for ctrl, joints in chains:
+        positions = skeleton.positions[skeleton.indices(joints)]
+
+        # The network measures start to end in a straight line, so the rest length is
+        # that same chord at bind time and a bent chain starts out unscaled
+        rest_length = float(np.linalg.norm(positions[-1] - positions[0]))
+        if rest_length < 1e-6:
+            raise ValueError(f"Chain driven by '{ctrl}' starts and ends at the same position.")
+
+        entries.append({
+            "ctrl": ctrl,
+            "start": joints[0],
+            "end": joints[-1],
+            "driven": list(joints[:-1]),
+            "axis": axis,
+            "rest_length": rest_length,
+            "start_position": positions[0].tolist(),
+            "end_position": positions[-1].tolist(),
+        })
+
+    network = build_squash_stretch_network(entries, name=name, use_math_nodes=use_math_nodes)
+    report_node_counts(network)
+    return network
+
+
+def create_squash_stretch_limbs(limbs, use_math_nodes=False, skeleton=None, name="squashStretch"):
+    """
+    Creates squash & stretch setups for many 3-joint limbs with shared nodes.
+
+    :param limbs: Per limb (ctrl, upper, lower, end).
+    :type limbs: list[tuple(str)]
+    :param use_math_nodes: Use single-purpose math nodes instead of packed multiplyDivides.
+    :type use_math_nodes: bool
+    :param skeleton: Skeleton index to read joint positions from instead of the scene.
+    :type skeleton: SkeletonIndex
+    :param name: Base name of the shared nodes.
+    :type name: str
+
+    :return: Network description, see build_squash_stretch_network.
+    :rtype: dict
+    """
+    return create_squash_stretch_chains([(limb[0], list(limb[1:])) for limb in limbs],
+                                        use_math_nodes=use_math_nodes, skeleton=skeleton,
+                                        name=name)
+
+
+@transaction("Create Squash & Stretch")
+def create_squash_stretch_limb(skeleton=None, axis="x"):
+    """
+    Creates squash & stretch setup for a selected joint chain.
+    Select the control FIRST, then the joints in order, two or more.
+    Example selection: ctrl, upperJnt, lowerJnt, endJnt
 
-    # 7. Squash on Y/Z axes
-    sqrt_md = cmds.createNode("multiplyDivide", name=upper + "_sqrt_MD")
-    cmds.setAttr(sqrt_md + ".operation", 3)  # Power
-    cmds.connectAttr(stretch_md + ".outputX", sqrt_md + ".input1X")
-    cmds.setAttr(sqrt_md + ".input2X", 0.5)  # Square root
+    :param skeleton: Skeleton index to read joint positions from instead of the scene.
+    :type skeleton: SkeletonIndex
+    :param axis: Primary axis the joints point down, x, y or z.
+    :type axis: str
+    """
 
-    inv_md = cmds.createNode("multiplyDivide", name=upper + "_invSquash_MD")
-    cmds.setAttr(inv_md + ".operation", 2)  # Divide (1 / sqrt(stretch))
-    cmds.setAttr(inv_md + ".input1X", 1)
-    cmds.connectAttr(sqrt_md + ".outputX", inv_md + ".input2X")
+    sel = cmds.ls(sl=True)
 
-    # Add squash switch
-    squash_md = cmds.createNode("multiplyDivide", name=upper + "_squashSwitch_MD")
-    cmds.connectAttr(inv_md + ".outputX", squash_md + ".input1X")
-    cmds.connectAttr(ctrl + ".squash",    squash_md + ".input2X")
+    if len(sel) < 3:
+        cmds.warning("Select the curve control first, then at least two joints in order.")
+        return
 
-    # Drive joint scales
-    for jnt in (upper, lower):
-        cmds.connectAttr(squash_md + ".outputX", jnt + ".scaleY")
-        cmds.connectAttr(squash_md + ".outputX", jnt + ".scaleZ")
+    ctrl, joints = sel[0], sel[1:]
+    network = create_squash_stretch_chains([(ctrl, joints)], axis=axis, skeleton=skeleton,
+                                           name=_short_name(joints[0]))
 
     cmds.select(clear=True)
-    cmds.inViewMessage(
-        amg=f"✅ Squash & Stretch created for <hl>{upper}</hl>, <hl>{lower}</hl>, <hl>{end}</hl>",
-        pos="topCenter",
-        fade=True
-    )
-    print("Squash & Stretch created for:", upper, lower, end)
+    show_message(f"✅ Squash & Stretch created for <hl>{len(joints)}</hl> joints "
+                 f"from <hl>{joints[0]}</hl> to <hl>{joints[-1]}</hl>")
+    print("Squash & Stretch created for:", *joints)
+    return network
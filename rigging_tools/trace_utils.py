@@ -0,0 +1,347 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author: Kris Hernandez
+
+:synopsis:
+Module for tracing and profiling the maya.cmds calls of the rigging tools.
+
+:description:
+This module contains an opt-in tracer for the commands the rigging tools send to Maya.
+While tracing, the cmds attribute of every rigging tools module is swapped for a
+CmdsTracer that records each call's command, arguments, wall time, calling function
+and the tool it runs under. Events aggregate into per-tool counts and latency
+histograms and export to a Chrome trace (chrome://tracing or Perfetto) or a flat text
+report. Nothing is wrapped while tracing is off, so it costs nothing then. The tracer
+wraps any object that looks like cmds.
+
+Example::
+
+    with trace_cmds() as tracer:
+        create_fk_chains(chains)
+    print(tracer.text_report())
+    tracer.write_chrome_trace("fk_build.json")
+
+:applications:
+    Maya
+    Python
+
+:see_also:
+rigging_tools.undo_utils
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Built-in
+import contextlib
+import importlib
+import json
+import os
+import sys
+import time
+
+# Third party
+
+# Internal
+
+# External
+
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+PACKAGE = __name__.rsplit(".", 1)[0]
+
+# Upper bounds in seconds of the latency histogram buckets
+HISTOGRAM_BUCKETS = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, float("inf"))
+
+MAX_ARG_LENGTH = 120
+
+# Modules whose proxies forward cmds calls, they never count as the caller
+PROXY_MODULES = (__name__, f"{PACKAGE}.record_utils")
+
+# Modules whose frames only wrap tools, they never count as the calling tool
+WRAPPER_MODULES = PROXY_MODULES + (f"{PACKAGE}.undo_utils",)
+
+_ACTIVE = {"tracer": None, "modules": []}
+
+
+def _format_args(args, kwargs):
+    """
+    Formats call arguments for the trace, long values are cut short.
+    """
+    parts = [repr(arg) for arg in args]
+    parts += [f"{key}={value!r}" for key, value in kwargs.items()]
+    text = ", ".join(parts)
+    if len(text) > MAX_ARG_LENGTH:
+        text = text[:MAX_ARG_LENGTH - 3] + "..."
+    return text
+
+
+def _calling_frames(frame):
+    """
+    Returns the function that made a call and the outermost rigging tools function
+    above it, which is the tool the call belongs to.
+    """
+    while frame.f_back is not None and frame.f_globals.get("__name__") in PROXY_MODULES:
+        frame = frame.f_back
+    caller = f"{frame.f_globals.get('__name__')}.{frame.f_code.co_name}"
+    tool = caller
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(PACKAGE) and module not in WRAPPER_MODULES:
+            tool = f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return caller, tool
+
+
+def tool_modules():
+    """
+    Imports and returns every rigging tools module that talks to cmds.
+
+    :return: The modules.
+    :rtype: list[module]
+    """
+    registry = importlib.import_module(PACKAGE)
+    names = set(registry.TOOLS.values()) | {"skeleton_utils", "undo_utils"}
+    modules = [importlib.import_module(f"{PACKAGE}.{name}") for name in sorted(names)]
+    return [module for module in modules if hasattr(module, "cmds")]
+
+
+def install_proxy(proxy, modules):
+    """
+    Puts a cmds proxy in front of the cmds of modules. A proxy already there, like
+    a session recorder while tracing, stays active behind the new one.
+
+    :param proxy: Proxy forwarding to the modules' current cmds.
+    :type proxy: object
+    :param modules: Modules to route through the proxy.
+    :type modules: list[module]
+    """
+    for module in modules:
+        module.cmds = proxy
+
+
+def remove_proxy(proxy, modules):
+    """
+    Takes a cmds proxy out of the chain of proxies in front of the cmds of modules,
+    leaving every other proxy active.
+
+    :param proxy: Proxy put in with install_proxy.
+    :type proxy: object
+    :param modules: Modules the proxy was installed on.
+    :type modules: list[module]
+    """
+    for module in modules:
+        if module.cmds is proxy:
+            module.cmds = proxy._cmds
+            continue
+        # Another proxy went in after this one, link it past this one
+        current = module.cmds
+        while hasattr(current, "_wrapped"):
+            if current._cmds is proxy:
+                current._cmds = proxy._cmds
+                current._wrapped.clear()
+                break
+            current = current._cmds
+
+
+def enable_tracing(modules=None, tracer=None):
+    """
+    Starts tracing the cmds calls of the given modules.
+
+    :param modules: Modules to trace, every rigging tools module if None.
+    :type modules: list[module]
+    :param tracer: Tracer to record into, a new one wrapping the modules' cmds if None.
+    :type tracer: CmdsTracer
+
+    :return: The active tracer.
+    :rtype: CmdsTracer
+    """
+    if _ACTIVE["tracer"] is not None:
+        disable_tracing()
+    modules = tool_modules() if modules is None else modules
+    if tracer is None:
+        tracer = CmdsTracer(modules[0].cmds if modules else None)
+
+    install_proxy(tracer, modules)
+    _ACTIVE["tracer"] = tracer
+    _ACTIVE["modules"] = modules
+    return tracer
+
+
+def disable_tracing():
+    """
+    Stops tracing and takes the tracer out of the modules' cmds.
+
+    :return: The tracer that was active, or None.
+    :rtype: CmdsTracer
+    """
+    tracer, _ACTIVE["tracer"] = _ACTIVE["tracer"], None
+    if tracer is not None:
+        remove_proxy(tracer, _ACTIVE["modules"])
+    _ACTIVE["modules"] = []
+    return tracer
+
+
+def get_tracer():
+    """
+    Returns the active tracer, or None while tracing is off.
+    """
+    return _ACTIVE["tracer"]
+
+
+@contextlib.contextmanager
+def trace_cmds(modules=None, cmds=None):
+    """
+    Traces the cmds calls of the enclosed code.
+
+    :param modules: Modules to trace, every rigging tools module if None.
+    :type modules: list[module]
+    :param cmds: cmds-like object to wrap, the modules' own cmds if None.
+    :type cmds: object
+    """
+    tracer = CmdsTracer(cmds) if cmds is not None else None
+    tracer = enable_tracing(modules, tracer)
+    try:
+        yield tracer
+    finally:
+        disable_tracing()
+
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
+
+class CmdsTracer(object):
+    """
+    Stand-in for cmds that forwards every command and records it.
+
+    Each event is a dict with command, args, start and duration in seconds since
+    the tracer was made, caller and tool keys.
+    """
+
+    def __init__(self, cmds):
+        self._cmds = cmds
+        self._wrapped = {}
+        self.events = []
+        self.origin = time.perf_counter()
+
+    def __getattr__(self, name):
+        wrapped = self._wrapped.get(name)
+        if wrapped is None:
+            wrapped = self._wrap(name, getattr(self._cmds, name))
+            self._wrapped[name] = wrapped
+        return wrapped
+
+    def _wrap(self, name, command):
+        """
+        Returns a recording version of one command.
+        """
+        if not callable(command):
+            return command
+
+        def traced(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return command(*args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start
+                caller, tool = _calling_frames(sys._getframe(1))
+                self.events.append({
+                    "command": name,
+                    "args": _format_args(args, kwargs),
+                    "start": start - self.origin,
+                    "duration": duration,
+                    "caller": caller,
+                    "tool": tool,
+                })
+        traced.__name__ = name
+        return traced
+
+    def clear(self):
+        """
+        Drops every recorded event.
+        """
+        self.events = []
+        self.origin = time.perf_counter()
+
+    def summary(self):
+        """
+        Aggregates the events per tool.
+
+        :return: Per tool dict with count, seconds, commands (command -> count) and
+                 histogram (one count per HISTOGRAM_BUCKETS bound) keys.
+        :rtype: dict
+        """
+        tools = {}
+        for event in self.events:
+            stats = tools.setdefault(event["tool"], {
+                "count": 0,
+                "seconds": 0.0,
+                "commands": {},
+                "histogram": [0] * len(HISTOGRAM_BUCKETS),
+            })
+            stats["count"] += 1
+            stats["seconds"] += event["duration"]
+            stats["commands"][event["command"]] = stats["commands"].get(event["command"], 0) + 1
+            for i, bound in enumerate(HISTOGRAM_BUCKETS):
+                if event["duration"] < bound:
+                    stats["histogram"][i] += 1
+                    break
+        return tools
+
+    def chrome_trace(self):
+        """
+        Returns the events in the Chrome trace event format.
+
+        :return: Trace with a traceEvents list of complete events.
+        :rtype: dict
+        """
+        pid = os.getpid()
+        return {
+            "displayTimeUnit": "ms",
+            "traceEvents": [{
+                "name": event["command"],
+                "cat": event["tool"],
+                "ph": "X",
+                "ts": event["start"] * 1e6,
+                "dur": event["duration"] * 1e6,
+                "pid": pid,
+                "tid": 0,
+                "args": {"args": event["args"], "caller": event["caller"]},
+            } for event in self.events],
+        }
+
+    def write_chrome_trace(self, path):
+        """
+        Writes the events to a Chrome trace JSON file.
+
+        :param path: Path of the trace file.
+        :type path: str
+        """
+        with open(path, "w") as trace_file:
+            json.dump(self.chrome_trace(), trace_file)
+
+    def text_report(self):
+        """
+        Returns a flat text report, slowest tools first.
+
+        :return: The report.
+        :rtype: str
+        """
+        labels = ["<10us", "<100us", "<1ms", "<10ms", "<100ms", ">=100ms"]
+        lines = [f"{len(self.events)} cmds calls, "
+                 f"{sum(event['duration'] for event in self.events):.4f}s in Maya"]
+        tools = sorted(self.summary().items(), key=lambda item: item[1]["seconds"], reverse=True)
+        for tool, stats in tools:
+            lines.append(f"{tool}: {stats['count']} calls, {stats['seconds']:.4f}s")
+            commands = sorted(stats["commands"].items(), key=lambda item: item[1], reverse=True)
+            lines.append("    " + ", ".join(f"{command} x{count}" for command, count in commands))
+            lines.append("    " + ", ".join(f"{label} {count}" for label, count
+                                            in zip(labels, stats["histogram"]) if count))
+        return "\n".join(lines)
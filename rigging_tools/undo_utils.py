@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author: Kris Hernandez
+
+:synopsis:
+Module for undo and transaction utils.
+
+:description:
+This module contains the transaction wrapper used by the rig builders and general tools.
+A transaction runs every scene edit inside one undo chunk with viewport refresh
+suspended, holds back the per-tool in-view messages, rolls the partial build back
+when a tool raises and prints one timed summary at the end. Transactions nest, only
+the outermost one opens the chunk and reports.
+
+:applications:
+    Maya
+
+:see_also:
+rigging_tools.gen_utils
+rigging_tools.fk_utils
+rigging_tools.ik_utils
+rigging_tools.squash_stretch_utils
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Built-in
+import contextlib
+import functools
+import time
+
+# Third party
+import maya.cmds as cmds
+
+# Internal
+
+# External
+
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+_TRANSACTION = {
+    "depth": 0,
+    "messages": [],
+}
+
+
+def in_transaction():
+    """
+    Tells if a transaction is currently open.
+
+    :return: True when called from inside a transaction.
+    :rtype: bool
+    """
+    return _TRANSACTION["depth"] > 0
+
+
+def show_message(message):
+    """
+    Shows an in-view message, or holds it back until the open transaction ends.
+
+    :param message: Message to show, in-view message markup is allowed.
+    :type message: str
+    """
+    if in_transaction():
+        _TRANSACTION["messages"].append(message)
+        return
+    cmds.inViewMessage(amg=message, pos="topCenter", fade=True)
+
+
+def _rollback(name):
+    """
+    Undoes the chunk that was just closed, as long as it is the last undo entry.
+
+    :param name: Chunk name of the transaction.
+    :type name: str
+
+    :return: True if the chunk was undone.
+    :rtype: bool
+    """
+    if not cmds.undoInfo(query=True, state=True):
+        return False
+    # An empty chunk is never pushed, so make sure not to undo the user's last action
+    if cmds.undoInfo(query=True, undoName=True) != name:
+        return False
+    cmds.undo()
+    return True
+
+
+@contextlib.contextmanager
+def rig_transaction(name):
+    """
+    Runs the enclosed scene edits as one undoable, refresh-suspended transaction.
+
+    :param name: Name of the transaction, used for the undo chunk and the summary.
+    :type name: str
+    """
+    if in_transaction():
+        _TRANSACTION["depth"] += 1
+        try:
+            yield
+        finally:
+            _TRANSACTION["depth"] -= 1
+        return
+
+    _TRANSACTION["depth"] = 1
+    _TRANSACTION["messages"] = []
+    start = time.perf_counter()
+
+    cmds.undoInfo(openChunk=True, chunkName=name)
+    cmds.refresh(suspend=True)
+    try:
+        yield
+    except Exception as error:
+        cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
+        rolled_back = _rollback(name)
+        _TRANSACTION["depth"] = 0
+        elapsed = time.perf_counter() - start
+        state = "rolled back" if rolled_back else "left in scene"
+        print(f"{name} failed after {elapsed:.3f}s, partial build {state}: {error}")
+        cmds.warning(f"{name} failed: {error}")
+        raise
+    else:
+        cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
+        _TRANSACTION["depth"] = 0
+        elapsed = time.perf_counter() - start
+
+        messages = _TRANSACTION["messages"]
+        print(f"{name} finished in {elapsed:.3f}s ({len(messages)} tool messages)")
+        if len(messages) == 1:
+            cmds.inViewMessage(amg=messages[0], pos="topCenter", fade=True)
+        elif messages:
+            cmds.inViewMessage(amg=f"✅ {name}: <hl>{len(messages)}</hl> steps done",
+                               pos="topCenter", fade=True)
+
+
+def transaction(name=None):
+    """
+    Decorator that runs a tool inside a rig transaction.
+
+    :param name: Name of the transaction, defaults to the function name.
+    :type name: str
+
+    :return: The decorator.
+    :rtype: function
+    """
+    def decorator(func):
+        chunk_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with rig_transaction(chunk_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,23 @@
+"""
+Test setup: makes the repository importable as auto_rigging_tool_box and swaps
+Maya for the stand-ins of fake_maya. Spawned workers inherit sys.path.
+"""
+import sys
+
+import pytest
+
+import fake_maya
+
+
+sys.path.insert(0, fake_maya.package_path())
+FAKE_CMDS = fake_maya.install()
+
+
+@pytest.fixture
+def cmds():
+    """
+    The fake maya.cmds, cleared before each test.
+    """
+    FAKE_CMDS.reset()
+    yield FAKE_CMDS
+    FAKE_CMDS.reset()
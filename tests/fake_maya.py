@@ -0,0 +1,145 @@
+"""
+Stand-ins for maya.cmds and the Maya API, so the rigging tools import and run
+without Maya. FakeCmds records every command it is sent and answers from a table
+of canned return values.
+"""
+import collections
+import itertools
+import os
+import sys
+import tempfile
+import types
+from unittest import mock
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PACKAGE = "auto_rigging_tool_box"
+
+
+# Commands that return the name of the node they create
+CREATE_COMMANDS = {
+    "createNode", "curve", "group", "joint", "spaceLocator", "duplicate", "shadingNode",
+}
+
+# Commands that return a list of created node names
+CREATE_LIST_COMMANDS = {
+    "circle", "ikHandle", "spaceLocator", "skinCluster", "mirrorJoint", "aimConstraint",
+    "orientConstraint", "parentConstraint", "pointConstraint", "poleVectorConstraint",
+    "scaleConstraint",
+}
+
+LIST_COMMANDS = {"ls", "listRelatives", "listConnections", "listAttr", "listHistory"}
+
+
+class FakeCmds(object):
+    """
+    Recording stand-in for maya.cmds.
+
+    Every call is kept in calls as a (command, args, kwargs) tuple. returns maps a
+    command to its return value, or to a function called with the command's args.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Drops the recorded calls and the canned return values.
+        """
+        self.calls = []
+        self.returns = {}
+        self._names = itertools.count(1)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def command(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            if name in self.returns:
+                value = self.returns[name]
+                return value(*args, **kwargs) if callable(value) else value
+            return self._default(name, kwargs)
+        command.__name__ = name
+        return command
+
+    def _default(self, name, kwargs):
+        if name in LIST_COMMANDS:
+            return []
+        if name in CREATE_COMMANDS or name in CREATE_LIST_COMMANDS:
+            node = kwargs.get("name") or kwargs.get("n") or f"{name}{next(self._names)}"
+            if name == "ikHandle":
+                return [node, f"{node}_effector"]
+            if name in ("circle", "spaceLocator"):
+                return [node, f"{node}Shape"]
+            return [node] if name in CREATE_LIST_COMMANDS else node
+        return None
+
+    def counts(self):
+        """
+        Counts the recorded calls per command.
+
+        :return: Number of calls per command name.
+        :rtype: collections.Counter
+        """
+        return collections.Counter(call[0] for call in self.calls)
+
+    def named(self, name):
+        """
+        Returns the recorded calls of one command.
+        """
+        return [call for call in self.calls if call[0] == name]
+
+
+def _api_module(name):
+    module = types.ModuleType(name)
+    module.__getattr__ = lambda attr: getattr(mock.MagicMock(name=f"{name}.{attr}"), "return_value")
+    return module
+
+
+def install():
+    """
+    Puts the fake maya modules in sys.modules, unless Maya is really there.
+
+    :return: The FakeCmds every tool module talks to.
+    :rtype: FakeCmds
+    """
+    existing = sys.modules.get("maya.cmds")
+    if isinstance(existing, FakeCmds):
+        return existing
+
+    cmds = FakeCmds()
+    maya = types.ModuleType("maya")
+    api = types.ModuleType("maya.api")
+    open_maya = _api_module("maya.api.OpenMaya")
+    open_maya_anim = _api_module("maya.api.OpenMayaAnim")
+    maya.cmds = cmds
+    maya.api = api
+    api.OpenMaya = open_maya
+    api.OpenMayaAnim = open_maya_anim
+    sys.modules.update({
+        "maya": maya,
+        "maya.cmds": cmds,
+        "maya.api": api,
+        "maya.api.OpenMaya": open_maya,
+        "maya.api.OpenMayaAnim": open_maya_anim,
+    })
+    return cmds
+
+
+def package_path():
+    """
+    Returns a directory holding the package, linking the checkout under the package
+    name when it is cloned under another name.
+    """
+    if os.path.basename(ROOT) == PACKAGE:
+        return os.path.dirname(ROOT)
+    link_dir = os.path.join(tempfile.gettempdir(), "rigging_tools_tests")
+    link = os.path.join(link_dir, PACKAGE)
+    if os.path.realpath(link) != ROOT:
+        os.makedirs(link_dir, exist_ok=True)
+        if os.path.lexists(link):
+            os.remove(link)
+        os.symlink(ROOT, link)
+    return link_dir
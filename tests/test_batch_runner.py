@@ -0,0 +1,105 @@
+import json
+import os
+
+import pytest
+
+from auto_rigging_tool_box.rigging_tools import batch_runner
+
+
+SPEC = {"name": "hero", "components": [{"name": "arm", "type": "fk"}]}
+
+
+def write_scenes(directory, contents):
+    for name, text in contents.items():
+        with open(os.path.join(directory, name), "w") as scene_file:
+            scene_file.write(text)
+    spec_path = os.path.join(directory, "spec.json")
+    with open(spec_path, "w") as spec_file:
+        json.dump(SPEC, spec_file)
+    return batch_runner.find_scenes(str(directory)), spec_path
+
+
+def by_name(summary):
+    return {os.path.basename(result["scene"]): result for result in summary["results"]}
+
+
+def test_run_batch_builds_every_scene(tmp_path):
+    scenes, spec = write_scenes(tmp_path, {"a.ma": "", "b.ma": "", "c.mb": ""})
+    output = tmp_path / "built"
+
+    lines = []
+    summary = batch_runner.run_batch(scenes, spec, output_dir=str(output), workers=2,
+                                     backend="mock", progress=lines.append)
+
+    assert summary["done"] == 3
+    assert summary["failed"] == []
+    assert [result["scene"] for result in summary["results"]] == scenes
+    assert all(result["attempts"] == 1 for result in summary["results"])
+    assert sorted(os.listdir(output)) == ["a.ma", "b.ma", "c.mb"]
+    assert len(lines) == 3
+
+
+def test_run_batch_retries_failed_scenes(tmp_path):
+    scenes, spec = write_scenes(tmp_path, {"good.ma": "", "bad.ma": "MOCK_FAIL"})
+
+    summary = batch_runner.run_batch(scenes, spec, workers=2, retries=2, backend="mock",
+                                     progress=lambda line: None)
+
+    results = by_name(summary)
+    assert results["good.ma"]["status"] == "done"
+    assert results["bad.ma"]["status"] == "failed"
+    assert results["bad.ma"]["attempts"] == 3
+    assert "Mock failure" in results["bad.ma"]["error"]
+    assert summary["failed"] == [str(tmp_path / "bad.ma")]
+
+
+def test_run_batch_survives_worker_crash(tmp_path):
+    contents = {f"scene_{i}.ma": "" for i in range(6)}
+    contents["crash.ma"] = "MOCK_CRASH"
+    scenes, spec = write_scenes(tmp_path, contents)
+
+    summary = batch_runner.run_batch(scenes, spec, workers=3, retries=1, backend="mock",
+                                     progress=lambda line: None)
+
+    results = by_name(summary)
+    assert summary["done"] == 6
+    assert results["crash.ma"]["status"] == "failed"
+    assert results["crash.ma"]["attempts"] == 2
+    assert "worker exited" in results["crash.ma"]["error"]
+    assert all(results[name]["attempts"] == 1 for name in contents if name != "crash.ma")
+
+
+def test_run_batch_times_out_hung_scene(tmp_path):
+    scenes, spec = write_scenes(tmp_path, {"hang.ma": "MOCK_HANG", "good.ma": ""})
+
+    summary = batch_runner.run_batch(scenes, spec, workers=2, retries=0, timeout=1.0,
+                                     backend="mock", progress=lambda line: None)
+
+    results = by_name(summary)
+    assert results["good.ma"]["status"] == "done"
+    assert results["hang.ma"]["status"] == "failed"
+    assert "timed out" in results["hang.ma"]["error"]
+
+
+def test_main_writes_json_report(tmp_path, capsys):
+    write_scenes(tmp_path, {"good.ma": "", "bad.ma": "MOCK_FAIL"})
+    report_path = tmp_path / "report.json"
+
+    code = batch_runner.main([str(tmp_path), str(tmp_path / "spec.json"), "--backend", "mock",
+                              "--workers", "2", "--retries", "0",
+                              "--report", str(report_path)])
+
+    assert code == 1
+    report = json.loads(report_path.read_text())
+    assert report["backend"] == "mock"
+    assert report["done"] == 1
+    assert report["failed"] == [str(tmp_path / "bad.ma")]
+    good = by_name(report)["good.ma"]
+    assert good["report"]["stages"] == [{"name": "arm", "type": "fk", "status": "done",
+                                         "seconds": 0.0}]
+    assert "Built 1/2 scenes" in capsys.readouterr().out
+
+
+def test_run_batch_rejects_unknown_backend(tmp_path):
+    with pytest.raises(ValueError):
+        batch_runner.run_batch([], "spec.json", backend="houdini")
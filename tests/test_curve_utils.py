@@ -0,0 +1,65 @@
+import numpy as np
+
+from auto_rigging_tool_box.rigging_tools import curve_utils
+from auto_rigging_tool_box.rigging_tools.curve_utils import (apply_side_colors, clear_shape_cache,
+                                                             get_shape, list_shapes)
+
+
+SHAPES = ["|L_arm_CTRL|L_arm_CTRLShape", "|R_arm_CTRL|R_arm_CTRLShape",
+          "|C_spine_CTRL|C_spine_CTRLShape", "|L_leg_CTRL|L_leg_CTRLShape",
+          "|prop_CTRL|prop_CTRLShape"]
+
+
+def side_color_scene(cmds, monkeypatch):
+    """
+    Serves SHAPES to ls, with L_arm showing the right color already, R_arm colored
+    by RGB and L_leg not overridden at all.
+    """
+    cmds.returns["ls"] = SHAPES
+    state = (np.array((True, True, True, False, False)), np.array((6, 13, 0, 0, 0)),
+             np.array((False, True, False, False, False)))
+    monkeypatch.setattr(curve_utils, "get_override_colors", lambda shapes: state)
+
+
+def test_list_shapes_details_skip_shape_conversion():
+    clear_shape_cache()
+    shapes = list_shapes(details=True)
+
+    assert [shape[0] for shape in shapes] == list_shapes()
+    assert get_shape.cache_info().currsize == 0
+
+    for name, label, group in shapes:
+        assert (label, group) == (get_shape(name)["label"], get_shape(name)["group"])
+    clear_shape_cache()
+
+
+def test_apply_side_colors_only_sets_what_differs(cmds, monkeypatch):
+    side_color_scene(cmds, monkeypatch)
+
+    assert apply_side_colors() == {13: 1, 17: 1, 6: 1}
+    assert [call[1] for call in cmds.named("setAttr")] == [
+        ("|R_arm_CTRL|R_arm_CTRLShape.overrideRGBColors", 0),
+        ("|C_spine_CTRL|C_spine_CTRLShape.overrideColor", 17),
+        ("|L_leg_CTRL|L_leg_CTRLShape.overrideEnabled", 1),
+        ("|L_leg_CTRL|L_leg_CTRLShape.overrideColor", 6),
+    ]
+
+
+def test_apply_side_colors_rules_and_default(cmds, monkeypatch):
+    side_color_scene(cmds, monkeypatch)
+
+    counts = apply_side_colors(rules=((r"_arm_", 13), (r"^C_", 17)), default=22)
+    assert counts == {13: 2, 17: 1, 22: 2}
+    colors = {call[1][0]: call[1][1] for call in cmds.named("setAttr")
+              if call[1][0].endswith("overrideColor")}
+    assert colors == {"|L_arm_CTRL|L_arm_CTRLShape.overrideColor": 13,
+                      "|C_spine_CTRL|C_spine_CTRLShape.overrideColor": 17,
+                      "|L_leg_CTRL|L_leg_CTRLShape.overrideColor": 22,
+                      "|prop_CTRL|prop_CTRLShape.overrideColor": 22}
+
+
+def test_apply_side_colors_dry_run_edits_nothing(cmds, monkeypatch):
+    side_color_scene(cmds, monkeypatch)
+
+    assert apply_side_colors(dry_run=True) == {13: 1, 17: 1, 6: 1}
+    assert not cmds.named("setAttr")
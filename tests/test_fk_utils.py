@@ -0,0 +1,42 @@
+import numpy as np
+
+from auto_rigging_tool_box.rigging_tools.fk_utils import create_fk_chains
+
+
+def translation(x, y, z):
+    matrix = np.identity(4)
+    matrix[3, :3] = (x, y, z)
+    return matrix
+
+
+class FakeSkeleton(object):
+    """
+    Skeleton index holding only world matrices.
+    """
+
+    def __init__(self, matrices):
+        self.names = list(matrices)
+        self.matrices = np.array([matrices[name] for name in self.names])
+
+    def indices(self, names):
+        return [self.names.index(name) for name in names]
+
+
+def test_offsets_hold_the_local_matrix_of_each_joint(cmds):
+    skeleton = FakeSkeleton({
+        "L_index_0": translation(5, 10, 0), "L_index_1": translation(6, 10, 0),
+        "L_index_2": translation(7, 9, 0), "L_thumb_0": translation(4, 9, 1),
+        "L_thumb_1": translation(4, 8, 2),
+    })
+    chains = [skeleton.names[:3], skeleton.names[3:]]
+
+    results = create_fk_chains(chains, skeleton=skeleton)
+
+    placed = {call[1][0]: np.array(call[2]["matrix"]).reshape(4, 4)
+              for call in cmds.named("xform")}
+    expected = {"L_index_0": (5, 10, 0), "L_index_1": (1, 0, 0), "L_index_2": (1, -1, 0),
+                "L_thumb_0": (4, 9, 1), "L_thumb_1": (0, -1, 1)}
+    for name, offset in expected.items():
+        np.testing.assert_allclose(placed[f"{name}_FK_OFFSET"], translation(*offset), atol=1e-12)
+    assert [len(result["drivers"]) for result in results] == [3, 2]
+    assert len(cmds.named("parentConstraint")) == 5
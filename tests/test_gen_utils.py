@@ -0,0 +1,58 @@
+from auto_rigging_tool_box.rigging_tools import gen_utils
+from auto_rigging_tool_box.rigging_tools.gen_utils import rename_objects_by_type
+
+
+def fake_ls(*args, **kwargs):
+    if not args:
+        return ["grp", "arm", "obj_grp_01"]
+    if not args[0]:
+        return []
+    return ["|grp", "transform", "|grp|arm", "joint"]
+
+
+def test_rename_mapping_follows_the_names_maya_gives(cmds):
+    cmds.returns["ls"] = fake_ls
+    # Something outside the listed names already holds obj_grp_02
+    given = {"obj_grp_02": "obj_grp_03"}
+    cmds.returns["rename"] = lambda path, name: given.get(name, name)
+
+    mapping = rename_objects_by_type(["grp", "arm"])
+
+    assert [call[1] for call in cmds.named("rename")] == [("|grp|arm", "jnt_arm_01"),
+                                                         ("|grp", "obj_grp_02")]
+    assert mapping == {"|grp": "|obj_grp_03", "|grp|arm": "|obj_grp_03|jnt_arm_01"}
+
+
+def test_dry_run_returns_the_plan_without_renaming(cmds):
+    cmds.returns["ls"] = fake_ls
+
+    mapping = rename_objects_by_type(["grp", "arm"], dry_run=True)
+
+    assert not cmds.named("rename")
+    assert mapping == {"|grp": "|obj_grp_02", "|grp|arm": "|obj_grp_02|jnt_arm_01"}
+
+
+def test_reset_skips_connected_channels_of_long_path_nodes(cmds, monkeypatch):
+    monkeypatch.setattr(gen_utils, "get_locked_channels",
+                        lambda paths, channels: {path: set() for path in paths})
+    cmds.returns["ls"] = lambda names, **kwargs: [
+        "|rig|" + name.rsplit("|", 1)[-1] for name in names]
+    # Connections name their owners by the shortest unique name
+    cmds.returns["listConnections"] = ["ctrl_b.rotate", "driver.output"]
+
+    gen_utils.reset_transforms(["|rig|ctrl_a", "|rig|ctrl_b"])
+
+    assert cmds.named("listConnections")[0][1] == (["|rig|ctrl_a", "|rig|ctrl_b"],)
+    assert cmds.named("xform")[0][1] == (["|rig|ctrl_a"],)
+    assert [call[1] for call in cmds.named("setAttr")] == [("|rig|ctrl_b.translate", 0.0, 0.0, 0.0)]
+    assert not cmds.named("listAttr")
+
+
+def test_rename_prints_one_summary_line(cmds, capsys):
+    cmds.returns["ls"] = fake_ls
+    cmds.returns["rename"] = lambda path, name: name
+
+    rename_objects_by_type(["grp", "arm"])
+
+    printed = [line for line in capsys.readouterr().out.splitlines() if "Renamed" in line]
+    assert printed == ["Renamed 2 of 2 objects"]
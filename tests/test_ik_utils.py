@@ -0,0 +1,38 @@
+import numpy as np
+
+from auto_rigging_tool_box.rigging_tools.ik_utils import create_ik_limbs
+
+
+class FakeSkeleton(object):
+    """
+    Skeleton index holding only world positions.
+    """
+
+    def __init__(self, positions):
+        self.names = list(positions)
+        self.positions = np.array([positions[name] for name in self.names], dtype=float)
+
+    def indices(self, names):
+        return [self.names.index(name) for name in names]
+
+
+SKELETON = FakeSkeleton({
+    "|root|L_shoulder": (1, 10, 0), "|root|L_shoulder|L_elbow": (4, 10, -1),
+    "|root|L_shoulder|L_elbow|L_wrist": (7, 10, 0),
+    "|root|R_hip": (-1, 5, 0), "|root|R_hip|R_knee": (-1, 3, 1),
+    "|root|R_hip|R_knee|R_ankle": (-1, 0, 0),
+})
+
+
+def test_limbs_are_named_after_their_start_joint(cmds):
+    results = create_ik_limbs([SKELETON.names[:3], SKELETON.names[3:]], skeleton=SKELETON)
+
+    assert [result["name"] for result in results] == ["L_shoulder", "R_hip"]
+    assert [result["handle"] for result in results] == ["L_shoulder_IK", "R_hip_IK"]
+    assert [call[2]["name"] for call in cmds.named("ikHandle")] == ["L_shoulder_IK", "R_hip_IK"]
+
+
+def test_limb_type_keeps_the_side_prefix(cmds):
+    results = create_ik_limbs([SKELETON.names[:3], SKELETON.names[3:]], limb_type="limb",
+                              skeleton=SKELETON)
+    assert [result["name"] for result in results] == ["L_limb", "R_limb"]
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from auto_rigging_tool_box.rigging_tools.node_network_utils import (evaluate_network,
+                                                                    evaluate_squash_stretch)
+from auto_rigging_tool_box.rigging_tools.squash_stretch_utils import create_squash_stretch_chains
+
+
+class FakeSkeleton(object):
+    """
+    Skeleton index holding only world positions.
+    """
+
+    def __init__(self, positions):
+        self.names = list(positions)
+        self.positions = np.array([positions[name] for name in self.names], dtype=float)
+
+    def indices(self, names):
+        return [self.names.index(name) for name in names]
+
+
+@pytest.fixture
+def arm(cmds):
+    skeleton = FakeSkeleton({"L_shoulder": (0, 0, 0), "L_elbow": (2, 1, 0), "L_wrist": (4, 0, 0)})
+    network = create_squash_stretch_chains([("L_arm_CTRL", skeleton.names)], skeleton=skeleton)
+    # The wrist locator pulled from half the bind chord to twice of it
+    lengths = np.linspace(2.0, 8.0, 50)
+    start = np.zeros((50, 3))
+    end = np.stack([lengths, np.zeros(50), np.zeros(50)], axis=-1)
+    return network, start, end, lengths / 4.0
+
+
+def test_squash_stretch_keeps_volume(arm):
+    network, start, end, stretch = arm
+    result, = evaluate_squash_stretch(network, [start], [end])
+
+    np.testing.assert_allclose(result["expected_stretch"], stretch)
+    np.testing.assert_allclose(result["stretch_scale"], stretch)
+    np.testing.assert_allclose(result["joint_scales"]["L_elbow"]["scaleY"], stretch ** -0.5)
+    np.testing.assert_allclose(result["volume"], 1.0)
+    assert result["volume_errors"].size == 0
+
+
+def test_broken_squash_is_flagged(arm):
+    network, start, end, stretch = arm
+    # Square root instead of inverse square root: the network is still consistent
+    # with itself, but the joints grow in every direction
+    power = next(node for node in network["nodes"] if "invSqrt" in node)
+    network["nodes"][power]["attrs"]["input2X"] = 0.5
+    result, = evaluate_squash_stretch(network, [start], [end])
+
+    np.testing.assert_allclose(result["volume"], stretch ** 2)
+    assert set(result["volume_errors"]) == set(np.flatnonzero(np.abs(stretch ** 2 - 1.0) > 1e-3))
+
+
+def test_wrong_rest_length_is_flagged(arm):
+    network, start, end, stretch = arm
+    network["limbs"][0]["rest_length"] = 5.0
+    result, = evaluate_squash_stretch(network, [start], [end])
+    assert result["volume_errors"].size == len(stretch)
+
+
+def test_unknown_node_type_raises_value_error():
+    network = {"nodes": {"blend": {"type": "blendColors", "attrs": {}}},
+               "connections": [("blend.output", "jnt.scaleX")]}
+    with pytest.raises(ValueError, match="Cannot evaluate 'blendColors' nodes"):
+        evaluate_network(network, {})
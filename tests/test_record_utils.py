@@ -0,0 +1,83 @@
+import types
+
+import numpy as np
+import pytest
+
+from auto_rigging_tool_box.rigging_tools import record_utils, skin_utils, trace_utils
+
+
+def call(command, *args, result=None, **kwargs):
+    return {"command": command, "args": list(args), "kwargs": kwargs, "result": result}
+
+
+def test_dedupe_follows_renamed_nodes():
+    calls = [
+        call("setAttr", "ctrl.translateX", 1.0),
+        call("rename", "ctrl", "L_arm_CTRL", result="L_arm_CTRL"),
+        call("setAttr", "L_arm_CTRL.translateX", 2.0),
+    ]
+
+    kept = record_utils._dedupe(calls)
+
+    assert [item["command"] for item in kept] == ["rename", "setAttr"]
+    assert kept[1]["args"] == ["L_arm_CTRL.translateX", 2.0]
+
+
+def test_dedupe_keeps_edits_of_a_new_node_reusing_a_name():
+    calls = [
+        call("setAttr", "grp.visibility", 0),
+        call("delete", "grp"),
+        call("createNode", "transform", name="grp", result="grp"),
+        call("setAttr", "grp.visibility", 1),
+    ]
+
+    assert record_utils._dedupe(calls) == calls
+
+
+def test_compile_keeps_plain_string_values():
+    calls = [
+        call("createNode", "transform", name="spine", result="spine"),
+        call("addAttr", "spine", longName="note", dataType="string"),
+        call("setAttr", "spine.note", "spine", type="string"),
+        call("rename", "spine", "spine", result="spine1"),
+    ]
+
+    source = record_utils.compile_script(calls)
+
+    assert "n0 = cmds.createNode('transform', name='spine')" in source
+    assert "cmds.addAttr(n0, longName='note', dataType='string')" in source
+    assert "cmds.setAttr(n0 + '.note', 'spine', type='string')" in source
+    assert "n1 = cmds.rename(n0, 'spine')" in source
+
+
+def test_recording_and_tracing_chain(cmds):
+    module = types.SimpleNamespace(cmds=cmds)
+
+    recorder = record_utils.start_recording([module])
+    tracer = trace_utils.enable_tracing([module])
+    module.cmds.createNode("transform", name="a")
+
+    record_utils.stop_recording()
+    module.cmds.createNode("transform", name="b")
+    assert trace_utils.disable_tracing() is tracer
+
+    assert module.cmds is cmds
+    assert [item["kwargs"]["name"] for item in recorder.calls] == ["a"]
+    assert [event["command"] for event in tracer.events] == ["createNode", "createNode"]
+
+
+def test_api_edits_block_compiling(cmds, monkeypatch):
+    monkeypatch.setattr(skin_utils, "set_skin_weights", lambda *args, **kwargs: None)
+    module = types.SimpleNamespace(cmds=cmds)
+
+    with record_utils.record_session([module]) as recorder:
+        module.cmds.createNode("transform", name="a")
+        skin_utils.set_skin_weights("body", np.zeros((4, 2)))
+
+    assert recorder.api_edits == [{"function": "skin_utils.set_skin_weights",
+                                   "args": "'body', <array 4x2>"}]
+    with pytest.raises(RuntimeError):
+        recorder.compile()
+    source = recorder.compile(partial=True)
+    assert "# Missing 1 edits made through the API:" in source
+    assert "#     skin_utils.set_skin_weights('body', <array 4x2>)" in source
@@ -0,0 +1,187 @@
+import numpy as np
+import pytest
+
+from auto_rigging_tool_box.rigging_tools import rig_pipeline
+from auto_rigging_tool_box.rigging_tools.rig_pipeline import (build_component, component_hash,
+                                                              run_rig_spec, sort_components,
+                                                              teardown_component)
+
+
+class FakeSkeleton(object):
+    """
+    Skeleton index of a single chain, with identity world matrices.
+    """
+
+    def __init__(self, names):
+        self.paths = ["|" + "|".join(names[:index + 1]) for index in range(len(names))]
+        self.matrices = np.tile(np.eye(4), (len(names), 1, 1))
+        self._index = {name: index for index, name in enumerate(names)}
+
+    def indices(self, names):
+        return [self._index[name] for name in names]
+
+    def chain_between(self, start, end):
+        return self.paths[self._index[start]:self._index[end] + 1]
+
+
+@pytest.fixture
+def skeleton():
+    return FakeSkeleton(["root", "spine", "L_arm", "L_elbow", "L_hand"])
+
+
+@pytest.fixture
+def builds(cmds, monkeypatch):
+    """
+    Swaps the ik builder for one that logs what it builds, and keeps the component
+    meta data in a dict instead of network nodes.
+    """
+    built = []
+    store = {}
+
+    def build(component, skeleton):
+        built.append(component["name"])
+        return (f"{component['name']}_IKH", f"{component['name']}_CTRL")
+
+    monkeypatch.setitem(rig_pipeline.COMPONENT_BUILDERS, "ik", build)
+    monkeypatch.setattr(rig_pipeline, "read_component_meta",
+                        lambda spec, component: store.get(component["name"]))
+    monkeypatch.setattr(rig_pipeline, "write_component_meta",
+                        lambda spec, component, input_hash, created, joint_values=None:
+                        store.__setitem__(component["name"], (input_hash, created)))
+    monkeypatch.setattr(rig_pipeline, "teardown_component",
+                        lambda spec, component: store.pop(component["name"], None))
+    return built
+
+
+def component(name, depends=(), **keys):
+    return dict({"name": name, "type": "ik", "depends": list(depends)}, **keys)
+
+
+def test_sort_components_puts_dependencies_first():
+    components = [component("hand", ["arm"]), component("arm", ["spine"]), component("spine"),
+                  component("head")]
+    ordered = [entry["name"] for entry in sort_components(components)]
+    assert ordered == ["spine", "head", "arm", "hand"]
+
+
+def test_sort_components_rejects_a_cycle():
+    components = [component("a", ["c"]), component("b", ["a"]), component("c", ["b"]),
+                  component("d")]
+    with pytest.raises(ValueError, match="cycle: a, b, c"):
+        sort_components(components)
+
+
+def test_sort_components_rejects_a_missing_dependency():
+    with pytest.raises(ValueError, match="'arm' depends on unknown 'spine'"):
+        sort_components([component("arm", ["spine"])])
+
+
+def test_component_hash_is_stable(skeleton):
+    arm = component("arm", start="L_arm", end="L_hand", options={"a": 1, "b": 2})
+    same = {"end": "L_hand", "start": "L_arm", "options": {"b": 2, "a": 1},
+            "type": "ik", "name": "arm", "depends": ["spine"]}
+    assert component_hash(arm, skeleton) == component_hash(same, skeleton)
+
+    skeleton.matrices[3, 3, 0] += 1e-7
+    assert component_hash(arm, skeleton) == component_hash(same, skeleton)
+
+    skeleton.matrices[3, 3, 0] += 0.5
+    moved = component_hash(arm, skeleton)
+    skeleton.matrices[3, 3, 0] -= 0.5
+    assert moved != component_hash(arm, skeleton)
+
+    changed = dict(arm, options={"a": 1, "b": 3})
+    assert component_hash(changed, skeleton) != component_hash(arm, skeleton)
+
+
+def test_skin_hash_only_covers_the_joints_it_binds(skeleton):
+    arm_skin = {"name": "arm_skin", "type": "skin", "mesh": "arm_GEO", "start": "L_arm",
+                "end": "L_hand"}
+    body_skin = {"name": "body_skin", "type": "skin", "mesh": "body_GEO"}
+    before = component_hash(arm_skin, skeleton), component_hash(body_skin, skeleton)
+
+    skeleton.matrices[1, 3, 1] = 2.0
+    assert (component_hash(arm_skin, skeleton), component_hash(body_skin, skeleton)) == before
+
+    skeleton.matrices[3, 3, 1] = 2.0
+    assert component_hash(arm_skin, skeleton) != before[0]
+    assert component_hash(body_skin, skeleton) == before[1]
+
+
+def test_teardown_restores_joints_zeroed_in_matrix_mode(cmds, skeleton, monkeypatch):
+    identity = np.eye(4).flatten().tolist()
+    scene = {}
+    for jnt in ("L_arm", "L_elbow"):
+        scene.update({f"{jnt}.translate": [(1.0, 2.0, 3.0)], f"{jnt}.rotate": [(0.0, 45.0, 0.0)],
+                      f"{jnt}.jointOrient": [(0.0, 0.0, 90.0)],
+                      f"{jnt}.offsetParentMatrix": identity})
+
+    def set_attr(plug, *values, **kwargs):
+        scene[plug] = values[0] if "type" in kwargs else [values]
+
+    def build(component, skeleton):
+        for jnt in component["joints"]:
+            for channel in ("translate", "rotate", "jointOrient"):
+                cmds.setAttr(f"{jnt}.{channel}", 0, 0, 0)
+        return [{"group": "GRP_FK_controls", "drivers": []}]
+
+    cmds.returns.update({
+        "getAttr": lambda plug, **kwargs: scene.get(plug),
+        "setAttr": set_attr,
+        "objExists": lambda node: f"{node}.inputHash" in scene,
+        "ls": lambda *args, **kwargs: ["uuid-1"] if kwargs.get("uuid") else list(args[0]),
+    })
+    monkeypatch.setitem(rig_pipeline.COMPONENT_BUILDERS, "fk", build)
+    spec = {"name": "hero"}
+    arm = component("arm", type="fk", joints=["L_arm", "L_elbow"], options={"mode": "matrix"})
+
+    build_component(spec, arm, skeleton, "hash")
+    assert scene["L_arm.rotate"] == [(0, 0, 0)]
+
+    assert teardown_component(spec, arm) == 1
+    for jnt in ("L_arm", "L_elbow"):
+        assert [tuple(scene[f"{jnt}.{channel}"][0]) for channel in ("translate", "rotate")] == \
+            [(1.0, 2.0, 3.0), (0.0, 45.0, 0.0)]
+        assert tuple(scene[f"{jnt}.jointOrient"][0]) == (0.0, 0.0, 90.0)
+        assert scene[f"{jnt}.offsetParentMatrix"] == identity
+    assert ("delete", (["uuid-1"],), {}) in cmds.calls
+
+
+def test_incremental_run_only_rebuilds_changed_components(builds, skeleton):
+    spec = {"name": "hero", "components": [
+        component("spine", start="root", end="spine"),
+        component("arm", ["spine"], start="L_arm", end="L_hand"),
+        component("head", joints=["root"]),
+    ]}
+    run_rig_spec(spec, skeleton)
+    assert builds == ["spine", "head", "arm"]
+
+    del builds[:]
+    report = run_rig_spec(spec, skeleton, incremental=True)
+    assert builds == []
+    assert report["unchanged"] == ["spine", "head", "arm"]
+
+    skeleton.matrices[1, 3, 1] = 2.0
+    report = run_rig_spec(spec, skeleton, incremental=True)
+    assert builds == ["spine", "arm"]
+    assert report["unchanged"] == ["head"]
+
+
+def test_failed_component_skips_its_dependents(builds, skeleton, monkeypatch):
+    def fail(component, skeleton):
+        raise RuntimeError("no pole vector")
+
+    monkeypatch.setitem(rig_pipeline.COMPONENT_BUILDERS, "fk", fail)
+    spec = {"components": [
+        component("spine", type="fk", start="root", end="spine"),
+        component("arm", ["spine"], start="L_arm", end="L_hand"),
+        component("head", joints=["root"]),
+    ]}
+    report = run_rig_spec(spec, skeleton)
+
+    assert builds == ["head"]
+    assert report["failed"] == ["arm", "spine"]
+    status = {stage["name"]: (stage["status"], stage.get("error")) for stage in report["stages"]}
+    assert status == {"spine": ("failed", "no pole vector"),
+                      "arm": ("skipped", "depends on failed spine"),
+                      "head": ("done", None)}
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from auto_rigging_tool_box.rigging_tools import skeleton_utils
+from auto_rigging_tool_box.rigging_tools.curve_utils import euler_to_matrix
+from auto_rigging_tool_box.rigging_tools.skeleton_utils import (get_counterpart,
+                                                                get_counterpart_table,
+                                                                mirror_skeleton)
+
+
+# Joint hierarchies as listRelatives -allDescendents lists them, bottom up
+DESCENDANTS = {
+    "|L_arm": ["|L_arm|L_elbow|L_wrist", "|L_arm|L_elbow", "|L_arm|L_arm_L_twist"],
+    "|R_arm": ["|R_arm|R_elbow1|R_wrist", "|R_arm|R_elbow1", "|R_arm|R_arm_R_twist"],
+}
+
+
+@pytest.fixture
+def scene(cmds):
+    skeleton_utils.clear_counterpart_cache()
+    cmds.returns["ls"] = lambda names, **kwargs: ["|" + name.lstrip("|") for name in
+                                                  ([names] if isinstance(names, str) else names)]
+    cmds.returns["listRelatives"] = lambda root, **kwargs: DESCENDANTS.get(root, [])
+    # R_elbow already existed, so Maya gave the mirrored elbow another name
+    cmds.returns["mirrorJoint"] = ["R_arm", "R_arm_R_twist", "R_elbow1", "R_wrist"]
+    yield cmds
+    skeleton_utils.clear_counterpart_cache()
+
+
+def test_mirrored_joints_pair_by_hierarchy_position(scene):
+    pairs = mirror_skeleton(["L_arm", "L_elbow"])
+
+    assert pairs == {"L_arm": "R_arm", "L_arm_L_twist": "R_arm_R_twist", "L_elbow": "R_elbow1",
+                     "L_wrist": "R_wrist"}
+    assert scene.named("mirrorJoint")[0][2]["searchReplace"] == ("L_", "R_")
+    assert get_counterpart("|R_arm|R_elbow1") == "L_elbow"
+
+
+def test_mismatched_mirror_records_nothing(scene):
+    scene.returns["mirrorJoint"] = ["R_arm"]
+    scene.returns["listRelatives"] = lambda root, **kwargs: DESCENDANTS["|L_arm"] \
+        if root == "|L_arm" else []
+
+    assert mirror_skeleton(["L_arm"]) == {}
+    assert scene.named("warning")
+
+
+def test_scene_change_drops_the_counterpart_table(scene):
+    scene.returns["objExists"] = True
+    scene.returns["getAttr"] = '{"L_arm": "R_arm", "R_arm": "L_arm"}'
+    assert get_counterpart("L_arm") == "R_arm"
+
+    scene.returns["getAttr"] = "{}"
+    assert get_counterpart("L_arm") == "R_arm"
+    skeleton_utils._on_scene_change()
+    assert get_counterpart_table() == {}
+
+
+def test_orient_skeleton_keeps_world_matrices_of_oriented_joints(cmds):
+    skeleton_utils.clear_counterpart_cache()
+    paths = ["|arm", "|arm|elbow", "|arm|elbow|wrist", "|arm|elbow|wrist|hand"]
+    positions = np.array(((1.0, 5.0, 0.5), (3.0, 4.0, -0.5), (4.0, 2.0, 0.0), (4.5, 1.0, 0.5)))
+    world = {path: np.eye(4) for path in paths}
+    for path, position in zip(paths, positions):
+        world[path][3, :3] = position
+
+    cmds.returns["ls"] = lambda names, **kwargs: [paths[0]]
+    cmds.returns["listRelatives"] = lambda root, **kwargs: paths[1:]
+    cmds.returns["xform"] = lambda nodes, **kwargs: [value for node in nodes
+                                                     for value in world[node].flatten()]
+
+    # Pose the joints the way orienting solves them, but held by rotate
+    frames = skeleton_utils.solve_joint_frames(skeleton_utils.SkeletonIndex(["arm"]))
+    for path, frame in zip(paths, frames):
+        world[path][:3, :3] = frame
+    before = np.array([world[path] for path in paths])
+
+    assert skeleton_utils.orient_skeleton(["arm"], hierarchy=True) == 4
+
+    values = {tuple(args[0].rsplit(".", 1)): tuple(args[1:])
+              for _, args, _ in cmds.named("setAttr")}
+    after = []
+    for path in paths:
+        local = np.eye(4)
+        local[:3, :3] = euler_to_matrix(values[path, "jointOrient"])
+        local[3, :3] = values[path, "translate"]
+        assert values[path, "rotate"] == (0.0, 0.0, 0.0)
+        after.append(local @ after[-1] if after else local)
+    assert np.allclose(after, before)
+    skeleton_utils.clear_counterpart_cache()
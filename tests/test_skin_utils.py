@@ -0,0 +1,218 @@
+import numpy as np
+import pytest
+
+from auto_rigging_tool_box.rigging_tools import skin_utils
+
+
+@pytest.fixture
+def skinned(monkeypatch, cmds):
+    """
+    A four vertex mesh skinned to the influences in state["influences"].
+    """
+    state = {"influences": ["root", "spine"], "written": None}
+    cmds.returns["polyEvaluate"] = 4
+    monkeypatch.setattr(skin_utils, "get_skin_cluster", lambda mesh: "skinCluster1")
+    monkeypatch.setattr(skin_utils, "get_influence_names", lambda skin: list(state["influences"]))
+
+    def set_skin_weights(mesh, weights, influences=None, skin=None, vertices=None):
+        state["written"] = (np.array(weights), list(influences))
+    monkeypatch.setattr(skin_utils, "set_skin_weights", set_skin_weights)
+    return state
+
+
+def write_file(tmp_path, weights, influences):
+    path = str(tmp_path / "body.rtw")
+    skin_utils.write_weight_file(path, np.array(weights, dtype=float), influences, mesh="body")
+    return path
+
+
+def test_import_warns_and_renormalizes_unbound_influences(tmp_path, skinned, cmds):
+    path = write_file(tmp_path, [[0.5, 0.25, 0.25], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0],
+                                 [0.0, 0.5, 0.5]], ["root", "spine", "head"])
+
+    loaded = skin_utils.import_skin_weights(path, mesh="body")
+
+    assert loaded == ["root", "spine"]
+    warnings = " ".join(call[1][0] for call in cmds.named("warning"))
+    assert "head" in warnings
+    assert "1 vertices only had weight" in warnings
+    weights, columns = skinned["written"]
+    assert columns == ["root", "spine"]
+    np.testing.assert_allclose(weights, [[2 / 3, 1 / 3], [1.0, 0.0], [0.0, 0.0], [0.0, 1.0]])
+
+
+def test_import_adds_missing_influences(tmp_path, skinned, cmds):
+    path = write_file(tmp_path, [[0.5, 0.5], [1.0, 0.0], [0.0, 1.0], [0.5, 0.5]],
+                      ["root", "head"])
+
+    def add_influence(*args, **kwargs):
+        skinned["influences"].append(kwargs["addInfluence"])
+    cmds.returns["ls"] = lambda names, **kwargs: list(names)
+    cmds.returns["skinCluster"] = add_influence
+
+    loaded = skin_utils.import_skin_weights(path, mesh="body", add_missing=True)
+
+    assert loaded == ["root", "head"]
+    assert not cmds.named("warning")
+    assert cmds.calls[0][2] == {"openChunk": True, "chunkName": "Import Skin Weights"}
+    weights, columns = skinned["written"]
+    assert columns == ["root", "spine", "head"]
+    np.testing.assert_allclose(weights, [[0.5, 0.0, 0.5], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0],
+                                         [0.5, 0.0, 0.5]])
+
+
+def grid_mesh(size):
+    """
+    Face counts and vertex ids of a size x size grid of quads.
+    """
+    rows = np.arange(size)
+    corners = (rows[:, None] * (size + 1) + rows[None, :]).ravel()
+    vertex_ids = np.stack((corners, corners + 1, corners + size + 2, corners + size + 1), axis=1)
+    return np.full(size * size, 4), vertex_ids.ravel(), (size + 1) ** 2
+
+
+def test_sparse_matrix_product_matches_dense_product():
+    rng = np.random.default_rng(0)
+    counts, vertex_ids, vertex_count = grid_mesh(6)
+    indptr, indices = skin_utils.build_vertex_adjacency(counts, vertex_ids, vertex_count)
+    lengths = np.diff(indptr)
+    values = np.repeat(1.0 / lengths, lengths)
+    matrix = rng.random((vertex_count, 5))
+
+    dense = np.zeros((vertex_count, vertex_count))
+    dense[np.repeat(np.arange(vertex_count), lengths), indices] = values
+    for chunk_size in (1, 7, 64, skin_utils.SMOOTH_CHUNK_SIZE):
+        product = skin_utils.sparse_matrix_product(indptr[:-1], indices, values, matrix,
+                                                   chunk_size=chunk_size)
+        np.testing.assert_allclose(product, dense @ matrix)
+
+
+def test_smooth_weight_matrix_only_moves_masked_vertices():
+    rng = np.random.default_rng(1)
+    counts, vertex_ids, vertex_count = grid_mesh(4)
+    indptr, indices = skin_utils.build_vertex_adjacency(counts, vertex_ids, vertex_count)
+    weights = rng.random((vertex_count, 3))
+    weights /= weights.sum(axis=1, keepdims=True)
+    masked = [6, 7, 12]
+
+    smoothed = skin_utils.smooth_weight_matrix(weights, indptr, indices, masked, iterations=3)
+
+    untouched = np.setdiff1d(np.arange(vertex_count), masked)
+    np.testing.assert_array_equal(smoothed[untouched], weights[untouched])
+    np.testing.assert_allclose(smoothed.sum(axis=1), 1.0)
+    assert not np.allclose(smoothed[masked], weights[masked])
+
+
+def test_get_selected_vertices_groups_ids_by_mesh(cmds):
+    cmds.returns["ls"] = lambda *args, **kwargs: (
+        list(args[0]) if kwargs.get("flatten") else
+        ["body.vtx[1]", "body.vtx[3]", "headShape.vtx[2]", "eye"])
+    cmds.returns["objectType"] = lambda node: "mesh" if node.endswith("Shape") else "transform"
+    cmds.returns["listRelatives"] = lambda node, **kwargs: [node[:-len("Shape")]]
+    cmds.returns["polyListComponentConversion"] = lambda items, **kwargs: list(items)
+
+    selected = skin_utils.get_selected_vertices()
+
+    assert sorted(selected) == ["body", "eye", "head"]
+    np.testing.assert_array_equal(selected["body"], [1, 3])
+    np.testing.assert_array_equal(selected["head"], [2])
+    assert selected["eye"] is None
+
+
+def test_symmetry_map_cache_follows_points_and_tolerance(monkeypatch, tmp_path, cmds):
+    counts = np.array([4], dtype=np.int32)
+    vertex_ids = np.array([0, 1, 2, 3], dtype=np.int32)
+    mesh = {"points": np.array([[-1.0, 0, 0], [1.0, 0, 0], [-2.0, 1, 0], [2.0, 1, 0]])}
+    monkeypatch.setattr(skin_utils, "get_mesh_topology",
+                        lambda name: (counts, vertex_ids, mesh["points"]))
+    monkeypatch.setattr(skin_utils, "SYMMETRY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(skin_utils, "_SYMMETRY_CACHE", {})
+
+    symmetry, _ = skin_utils.get_symmetry_map("body")
+    assert symmetry.tolist() == [1, 0, 3, 2]
+
+    # Same topology, reshaped so the vertices pair up the other way
+    mesh["points"] = np.array([[-1.0, 0, 0], [2.0, 1, 0], [-2.0, 1, 0], [1.0, 0, 0]])
+    symmetry, _ = skin_utils.get_symmetry_map("body")
+    assert symmetry.tolist() == [3, 2, 1, 0]
+
+    # Off by more than the default tolerance, matched once the tolerance allows it
+    mesh["points"] = mesh["points"] + np.array([[0.01, 0, 0], [0, 0, 0], [0, 0, 0], [0, 0, 0]])
+    assert skin_utils.get_symmetry_map("body")[0][0] == -1
+    assert skin_utils.get_symmetry_map("body", tolerance=0.1)[0][0] == 3
+    assert len(list(tmp_path.iterdir())) == 4
+
+
+def test_set_skin_weights_writes_undoable_plugs(monkeypatch, cmds):
+    # The influence bound to logical index 2 was removed from the skin
+    monkeypatch.setattr(skin_utils, "get_influence_names",
+                        lambda skin: ["root", "spine", "chest", "head"])
+    cmds.returns["getAttr"] = [0, 1, 3, 4]
+
+    skin_utils.set_skin_weights("body", [[0.25, 0.5, 0.25], [0.0, 1.0, 0.0]],
+                                ["chest", "root", "spine"], skin="skinCluster1", vertices=[7, 9])
+
+    assert cmds.named("getAttr")[0][1] == ("skinCluster1.matrix",)
+    writes = [call[1] for call in cmds.named("setAttr")]
+    assert writes == [("skinCluster1.weightList[7].weights[0:1]", 0.5, 0.25),
+                      ("skinCluster1.weightList[7].weights[3:3]", 0.25),
+                      ("skinCluster1.weightList[9].weights[0:1]", 1.0, 0.0),
+                      ("skinCluster1.weightList[9].weights[3:3]", 0.0)]
+
+
+def test_smooth_skin_weights_writes_inside_one_undo_chunk(monkeypatch, cmds):
+    counts, vertex_ids, vertex_count = grid_mesh(2)
+    weights = np.zeros((vertex_count, 2))
+    weights[:, 0] = 1.0
+    weights[4] = [0.0, 1.0]
+    monkeypatch.setattr(skin_utils, "get_skin_cluster", lambda mesh: "skinCluster1")
+    monkeypatch.setattr(skin_utils, "get_influence_names", lambda skin: ["root", "spine"])
+    monkeypatch.setattr(skin_utils, "get_skin_weights",
+                        lambda mesh, skin: (weights, ["root", "spine"]))
+    adjacency = skin_utils.build_vertex_adjacency(counts, vertex_ids, vertex_count)
+    monkeypatch.setattr(skin_utils, "get_vertex_adjacency", lambda mesh: adjacency)
+    cmds.returns["getAttr"] = [0, 1]
+    cmds.returns["undoInfo"] = lambda *args, **kwargs: True if kwargs.get("state") else None
+
+    assert skin_utils.smooth_skin_weights("body", vertices=[4, 5]) == 2
+
+    commands = [call[0] for call in cmds.calls]
+    writes = [call[1] for call in cmds.named("setAttr")]
+    assert commands.index("undoInfo") < commands.index("setAttr")
+    assert cmds.calls[0][2] == {"openChunk": True, "chunkName": "Smooth Skin Weights"}
+    assert [call for call in cmds.named("undoInfo") if call[2].get("closeChunk")]
+    assert max(i for i, name in enumerate(commands) if name == "setAttr") < \
+        max(i for i, call in enumerate(cmds.calls) if call[2].get("closeChunk"))
+    assert [write[0] for write in writes] == ["skinCluster1.weightList[4].weights[0:1]",
+                                              "skinCluster1.weightList[5].weights[0:1]"]
+    assert sum(writes[0][1:]) == pytest.approx(1.0)
+    assert writes[0][1] > 0.0
+
+
+def test_prune_weight_matrix_caps_thresholds_and_renormalizes():
+    weights = np.array([
+        [0.4, 0.3, 0.2, 0.1, 0.0],        # over the budget of 3
+        [0.5, 0.495, 0.005, 0.0, 0.0],    # one weight under the threshold
+        [0.1, 0.1, 0.1, 0.1, 0.6],        # locked weight counts against the budget
+        [1.0, 0.0, 0.0, 0.0, 0.0],        # already fine
+        [0.004, 0.006, 0.0, 0.0, 0.0],    # all under the threshold, the strongest stays
+    ])
+    expected = np.array([
+        [0.4 / 0.9, 0.3 / 0.9, 0.2 / 0.9, 0.0, 0.0],
+        [0.5 / 0.995, 0.495 / 0.995, 0.0, 0.0, 0.0],
+        [0.2, 0.2, 0.0, 0.0, 0.6],
+        [1.0, 0.0, 0.0, 0.0, 0.0],
+        [0.0, 1.0, 0.0, 0.0, 0.0],
+    ])
+
+    pruned, changed = skin_utils.prune_weight_matrix(weights, max_influences=3, threshold=0.01,
+                                                     locked=[4])
+
+    np.testing.assert_allclose(pruned, expected)
+    np.testing.assert_allclose(pruned.sum(axis=1), 1.0)
+    assert changed.tolist() == [True, True, True, False, True]
+
+    chunked, chunked_changed = skin_utils.prune_weight_matrix(
+        weights, max_influences=3, threshold=0.01, locked=[4], chunk_size=2)
+    np.testing.assert_array_equal(chunked, pruned)
+    np.testing.assert_array_equal(chunked_changed, changed)
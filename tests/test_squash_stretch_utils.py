@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from auto_rigging_tool_box.rigging_tools.squash_stretch_utils import create_squash_stretch_chains
+
+
+class FakeSkeleton(object):
+    """
+    Skeleton index holding only world positions.
+    """
+
+    def __init__(self, positions):
+        self.names = list(positions)
+        self.positions = np.array([positions[name] for name in self.names], dtype=float)
+
+    def indices(self, names):
+        return [self.names.index(name) for name in names]
+
+
+def test_rest_length_is_the_bind_chord(cmds):
+    # A bent arm: 3 units up, then 4 units across, the chord is 5 units long
+    skeleton = FakeSkeleton({
+        "|root|L_shoulder": (0, 0, 0),
+        "|root|L_shoulder|L_elbow": (0, 3, 0),
+        "|root|L_shoulder|L_elbow|L_wrist": (4, 3, 0),
+    })
+    network = create_squash_stretch_chains([("L_arm_CTRL", skeleton.names)], skeleton=skeleton)
+
+    limb, = network["limbs"]
+    assert limb["rest_length"] == pytest.approx(5.0)
+    ratio = [call for call in cmds.named("setAttr") if call[1][0].endswith("_ratio_0_MD.input2X")]
+    assert ratio[0][1][1] == pytest.approx(5.0)
+
+    # Nodes are named after the short joint names, long paths are not valid node names
+    assert limb["locators"] == ["L_shoulder_distStart_LOC", "L_wrist_distEnd_LOC"]
+    assert "L_shoulder_distanceBetween" in network["nodes"]
+
+
+def test_chain_ending_where_it_starts_is_rejected(cmds):
+    skeleton = FakeSkeleton({"tail_0": (0, 0, 0), "tail_1": (1, 0, 0), "tail_2": (0, 0, 0)})
+    with pytest.raises(ValueError, match="starts and ends at the same position"):
+        create_squash_stretch_chains([("tail_CTRL", skeleton.names)], skeleton=skeleton)
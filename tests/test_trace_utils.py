@@ -0,0 +1,37 @@
+import json
+
+from auto_rigging_tool_box.rigging_tools import gen_utils
+from auto_rigging_tool_box.rigging_tools.trace_utils import get_tracer, trace_cmds
+
+
+EVENT_KEYS = {"name", "cat", "ph", "ts", "dur", "pid", "tid", "args"}
+
+
+def test_chrome_trace_follows_the_trace_event_format(cmds, tmp_path):
+    with trace_cmds(modules=[gen_utils]) as tracer:
+        gen_utils.reset_transforms(["ctrl_a", "ctrl_b"])
+    assert get_tracer() is None
+    assert gen_utils.cmds is cmds
+
+    path = tmp_path / "trace.json"
+    tracer.write_chrome_trace(str(path))
+    with open(path) as trace_file:
+        trace = json.load(trace_file)
+
+    assert trace["displayTimeUnit"] == "ms"
+    events = trace["traceEvents"]
+    traced = [call[0] for call in cmds.calls]
+    assert events and [event["name"] for event in events] == traced
+
+    for event in events:
+        assert set(event) == EVENT_KEYS
+        assert event["ph"] == "X"
+        assert event["cat"] == "gen_utils.reset_transforms"
+        assert isinstance(event["ts"], float) and event["ts"] >= 0.0
+        assert isinstance(event["dur"], float) and event["dur"] >= 0.0
+        assert isinstance(event["pid"], int) and event["tid"] == 0
+        assert set(event["args"]) == {"args", "caller"}
+        assert event["args"]["caller"].startswith(f"{gen_utils.__name__}.")
+
+    starts = [event["ts"] for event in events]
+    assert starts == sorted(starts)
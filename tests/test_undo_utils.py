@@ -0,0 +1,91 @@
+import pytest
+
+from auto_rigging_tool_box.rigging_tools import undo_utils
+from auto_rigging_tool_box.rigging_tools.undo_utils import show_message, transaction
+
+
+@pytest.fixture
+def undo_queue(cmds):
+    """
+    Fakes an undo queue whose last entry is the last closed chunk.
+    """
+    queue = {"state": True, "open": [], "last": None}
+
+    def undo_info(*args, **kwargs):
+        if kwargs.get("query"):
+            return queue["state"] if kwargs.get("state") else queue["last"]
+        if kwargs.get("openChunk"):
+            queue["open"].append(kwargs["chunkName"])
+        if kwargs.get("closeChunk"):
+            queue["last"] = queue["open"].pop()
+    cmds.returns["undoInfo"] = undo_info
+    return queue
+
+
+def test_transaction_runs_in_one_chunk_with_refresh_suspended(cmds, undo_queue, capsys):
+    @transaction("Build")
+    def build():
+        cmds.createNode("transform")
+        show_message("one")
+        show_message("two")
+        return "done"
+
+    assert build() == "done"
+
+    commands = [call[0] for call in cmds.calls]
+    assert commands == ["undoInfo", "refresh", "createNode", "refresh", "undoInfo",
+                        "inViewMessage"]
+    assert cmds.calls[1][2] == {"suspend": True}
+    assert "2</hl> steps done" in cmds.named("inViewMessage")[0][2]["amg"]
+    assert undo_queue["last"] == "Build"
+    assert "Build finished in" in capsys.readouterr().out
+
+
+def test_transaction_rolls_back_and_warns_on_error(cmds, undo_queue, capsys):
+    @transaction("Build")
+    def build():
+        cmds.createNode("transform")
+        show_message("never shown")
+        raise RuntimeError("no joints")
+
+    with pytest.raises(RuntimeError):
+        build()
+
+    assert len(cmds.named("undo")) == 1
+    assert cmds.named("warning")[0][1] == ("Build failed: no joints",)
+    assert not cmds.named("inViewMessage")
+    assert not undo_utils.in_transaction()
+    assert "partial build rolled back: no joints" in capsys.readouterr().out
+
+
+def test_transaction_does_not_undo_someone_elses_chunk(cmds, capsys):
+    # An empty chunk never reaches the queue, so the last entry is still the user's
+    cmds.returns["undoInfo"] = lambda *args, **kwargs: (
+        (True if kwargs.get("state") else "User Move") if kwargs.get("query") else None)
+
+    @transaction("Build")
+    def build():
+        raise ValueError("bad spec")
+
+    with pytest.raises(ValueError):
+        build()
+
+    assert not cmds.named("undo")
+    assert "partial build left in scene" in capsys.readouterr().out
+
+
+def test_nested_transactions_open_one_chunk(cmds, undo_queue):
+    @transaction("Inner")
+    def inner():
+        show_message("inner")
+
+    @transaction("Outer")
+    def outer():
+        inner()
+        inner()
+
+    outer()
+
+    opened = [call for call in cmds.named("undoInfo") if call[2].get("openChunk")]
+    assert [call[2]["chunkName"] for call in opened] == ["Outer"]
+    assert len(cmds.named("inViewMessage")) == 1